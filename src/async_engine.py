@@ -0,0 +1,474 @@
+"""
+Standalone asyncio load engine: the STUser workload (same ten language payloads and
+request names, equal weights, same think time) driven by coroutines over one aiohttp
+keep-alive connection pool instead of one greenlet and blocking client per user.
+
+It takes Locust's headless command-line flags and writes Locust's report_stats.csv,
+report_stats_history.csv, report_failures.csv and report_exceptions.csv schema (plus
+the raw request capture of request_recorder.py), so every report and chart script
+reads its runs unchanged. Locust itself is deliberately not imported: importing it
+monkey-patches the standard library for gevent, which would push asyncio onto the
+1024-descriptor select() loop.
+
+    python src/async_engine.py -u 20000 -r 500 --run-time 5m --csv results/run/report
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import resource
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import numpy as np
+
+from generator_health import GENERATOR_FILENAME, LAG_PROBE_INTERVAL_SECONDS, SAMPLE_INTERVAL_SECONDS, GeneratorSampler
+from languages import LANGUAGE_NAMES, build_request_bodies
+from latency_histogram import REQUEST_DTYPE, LatencyHistogram, save_histograms, write_percentile_summary
+from status_breakdown import StatusBreakdown, status_class, write_status_reports
+
+DEFAULT_HOST = "https://api.sarvam.ai"
+SARVAM_API_KEY = os.getenv("SARVAM_API_KEY")
+# Same "min,max" think time as sarvamai_benchmarking.py
+WAIT_TIME_RANGE = tuple(float(x) for x in os.getenv("SARVAM_WAIT_TIME", "4,8").split(","))
+HEADERS = {
+    "api-subscription-key": SARVAM_API_KEY or "",
+    "Content-Type": "application/json",
+}
+REQUEST_BODIES = build_request_bodies()
+
+# Mirrors Locust's defaults so the numbers mean the same thing in both engines
+PERCENTILES_TO_REPORT = [0.5, 0.66, 0.75, 0.8, 0.9, 0.95, 0.98, 0.99, 0.999, 0.9999, 1.0]
+CURRENT_RESPONSE_TIME_WINDOW = 10
+CSV_STATS_INTERVAL_SEC = 1
+STATS_HEADER = ["Type", "Name", "Request Count", "Failure Count", "Median Response Time", "Average Response Time",
+                "Min Response Time", "Max Response Time", "Average Content Size", "Requests/s", "Failures/s"]
+HISTORY_HEADER = ["Timestamp", "User Count", "Type", "Name", "Requests/s", "Failures/s"]
+TOTAL_HEADER = ["Total Request Count", "Total Failure Count", "Total Median Response Time",
+                "Total Average Response Time", "Total Min Response Time", "Total Max Response Time",
+                "Total Average Content Size"]
+RAW_BATCH_SIZE = 4096
+
+
+def percentile_label(percentile):
+    return f"{percentile * 100:g}%"
+
+
+def bucket_response_time(response_time):
+    """
+    Locust's ~2 significant digit rounding of response times (147 -> 150, 3432 -> 3400).
+    """
+    if response_time < 100:
+        return round(response_time)
+    elif response_time < 1000:
+        return int(round(response_time, -1))
+    elif response_time < 10000:
+        return int(round(response_time, -2))
+    return int(round(response_time, -3))
+
+
+def response_time_percentile(response_times, num_requests, percent):
+    num_of_request = int(num_requests * percent)
+    processed_count = 0
+    for response_time in sorted(response_times, reverse=True):
+        processed_count += response_times[response_time]
+        if num_requests - processed_count <= num_of_request:
+            return response_time
+    return 0
+
+
+def parse_run_time(run_time):
+    """
+    Seconds in a Locust-style run time such as "90", "45s", "5m" or "1h30m".
+    """
+    if run_time.isdigit():
+        return int(run_time)
+    seconds, number = 0, ""
+    for char in run_time:
+        if char.isdigit():
+            number += char
+        else:
+            seconds += int(number) * {"h": 3600, "m": 60, "s": 1}[char]
+            number = ""
+    return seconds
+
+
+class EndpointStats:
+    """
+    Locust's StatsEntry bookkeeping for one request name (or the Aggregated total).
+    """
+
+    def __init__(self, name, method="POST"):
+        self.name = name
+        self.method = method
+        self.num_requests = 0
+        self.num_failures = 0
+        self.total_response_time = 0.0
+        self.min_response_time = None
+        self.max_response_time = 0.0
+        self.total_content_length = 0
+        self.response_times = {}
+        self.num_reqs_per_sec = {}
+        self.num_fail_per_sec = {}
+        self.last_request_timestamp = None
+
+    def log(self, timestamp, response_time, content_length, failed):
+        second = int(timestamp)
+        self.num_requests += 1
+        self.num_reqs_per_sec[second] = self.num_reqs_per_sec.get(second, 0) + 1
+        if failed:
+            self.num_failures += 1
+            self.num_fail_per_sec[second] = self.num_fail_per_sec.get(second, 0) + 1
+        self.total_response_time += response_time
+        self.min_response_time = response_time if self.min_response_time is None else min(self.min_response_time,
+                                                                                           response_time)
+        self.max_response_time = max(self.max_response_time, response_time)
+        self.total_content_length += content_length
+        rounded = bucket_response_time(response_time)
+        self.response_times[rounded] = self.response_times.get(rounded, 0) + 1
+        self.last_request_timestamp = timestamp
+
+    @property
+    def median_response_time(self):
+        if not self.response_times:
+            return 0
+        median = response_time_percentile(self.response_times, self.num_requests, 0.5)
+        return float(min(max(median, self.min_response_time), self.max_response_time))
+
+    @property
+    def avg_response_time(self):
+        return self.total_response_time / self.num_requests if self.num_requests else 0.0
+
+    @property
+    def avg_content_length(self):
+        return self.total_content_length / self.num_requests if self.num_requests else 0.0
+
+    def total_rps(self, start_time):
+        if self.last_request_timestamp is None:
+            return 0.0
+        return self.num_requests / max(self.last_request_timestamp - start_time, 1)
+
+    def total_fail_per_sec(self, start_time):
+        if self.last_request_timestamp is None:
+            return 0.0
+        return self.num_failures / max(self.last_request_timestamp - start_time, 1)
+
+    def current_rate(self, per_second, start_time):
+        """
+        Locust's current RPS: the average over the 10 seconds ending 2s before the last request.
+        """
+        if self.last_request_timestamp is None:
+            return 0.0
+        last = int(self.last_request_timestamp)
+        seconds = range(max(last - 12, int(start_time)), last - 2)
+        return sum(per_second.get(t, 0) for t in seconds) / len(seconds) if len(seconds) else 0.0
+
+    def percentiles(self, response_times=None, num_requests=None):
+        response_times = self.response_times if response_times is None else response_times
+        num_requests = self.num_requests if num_requests is None else num_requests
+        if not num_requests:
+            return ["N/A"] * len(PERCENTILES_TO_REPORT)
+        return [response_time_percentile(response_times, num_requests, p) for p in PERCENTILES_TO_REPORT]
+
+    def stats_row(self, start_time):
+        return [self.method, self.name, self.num_requests, self.num_failures, self.median_response_time,
+                self.avg_response_time, self.min_response_time or 0, self.max_response_time,
+                self.avg_content_length, self.total_rps(start_time), self.total_fail_per_sec(start_time)] \
+            + self.percentiles()
+
+
+class RunStats:
+    """
+    Per-name and Aggregated stats plus the CSV writers for one run.
+    """
+
+    def __init__(self, csv_prefix):
+        self.csv_prefix = csv_prefix
+        self.start_time = time.time()
+        self.entries = {name: EndpointStats(name) for name in LANGUAGE_NAMES}
+        self.total = EndpointStats("Aggregated", method="")
+        self.errors = {}
+        # Snapshots of the Aggregated response-time buckets, one per second, for the
+        # rolling-window percentiles in the history file
+        self.snapshots = deque(maxlen=CURRENT_RESPONSE_TIME_WINDOW + 1)
+        self.history_file = None
+        if csv_prefix:
+            self.history_file = open(f"{csv_prefix}_stats_history.csv", "w", newline="")
+            self.history_writer = csv.writer(self.history_file)
+            self.history_writer.writerow(HISTORY_HEADER + [percentile_label(p) for p in PERCENTILES_TO_REPORT]
+                                         + TOTAL_HEADER)
+
+    def log(self, name, timestamp, response_time, content_length, error=None):
+        failed = error is not None
+        self.entries.setdefault(name, EndpointStats(name)).log(timestamp, response_time, content_length, failed)
+        self.total.log(timestamp, response_time, content_length, failed)
+        if failed:
+            self.errors[(name, error)] = self.errors.get((name, error), 0) + 1
+
+    def write_history_row(self, user_count):
+        self.snapshots.append((dict(self.total.response_times), self.total.num_requests))
+        if self.history_file is None:
+            return
+        old_times, old_count = self.snapshots[0]
+        window_times = {key: count - old_times.get(key, 0) for key, count in self.total.response_times.items()}
+        window_count = self.total.num_requests - old_count
+        total = self.total
+        self.history_writer.writerow(
+            [int(time.time()), user_count, "", "Aggregated",
+             f"{total.current_rate(total.num_reqs_per_sec, self.start_time):.6f}",
+             f"{total.current_rate(total.num_fail_per_sec, self.start_time):.6f}"]
+            + total.percentiles(window_times, window_count)
+            + [total.num_requests, total.num_failures, total.median_response_time, total.avg_response_time,
+               total.min_response_time or 0, total.max_response_time, total.avg_content_length])
+        self.history_file.flush()
+
+    def write_reports(self):
+        if not self.csv_prefix:
+            return
+        with open(f"{self.csv_prefix}_stats.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(STATS_HEADER + [percentile_label(p) for p in PERCENTILES_TO_REPORT])
+            for name in sorted(self.entries):
+                if self.entries[name].num_requests:
+                    writer.writerow(self.entries[name].stats_row(self.start_time))
+            writer.writerow(self.total.stats_row(self.start_time))
+        with open(f"{self.csv_prefix}_failures.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Method", "Name", "Error", "Occurrences"])
+            for (name, error), occurrences in sorted(self.errors.items(), key=lambda item: -item[1]):
+                writer.writerow(["POST", name, error, occurrences])
+        with open(f"{self.csv_prefix}_exceptions.csv", "w", newline="") as f:
+            csv.writer(f).writerow(["Count", "Message", "Traceback", "Nodes"])
+
+    def close(self):
+        self.write_reports()
+        if self.history_file is not None:
+            self.history_file.close()
+
+
+class RawCapture:
+    """
+    Same raw_requests.bin/.json and latency_hdr.npz files as request_recorder.py,
+    written from a worker thread so the event loop never blocks on disk. The single
+    writer thread keeps batches in the order they were recorded.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.raw_path = os.path.join(output_dir, "raw_requests.bin")
+        self.file = open(self.raw_path, "wb")
+        self.names = list(LANGUAGE_NAMES)
+        self.name_indexes = {name: i for i, name in enumerate(self.names)}
+        self.histograms = {"Aggregated": LatencyHistogram()}
+        self.buffer = np.empty(RAW_BATCH_SIZE, dtype=REQUEST_DTYPE)
+        self.classes = np.empty(RAW_BATCH_SIZE, dtype=np.uint8)
+        self.buffered = 0
+        self.statuses = StatusBreakdown(output_dir)
+        self.writer = ThreadPoolExecutor(max_workers=1)
+        self.pending_writes = []
+
+    def record(self, name, start_time, status, latency_ms, exception=None):
+        index = self.name_indexes.get(name)
+        if index is None:
+            index = self.name_indexes[name] = len(self.names)
+            self.names.append(name)
+        self.buffer[self.buffered] = (start_time, index, status, latency_ms)
+        self.classes[self.buffered] = status_class(status, exception)
+        self.buffered += 1
+        if self.buffered == RAW_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.buffered:
+            return
+        batch = self.buffer[:self.buffered].copy()
+        classes = self.classes[:self.buffered].copy()
+        self.buffered = 0
+        for index, name in enumerate(self.names):
+            latencies = batch["latency_ms"][batch["name"] == index]
+            if len(latencies):
+                self.histograms.setdefault(name, LatencyHistogram()).record_ms(latencies)
+        self.histograms["Aggregated"].record_ms(batch["latency_ms"])
+        self.pending_writes = [write for write in self.pending_writes if not write.done()]
+        loop = asyncio.get_running_loop()
+        self.pending_writes.append(loop.run_in_executor(self.writer, self.file.write, batch.tobytes()))
+        counts = self.statuses.add_batch(self.names, batch, classes)
+        self.pending_writes.append(loop.run_in_executor(self.writer, self.statuses.write_counts, counts))
+
+    async def close(self):
+        self.flush()
+        await asyncio.gather(*self.pending_writes)
+        self.writer.shutdown()
+        self.file.close()
+        with open(os.path.join(self.output_dir, "raw_requests.json"), "w", encoding="utf-8") as f:
+            json.dump({"dtype": REQUEST_DTYPE.descr, "names": self.names}, f, ensure_ascii=False)
+        save_histograms(os.path.join(self.output_dir, "latency_hdr.npz"), self.histograms)
+        self.statuses.close()
+        write_percentile_summary(self.output_dir)
+        write_status_reports(self.output_dir)
+
+
+def http_error_message(status, reason, name):
+    kind = "Client" if status < 500 else "Server"
+    return f"HTTPError('{status} {kind} Error: {reason} for url: {name}')"
+
+
+async def run_user(session, url, stats, raw):
+    """
+    One simulated STUser: pick a language at random, send it, think, repeat.
+    """
+    while True:
+        name, body = random.choice(REQUEST_BODIES)
+        start_time = time.time()
+        start = time.perf_counter()
+        status, content_length, error, exception = 0, 0, None, None
+        try:
+            async with session.post(url, data=body, headers=HEADERS) as response:
+                content = await response.read()
+                status, content_length = response.status, len(content)
+                if status >= 400:
+                    error = http_error_message(status, response.reason, name)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            error, exception = repr(e), e
+        response_time = (time.perf_counter() - start) * 1000
+        stats.log(name, start_time, response_time, content_length, error)
+        if raw is not None:
+            raw.record(name, start_time, status, response_time, exception)
+        await asyncio.sleep(random.uniform(*WAIT_TIME_RANGE))
+
+
+async def run_test(args):
+    csv_prefix = args.csv
+    stats = RunStats(csv_prefix)
+    raw = None
+    if csv_prefix and os.getenv("SARVAM_RAW_CAPTURE", "1") != "0":
+        raw = RawCapture(os.path.dirname(os.path.abspath(csv_prefix)))
+    sampler = None
+    if csv_prefix:
+        sampler = GeneratorSampler(os.path.join(os.path.dirname(os.path.abspath(csv_prefix)), GENERATOR_FILENAME))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    loop.call_later(parse_run_time(args.run_time), stop.set)
+
+    url = f"{(args.host or DEFAULT_HOST).rstrip('/')}/transliterate"
+    connector = aiohttp.TCPConnector(limit=args.connection_limit, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    users = []
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def spawn_users():
+            # Ramp up at --spawn-rate users/s, in 10 steps per second
+            per_step = args.spawn_rate / 10
+            due = 0.0
+            while len(users) < args.users:
+                due += per_step
+                while len(users) < min(int(due), args.users):
+                    users.append(asyncio.create_task(run_user(session, url, stats, raw)))
+                await asyncio.sleep(0.1)
+            print(f"All {args.users} users spawned.")
+
+        async def report():
+            while True:
+                await asyncio.sleep(CSV_STATS_INTERVAL_SEC)
+                stats.write_history_row(len(users))
+                stats.write_reports()
+                if raw is not None:
+                    raw.flush()
+
+        async def probe_loop_lag():
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(LAG_PROBE_INTERVAL_SECONDS)
+                sampler.record_lag((time.perf_counter() - start - LAG_PROBE_INTERVAL_SECONDS) * 1000)
+
+        async def monitor_generator():
+            while True:
+                await asyncio.sleep(SAMPLE_INTERVAL_SECONDS)
+                reasons = sampler.sample(len(users))
+                if reasons and sampler.saturated_samples == 1:
+                    print(f"[WARNING]: load generator saturated ({', '.join(reasons)}); latency numbers now "
+                          f"include client-side delay. See {GENERATOR_FILENAME}.")
+
+        tasks = [asyncio.create_task(spawn_users()), asyncio.create_task(report())]
+        if sampler is not None:
+            tasks += [asyncio.create_task(probe_loop_lag()), asyncio.create_task(monitor_generator())]
+        await stop.wait()
+        for task in tasks + users:
+            task.cancel()
+        await asyncio.gather(*tasks, *users, return_exceptions=True)
+
+    stats.write_history_row(0)
+    stats.close()
+    if sampler is not None:
+        sampler.close()
+    if raw is not None:
+        await raw.close()
+    return stats
+
+
+def raise_open_file_limit():
+    """
+    Every in-flight request holds a socket, so lift the soft descriptor limit to the hard one.
+    """
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def print_summary(stats):
+    print(f"\n{'Name':<12} {'# reqs':>8} {'# fails':>8} {'Avg':>8} {'Med':>8} {'p95':>8} {'Req/s':>8}")
+    for entry in [stats.entries[name] for name in sorted(stats.entries)] + [stats.total]:
+        if not entry.num_requests:
+            continue
+        p95 = response_time_percentile(entry.response_times, entry.num_requests, 0.95)
+        print(f"{entry.name:<12} {entry.num_requests:>8} {entry.num_failures:>8} {entry.avg_response_time:>8.0f} "
+              f"{entry.median_response_time:>8} {p95:>8} {entry.total_rps(stats.start_time):>8.2f}")
+
+
+def build_command(users, spawn_rate, run_time, csv_prefix, host=None):
+    """
+    The command run_tests.py and the dashboard use to launch this engine.
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--headless", "-u", str(users), "-r", str(spawn_rate),
+               "--run-time", run_time, "--csv", csv_prefix]
+    if host:
+        command += ["--host", host]
+    return command
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="asyncio/aiohttp load engine with Locust-compatible reports.")
+    parser.add_argument("-u", "--users", type=int, default=1)
+    parser.add_argument("-r", "--spawn-rate", type=float, default=1)
+    parser.add_argument("-t", "--run-time", default="1m")
+    parser.add_argument("--csv", default=None, help="CSV prefix, as with Locust's --csv.")
+    parser.add_argument("-H", "--host", default=None)
+    parser.add_argument("--headless", action="store_true", help="Accepted for Locust compatibility; always headless.")
+    parser.add_argument("--connection-limit", type=int, default=0,
+                        help="Maximum simultaneous connections in the keep-alive pool (0 = unlimited).")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not SARVAM_API_KEY:
+        print("SARVAM_API_KEY is not set. Cannot proceed with tests!")
+        sys.exit(1)
+    raise_open_file_limit()
+    stats = asyncio.run(run_test(args))
+    print_summary(stats)
+    # Same convention as Locust: non-zero when any request failed
+    sys.exit(1 if stats.total.num_failures else 0)
+
+
+if __name__ == "__main__":
+    main()
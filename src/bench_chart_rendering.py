@@ -0,0 +1,88 @@
+import argparse
+import csv
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BASE_DIR, "..", 'results')
+CHARTS_SCRIPT = os.path.join(BASE_DIR, 'generate_individual_charts.py')
+TEMPLATE_STATS_CSV = os.path.join(RESULTS_DIR, 'c10_s2_rt3m', 'report_stats.csv')
+LATENCY_COLUMNS = ['Median Response Time', 'Average Response Time', 'Min Response Time', 'Max Response Time',
+                   '50%', '66%', '75%', '80%', '90%', '95%', '98%', '99%', '99.9%', '99.99%', '100%']
+
+
+def build_synthetic_results(results_dir, run_count, seed=0):
+    """
+    Writes `run_count` dashboard-style run folders, each holding a jittered copy of a
+    real report_stats.csv.
+    """
+    rng = random.Random(seed)
+    with open(TEMPLATE_STATS_CSV, newline='') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        template = list(reader)
+
+    for i in range(run_count):
+        users = rng.choice([1, 5, 10, 25, 50])
+        config_dir = os.path.join(results_dir, f"c{users}_s2_rt1m_20250101-{i // 3600:02d}{i // 60 % 60:02d}{i % 60:02d}")
+        os.makedirs(config_dir, exist_ok=True)
+        scale = rng.uniform(0.5, 2.0)
+        with open(os.path.join(config_dir, 'report_stats.csv'), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for row in template:
+                row = dict(row)
+                for column in LATENCY_COLUMNS:
+                    row[column] = round(float(row[column]) * scale * rng.uniform(0.9, 1.1), 3)
+                writer.writerow(row)
+
+
+def time_command(args):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, CHARTS_SCRIPT] + args, check=True, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times chart rendering over a synthetic results/ tree.")
+    parser.add_argument("--runs", type=int, default=300, help="Number of synthetic runs.")
+    parser.add_argument("--jobs", type=int, default=None, help="Rendering processes for the parallel pass.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chart_bench_")
+    results_dir = os.path.join(workdir, 'results')
+    try:
+        build_synthetic_results(results_dir, args.runs)
+        jobs = ["--jobs", str(args.jobs)] if args.jobs else []
+        # Catalog ingestion is timed separately so it doesn't skew the first rendering pass
+        timings = [
+            ("Startup, missing results directory", time_command(["--results-dir", os.path.join(workdir, 'missing')])),
+            ("Catalog ingest + render (sequential)", time_command(["--results-dir", results_dir, "--jobs", "1"])),
+            ("Render all (sequential, --force)", time_command(["--results-dir", results_dir, "--jobs", "1", "--force"])),
+            ("Render all (process pool, --force)", time_command(["--results-dir", results_dir, "--force"] + jobs)),
+            ("Incremental, nothing stale", time_command(["--results-dir", results_dir] + jobs)),
+        ]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\nChart rendering over {args.runs} synthetic runs ({os.cpu_count()} CPUs):")
+    for label, seconds in timings:
+        print(f"  {label:<40} {seconds:8.2f}s")
+
+    summary_path = os.path.join(RESULTS_DIR, 'chart_rendering_benchmark.csv')
+    with open(summary_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Scenario', 'Runs', 'CPUs', 'Seconds'])
+        for label, seconds in timings:
+            writer.writerow([label, args.runs, os.cpu_count(), round(seconds, 3)])
+    print(f"Summary saved to: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
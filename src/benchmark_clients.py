@@ -0,0 +1,114 @@
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import tempfile
+import time
+
+import pandas as pd
+
+from async_engine import build_command as build_async_engine_command
+from mock_server import mock_host, start_mock_server, stop_mock_server
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BASE_DIR, "..", 'results')
+CLIENT_LOCUSTFILES = {
+    "STUser": os.path.join(BASE_DIR, 'sarvamai_benchmarking.py'),
+    "FastSTUser": os.path.join(BASE_DIR, 'fast_benchmarking.py'),
+}
+# The same STUser workload on src/async_engine.py instead of Locust
+ASYNC_ENGINE_CLIENT = "AsyncEngine"
+CLIENTS = list(CLIENT_LOCUSTFILES) + [ASYNC_ENGINE_CLIENT]
+
+
+def children_cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_client(client_name, host, users, run_time_seconds, pool_size, output_dir):
+    """
+    Runs one single-process, zero-wait test and returns its throughput and CPU cost.
+    """
+    csv_prefix = os.path.join(output_dir, client_name)
+    if client_name == ASYNC_ENGINE_CLIENT:
+        command = build_async_engine_command(users, users, f"{run_time_seconds}s", csv_prefix, host)
+    else:
+        command = [
+            "locust",
+            "-f", CLIENT_LOCUSTFILES[client_name],
+            "--headless",
+            "-u", str(users),
+            "-r", str(users),
+            "--run-time", f"{run_time_seconds}s",
+            "--host", host,
+            "--csv", csv_prefix,
+            "--only-summary",
+        ]
+    env = dict(os.environ, SARVAM_API_KEY=os.getenv("SARVAM_API_KEY", "mock-key"),
+               SARVAM_WAIT_TIME="0,0", SARVAM_POOL_SIZE=str(pool_size))
+
+    cpu_before = children_cpu_seconds()
+    wall_start = time.time()
+    # Both engines exit with 1 when any request failed; the CSVs are still complete
+    subprocess.run(command, capture_output=True, text=True, env=env)
+    wall_seconds = time.time() - wall_start
+    cpu_seconds = children_cpu_seconds() - cpu_before
+
+    aggregated = pd.read_csv(f"{csv_prefix}_stats.csv").set_index('Name').loc['Aggregated']
+    return {
+        'Client': client_name,
+        'Users': users,
+        'Requests': int(aggregated['Request Count']),
+        'Failures': int(aggregated['Failure Count']),
+        'Requests/s': round(aggregated['Requests/s'], 1),
+        'CPU Seconds': round(cpu_seconds, 2),
+        'CPU Utilisation': round(cpu_seconds / wall_seconds, 2),
+        'Requests/s per Core': round(aggregated['Request Count'] / cpu_seconds, 1) if cpu_seconds else 0,
+        'Median Response Time': aggregated['Median Response Time'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares generator throughput per core of STUser, FastSTUser and the asyncio engine.")
+    parser.add_argument("--host", default=None, help="Target host (defaults to a local mock server).")
+    parser.add_argument("--mock-port", type=int, default=8766)
+    parser.add_argument("--mock-profile", default="instant")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--run-time", type=int, default=30, help="Seconds per client run.")
+    parser.add_argument("--pool-size", type=int, default=0)
+    args = parser.parse_args()
+
+    mock_process = None
+    host = args.host
+    if host is None:
+        host = mock_host(args.mock_port)
+        mock_process = start_mock_server(args.mock_port, args.mock_profile)
+
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            for client_name in CLIENTS:
+                print(f"--- Benchmarking {client_name}: {args.users} users, {args.run_time}s against {host} ---")
+                rows.append(run_client(client_name, host, args.users, args.run_time, args.pool_size, output_dir))
+    finally:
+        stop_mock_server(mock_process)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    summary_path = os.path.join(RESULTS_DIR, 'client_benchmark.csv')
+    with open(summary_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(pd.DataFrame(rows).to_string(index=False))
+    if rows[0]['Requests/s per Core']:
+        for row in rows[1:]:
+            speedup = row['Requests/s per Core'] / rows[0]['Requests/s per Core']
+            print(f"\n{row['Client']} sends {speedup:.2f}x the requests per CPU-second of STUser.")
+    print(f"Summary saved to: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from history_analysis import steady_state_window, stream_window_throughput
+from results_catalog import DEFAULT_HOST, RUN_METADATA_FILENAME, open_catalog
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_BASE_DIR = os.path.join(BASE_DIR, 'results')
+MODEL_DIRNAME = 'capacity_model'
+REPORT_FILENAME = 'capacity_report.md'
+# Closed-loop workloads, where -u is the concurrency; open-loop and replay runs set their own rates
+CLOSED_LOOP_LOCUSTFILES = {'sarvamai_benchmarking.py', 'fast_benchmarking.py', 'corpus_benchmarking.py'}
+# The knee is where throughput falls this far below linear scaling from one user
+KNEE_EFFICIENCY = 0.8
+PREDICTION_USERS = [50, 100, 200, 500]
+BOOTSTRAP_RESAMPLES = 2000
+# Fixed so rerunning the script over the same runs reproduces the committed model and report
+DEFAULT_SEED = 20240601
+CONFIDENCE = 0.95
+# A language is called out when its p95 is at least this multiple of the run's aggregated p95
+SLOW_LANGUAGE_FACTOR = 2.0
+# Languages listed per run in the report's p95 section, slowest first
+SLOWEST_LANGUAGES = 3
+
+
+def run_locustfile(config_path):
+    # Runs predating run_metadata.json were all STUser runs
+    metadata_path = os.path.join(config_path, RUN_METADATA_FILENAME)
+    if not os.path.exists(metadata_path):
+        return 'sarvamai_benchmarking.py'
+    with open(metadata_path) as f:
+        return json.load(f).get('locustfile', 'sarvamai_benchmarking.py')
+
+
+def collect_runs(results_dir=RESULTS_BASE_DIR, host=DEFAULT_HOST):
+    """
+    One row per closed-loop run against `host`: users, steady-state throughput (falling
+    back to the whole-run Requests/s), error rate, average/p50/p75/p95 latency, whether
+    the load generator saturated, plus every run's per-language report_stats rows.
+    """
+    from generator_health import generator_warning
+
+    with open_catalog(results_dir) as catalog:
+        runs = catalog.runs()
+        stats = catalog.stats()
+    rows = []
+    for config, path, users, run_host in zip(runs['config'], runs['path'], runs['users'], runs['host']):
+        config_path = os.path.join(results_dir, path)
+        if (run_host or DEFAULT_HOST) != host or pd.isna(users) or run_locustfile(config_path) not in CLOSED_LOOP_LOCUSTFILES:
+            continue
+        aggregated = stats[(stats['config'] == config) & (stats['Name'] == 'Aggregated')]
+        if aggregated.empty or not aggregated['Request Count'].iloc[0]:
+            continue
+        aggregated = aggregated.iloc[0]
+        throughput = aggregated['Requests/s']
+        error_rate = aggregated['Failure Count'] / aggregated['Request Count'] * 100
+        try:
+            _, steady_start, steady_end = steady_state_window(config_path)
+            steady = stream_window_throughput(config_path, steady_start, steady_end).loc['Aggregated']
+            if steady['Requests'] > 0 and np.isfinite(steady['Throughput']):
+                throughput, error_rate = steady['Throughput'], steady['Failure Rate']
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+        rows.append({
+            'Configuration': config, 'Users': int(users), 'Throughput': float(throughput),
+            'Error Rate': float(error_rate), 'Average': aggregated['Average Response Time'],
+            'p50': aggregated['50%'], 'p75': aggregated['75%'], 'p95': aggregated['95%'],
+            'Generator Saturated': generator_warning(config_path) is not None,
+        })
+    measured = pd.DataFrame(rows)
+    languages = stats[stats['config'].isin(measured['Configuration'] if not measured.empty else [])]
+    return measured, languages[languages['Name'] != 'Aggregated']
+
+
+def fit_usl(users, throughput):
+    """
+    Least-squares fit of the Universal Scalability Law X(N) = lambda N / (1 + sigma (N-1)
+    + kappa N (N-1)) in its linear form N/X = a + b (N-1) + c N (N-1), with a = 1/lambda,
+    b = sigma/lambda and c = kappa/lambda. Contention and coherency can't be negative, so
+    when the free fit makes b or c negative they are pinned at zero and the rest refitted.
+    Returns (lambda, sigma, kappa).
+    """
+    users = np.asarray(users, dtype=float)
+    y = users / np.asarray(throughput, dtype=float)
+    columns = np.column_stack([np.ones_like(users), users - 1, users * (users - 1)])
+    best, best_error = None, np.inf
+    for free in ([0, 1, 2], [0, 1], [0, 2], [0]):
+        coefficients = np.zeros(3)
+        coefficients[free] = np.linalg.lstsq(columns[:, free], y, rcond=None)[0]
+        if coefficients[0] <= 0 or (coefficients[1:] < 0).any():
+            continue
+        error = np.sum((columns @ coefficients - y) ** 2)
+        if error < best_error - 1e-12:
+            best, best_error = coefficients, error
+    a, b, c = best
+    return 1 / a, b / a, c / a
+
+
+def usl_throughput(users, lam, sigma, kappa):
+    users = np.asarray(users, dtype=float)
+    return lam * users / (1 + sigma * (users - 1) + kappa * users * (users - 1))
+
+
+def usl_peak(lam, sigma, kappa):
+    """
+    (concurrency, throughput) at the USL's maximum; (inf, asymptote) when there is none.
+    """
+    if kappa <= 0:
+        return np.inf, (lam / sigma if sigma > 0 else np.inf)
+    users = np.sqrt((1 - sigma) / kappa) if sigma < 1 else 1.0
+    users = max(users, 1.0)
+    return users, float(usl_throughput(users, lam, sigma, kappa))
+
+
+def usl_knee(sigma, kappa, efficiency=KNEE_EFFICIENCY):
+    """
+    Lowest concurrency whose throughput is `efficiency` x linear scaling, i.e. where
+    sigma (N-1) + kappa N (N-1) = 1/efficiency - 1. inf when that never happens.
+    """
+    target = 1 / efficiency - 1
+    if kappa <= 0:
+        return 1 + target / sigma if sigma > 0 else np.inf
+    # kappa N^2 + (sigma - kappa) N - (sigma + target) = 0
+    return float((-(sigma - kappa) + np.sqrt((sigma - kappa) ** 2 + 4 * kappa * (sigma + target))) / (2 * kappa))
+
+
+def think_time(measured):
+    """
+    Mean think time Z from Little's law for closed loops, N = X (R + Z), as the median of
+    N/X - R over the runs (R in seconds).
+    """
+    return max(float(np.median(measured['Users'] / measured['Throughput'] - measured['Average'] / 1000)), 0.0)
+
+
+def bootstrap_usl(users, throughput, resamples=BOOTSTRAP_RESAMPLES, seed=DEFAULT_SEED):
+    """
+    Residual bootstrap of the linearised fit: the fitted N/X plus resampled residuals,
+    refitted `resamples` times. Returns an array of (lambda, sigma, kappa) rows.
+    """
+    rng = np.random.default_rng(seed)
+    users = np.asarray(users, dtype=float)
+    lam, sigma, kappa = fit_usl(users, throughput)
+    fitted = users / usl_throughput(users, lam, sigma, kappa)
+    residuals = users / np.asarray(throughput, dtype=float) - fitted
+    samples = []
+    for _ in range(resamples):
+        y = fitted + rng.choice(residuals, size=len(residuals), replace=True)
+        if (y <= 0).any():
+            continue
+        samples.append(fit_usl(users, users / y))
+    return np.array(samples)
+
+
+def interval(values, confidence=CONFIDENCE):
+    values = np.asarray(values, dtype=float)
+    tail = (1 - confidence) / 2 * 100
+    # No interpolation, so an unbounded (inf) bound stays inf instead of turning into NaN
+    return float(np.percentile(values, tail, method='lower')), float(np.percentile(values, 100 - tail, method='higher'))
+
+
+def build_model(measured, resamples=BOOTSTRAP_RESAMPLES, seed=DEFAULT_SEED):
+    """
+    USL fit with bootstrap intervals, peak, knee and predictions (throughput and, by the
+    response time law R = N/X - Z, latency) at the measured and PREDICTION_USERS levels.
+    """
+    users, throughput = measured['Users'].to_numpy(), measured['Throughput'].to_numpy()
+    lam, sigma, kappa = fit_usl(users, throughput)
+    samples = bootstrap_usl(users, throughput, resamples, seed)
+    peaks = np.array([usl_peak(*sample) for sample in samples])
+    knees = np.array([usl_knee(sample[1], sample[2]) for sample in samples])
+    z = think_time(measured)
+    peak_users, peak_throughput = usl_peak(lam, sigma, kappa)
+    fit = {
+        'lambda': lam, 'sigma': sigma, 'kappa': kappa, 'think_time': z,
+        'lambda_ci': interval(samples[:, 0]), 'sigma_ci': interval(samples[:, 1]), 'kappa_ci': interval(samples[:, 2]),
+        'peak_users': peak_users, 'peak_throughput': peak_throughput,
+        'peak_users_ci': interval(peaks[:, 0]), 'peak_throughput_ci': interval(peaks[:, 1]),
+        'knee_users': usl_knee(sigma, kappa), 'knee_users_ci': interval(knees),
+        'resamples': len(samples), 'seed': seed,
+    }
+    grid_max = max(users.max() * 4, max(PREDICTION_USERS))
+    if np.isfinite(peak_users):
+        grid_max = max(grid_max, peak_users * 2)
+    grid = np.unique(np.concatenate([np.linspace(1, grid_max, 200), users, PREDICTION_USERS]))
+    curves = np.array([usl_throughput(grid, *sample) for sample in samples])
+    low, high = np.percentile(curves, [(1 - CONFIDENCE) / 2 * 100, (1 + CONFIDENCE) / 2 * 100], axis=0)
+    predicted = usl_throughput(grid, lam, sigma, kappa)
+    predictions = pd.DataFrame({
+        'Users': grid, 'Throughput': predicted, 'Throughput Low': low, 'Throughput High': high,
+        'Latency (ms)': np.maximum(grid / predicted - z, 0) * 1000,
+        'Latency Low (ms)': np.maximum(grid / high - z, 0) * 1000,
+        'Latency High (ms)': np.maximum(grid / low - z, 0) * 1000,
+    })
+    return fit, predictions
+
+
+def plot_model(measured, fit, predictions, output_path):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, (throughput_ax, latency_ax) = plt.subplots(1, 2, figsize=(16, 7))
+    throughput_ax.fill_between(predictions['Users'], predictions['Throughput Low'], predictions['Throughput High'],
+                               color='tab:blue', alpha=0.2, label=f'{CONFIDENCE:.0%} bootstrap band')
+    throughput_ax.plot(predictions['Users'], predictions['Throughput'], color='tab:blue', label='USL fit')
+    throughput_ax.plot(predictions['Users'], fit['lambda'] * predictions['Users'], color='grey', linestyle=':',
+                       label='Linear scaling')
+    throughput_ax.scatter(measured['Users'], measured['Throughput'], color='black', zorder=3, label='Measured')
+    for users, label in ((fit['knee_users'], 'knee'), (fit['peak_users'], 'peak')):
+        if np.isfinite(users) and users <= predictions['Users'].max():
+            throughput_ax.axvline(users, color='tab:red', linestyle='--', alpha=0.6)
+            throughput_ax.annotate(f'{label} ~{users:.0f} users', (users, 0), rotation=90, va='bottom', ha='right')
+    throughput_ax.set_ylim(0, predictions['Throughput High'].max() * 1.1)
+    throughput_ax.set_xlabel('Concurrent Users')
+    throughput_ax.set_ylabel('Throughput (requests/s)')
+    throughput_ax.set_title('Throughput vs Concurrency (Universal Scalability Law)')
+    throughput_ax.legend(loc='upper left')
+
+    latency_ax.fill_between(predictions['Throughput'], predictions['Latency Low (ms)'],
+                            predictions['Latency High (ms)'], color='tab:orange', alpha=0.2,
+                            label=f'{CONFIDENCE:.0%} bootstrap band')
+    latency_ax.plot(predictions['Throughput'], predictions['Latency (ms)'], color='tab:orange',
+                    label=f"Response time law, think time {fit['think_time']:.1f}s")
+    latency_ax.scatter(measured['Throughput'], measured['Average'], color='black', zorder=3, label='Measured average')
+    latency_ax.set_xlabel('Throughput (requests/s)')
+    latency_ax.set_ylabel('Average Latency (ms)')
+    latency_ax.set_ylim(0, max(measured['Average'].max(), predictions['Latency (ms)'].max()) * 3)
+    latency_ax.set_title('Latency vs Throughput')
+    latency_ax.legend(loc='upper left')
+    for ax in (throughput_ax, latency_ax):
+        ax.grid(linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+    print(f"Generated: {output_path}")
+
+
+def format_number(value, digits=1, suffix=''):
+    if not np.isfinite(value):
+        return 'unbounded'
+    return f'{value:,.{digits}f}{suffix}'
+
+
+def format_interval(bounds, digits=1):
+    return f'{format_number(bounds[0], digits)} – {format_number(bounds[1], digits)}'
+
+
+def markdown_table(df):
+    lines = ['| ' + ' | '.join(df.columns) + ' |', '|' + '---|' * len(df.columns)]
+    lines += ['| ' + ' | '.join(str(value) for value in row) + ' |' for row in df.itertuples(index=False)]
+    return '\n'.join(lines)
+
+
+def write_report(measured, languages, fit, predictions, host, output_path):
+    """
+    Writes the capacity report: measured latency, throughput and errors per run, the
+    per-language p95 table, the scalability model and the bottlenecks it implies.
+    """
+    ordered = measured.sort_values(['Users', 'Configuration'])
+    lines = [
+        '# Capacity Report',
+        '',
+        f'_Generated by `python src/capacity_model.py` from {len(measured)} closed-loop runs against {host}, '
+        f'with bootstrap seed {fit["seed"]}. Edit the script, not this file._',
+        '',
+        '## 1. Overall Latency Across Configurations',
+        '',
+        '![Overall Latency Comparison](overall_charts/overall_latency_comparison.png)',
+        '',
+        markdown_table(pd.DataFrame({
+            'Configuration': ordered['Configuration'] + np.where(ordered['Generator Saturated'], ' ⚠', ''),
+            'Users': ordered['Users'],
+            'p50 (ms)': ordered['p50'].round(0).astype(int), 'p75 (ms)': ordered['p75'].round(0).astype(int),
+            'p95 (ms)': ordered['p95'].round(0).astype(int), 'Average (ms)': ordered['Average'].round(1),
+        })),
+        '',
+    ]
+    lowest, highest = ordered.loc[ordered['p95'].idxmin()], ordered.loc[ordered['p95'].idxmax()]
+    lines.append(f"Aggregated p95 ranges from {lowest['p95']:.0f} ms (`{lowest['Configuration']}`) to "
+                 f"{highest['p95']:.0f} ms (`{highest['Configuration']}`).")
+    if ordered['Generator Saturated'].any():
+        lines.append('⚠ marks runs whose load generator saturated; they are left out of the model.')
+
+    lines += ['', '## 2. Requests per Second and Error Rate', '',
+              '![Overall RPS and Error Rate](overall_charts/overall_rps_error_rate.png)', '',
+              markdown_table(pd.DataFrame({
+                  'Configuration': ordered['Configuration'], 'Users': ordered['Users'],
+                  'Steady Requests/s': ordered['Throughput'].round(2),
+                  'Error Rate (%)': ordered['Error Rate'].round(3),
+              })), '']
+    busiest = ordered.loc[ordered['Throughput'].idxmax()]
+    lines.append(f"The highest throughput is {busiest['Throughput']:.2f} requests/s at {busiest['Users']} users "
+                 f"(`{busiest['Configuration']}`).")
+    failing = ordered[ordered['Error Rate'] > 0]
+    if failing.empty:
+        lines.append('No run had failed requests.')
+    else:
+        first = failing.iloc[0]
+        lines.append(f"Errors first appear at {first['Users']} users (`{first['Configuration']}`, "
+                     f"{first['Error Rate']:.3f}%).")
+
+    lines += ['', '## 3. Language-wise p95 Latency', '']
+    p95 = languages.pivot_table(index='Name', columns='config', values='95%')
+    p95 = p95[[config for config in ordered['Configuration'] if config in p95.columns]]
+    aggregated = ordered.set_index('Configuration')['p95']
+    slow = []
+    table = pd.DataFrame({'Language': p95.index})
+    for config in p95.columns:
+        column = []
+        for language, value in p95[config].items():
+            if pd.isna(value):
+                column.append('–')
+            elif value >= SLOW_LANGUAGE_FACTOR * aggregated[config]:
+                column.append(f'**{value:.0f}**')
+                slow.append((config, language, value))
+            else:
+                column.append(f'{value:.0f}')
+        table[config] = column
+    lines.append(markdown_table(table))
+    lines.append('')
+    lines.append(f'Bold: p95 at least {SLOW_LANGUAGE_FACTOR:g}x the run\'s aggregated p95. '
+                 'Each run\'s chart is in its folder, e.g. '
+                 f"`{ordered['Configuration'].iloc[-1]}/{ordered['Configuration'].iloc[-1]}_language_p95_latency.png`.")
+    lines += ['', 'Slowest languages per run:', '']
+    for config in p95.columns:
+        slowest = p95[config].dropna().nlargest(SLOWEST_LANGUAGES)
+        names = ', '.join(f"{language} ({value:.0f} ms)" for language, value in slowest.items())
+        lines.append(f"* `{config}` (aggregated p95 {aggregated[config]:.0f} ms): {names}")
+
+    lines += ['', '## 4. Scalability Model', '',
+              '![Capacity Model](capacity_model/capacity_model.png)', '',
+              f"A Universal Scalability Law fit of steady-state throughput against concurrency, "
+              f"X(N) = λN / (1 + σ(N−1) + κN(N−1)), with {CONFIDENCE:.0%} intervals from "
+              f"{fit['resamples']} residual-bootstrap refits:", '',
+              markdown_table(pd.DataFrame([
+                  ['λ (requests/s per user at N=1)', format_number(fit['lambda'], 4), format_interval(fit['lambda_ci'], 4)],
+                  ['σ (contention)', format_number(fit['sigma'], 4), format_interval(fit['sigma_ci'], 4)],
+                  ['κ (coherency)', format_number(fit['kappa'], 6), format_interval(fit['kappa_ci'], 6)],
+                  ['Peak throughput (requests/s)', format_number(fit['peak_throughput'], 2),
+                   format_interval(fit['peak_throughput_ci'], 2)],
+                  ['Concurrency at peak (users)', format_number(fit['peak_users'], 0),
+                   format_interval(fit['peak_users_ci'], 0)],
+                  [f'Knee: throughput {KNEE_EFFICIENCY:.0%} of linear (users)', format_number(fit['knee_users'], 0),
+                   format_interval(fit['knee_users_ci'], 0)],
+              ], columns=['Parameter', 'Estimate', f'{CONFIDENCE:.0%} interval'])), '',
+              f"Little's law for a closed loop, N = X (R + Z), puts the users' think time Z at "
+              f"{fit['think_time']:.2f}s. The latency predictions below use the response time law R = N/X − Z.", '']
+    at_levels = predictions[predictions['Users'].isin(PREDICTION_USERS)]
+    lines.append(markdown_table(pd.DataFrame({
+        'Users': at_levels['Users'].astype(int),
+        'Predicted Requests/s': at_levels['Throughput'].round(2),
+        f'{CONFIDENCE:.0%} band': [f'{low:.2f} – {high:.2f}' for low, high in
+                                   zip(at_levels['Throughput Low'], at_levels['Throughput High'])],
+        'Predicted Average Latency (ms)': at_levels['Latency (ms)'].round(0).astype(int),
+        f'Latency {CONFIDENCE:.0%} band (ms)': [f'{low:.0f} – {high:.0f}' for low, high in
+                                               zip(at_levels['Latency Low (ms)'], at_levels['Latency High (ms)'])],
+    })))
+    lines.append('')
+    tested = int(measured.loc[~measured['Generator Saturated'], 'Users'].max())
+    lines.append(f'Predictions beyond {tested} users extrapolate past the tested range, so the band widens with them.')
+
+    lines += ['', '## 5. Identified Bottlenecks and Thresholds', '']
+    if not failing.empty:
+        lines.append(f"* **Errors:** the error rate becomes non-zero at {failing.iloc[0]['Users']} users "
+                     f"(`{failing.iloc[0]['Configuration']}`) and peaks at {failing['Error Rate'].max():.3f}%.")
+    for config, group in pd.DataFrame(slow, columns=['config', 'language', 'p95']).groupby('config', sort=False):
+        names = ', '.join(f"{language} ({value:.0f} ms)" for language, value in zip(group['language'], group['p95']))
+        lines.append(f"* **Language degradation in `{config}`:** {names}, against an aggregated p95 of "
+                     f"{aggregated[config]:.0f} ms.")
+    if np.isfinite(fit['peak_users']):
+        lines.append(f"* **Predicted peak:** {fit['peak_throughput']:.2f} requests/s at about {fit['peak_users']:.0f} "
+                     f"users; beyond that, adding users lowers throughput.")
+    else:
+        lines.append(f"* **Predicted peak:** no coherency penalty shows in the measured runs, so the model has no "
+                     f"finite peak; the {CONFIDENCE:.0%} band puts it at {format_interval(fit['peak_throughput_ci'], 2)} "
+                     f"requests/s. Test at higher concurrency to pin it down.")
+    if np.isfinite(fit['knee_users']):
+        lines.append(f"* **Knee:** throughput drops below {KNEE_EFFICIENCY:.0%} of linear scaling at about "
+                     f"{fit['knee_users']:.0f} users ({format_interval(fit['knee_users_ci'], 0)}).")
+    lines.append('')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    print(f"Generated: {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fits a scalability model across runs and writes the capacity report.")
+    parser.add_argument("--results-dir", default=RESULTS_BASE_DIR)
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Model the runs made against this target.")
+    parser.add_argument("--resamples", type=int, default=BOOTSTRAP_RESAMPLES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed for the bootstrap bands.")
+    args = parser.parse_args()
+
+    measured, languages = collect_runs(args.results_dir, args.host)
+    usable = measured[~measured['Generator Saturated']] if not measured.empty else measured
+    if usable.empty or usable['Users'].nunique() < 3:
+        print(f"Need closed-loop runs at 3 or more concurrency levels against {args.host} to fit a model.")
+        return
+    fit, predictions = build_model(usable, args.resamples, args.seed)
+
+    model_dir = os.path.join(args.results_dir, MODEL_DIRNAME)
+    os.makedirs(model_dir, exist_ok=True)
+    measured.to_csv(os.path.join(model_dir, 'measured_runs.csv'), index=False)
+    predictions.to_csv(os.path.join(model_dir, 'usl_predictions.csv'), index=False)
+    pd.DataFrame([{key: (f'{value[0]};{value[1]}' if isinstance(value, tuple) else value)
+                   for key, value in fit.items()}]).to_csv(os.path.join(model_dir, 'usl_fit.csv'), index=False)
+    plot_model(usable, fit, predictions, os.path.join(model_dir, 'capacity_model.png'))
+    write_report(measured, languages, fit, predictions, args.host, os.path.join(args.results_dir, REPORT_FILENAME))
+
+    print(f"\nUSL: lambda={fit['lambda']:.4f}, sigma={fit['sigma']:.4f}, kappa={fit['kappa']:.6f}; "
+          f"peak {format_number(fit['peak_throughput'], 2)} req/s at {format_number(fit['peak_users'], 0)} users, "
+          f"knee at {format_number(fit['knee_users'], 0)} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+import argparse
+import csv
+import math
+import os
+import subprocess
+import time
+
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from distributed_runner import run_distributed_test
+from languages import LANGUAGE_NAMES
+from mock_server import DEFAULT_PORT, LATENCY_PROFILES, mock_host, start_mock_server, stop_mock_server
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+OPEN_LOOP_LOCUSTFILE_PATH = os.path.join(BASE_DIR, 'open_loop_benchmarking.py')
+ISOLATED_LOCUSTFILE_PATH = os.path.join(BASE_DIR, 'isolated_benchmarking.py')
+RESULTS_DIR = os.path.join(BASE_DIR, "..", 'results')
+CAPACITY_DIR = os.path.join(RESULTS_DIR, 'capacity_search')
+PARALLEL_CAPACITY_DIR = os.path.join(CAPACITY_DIR, 'parallel')
+
+TRIAL_FIELDS = ['Language', 'Offered RPS', 'Achieved RPS', 'Requests', 'p95 Latency', 'Error Rate',
+                'Throttled', 'Max Retry-After', 'Sustainable', 'Reason']
+# Lines of Locust's stderr shown when a trial fails to run
+STDERR_TAIL_LINES = 15
+SUMMARY_FIELDS = ['Language', 'Max Sustainable RPS', 'p95 at Max', 'Error Rate at Max', 'First Failing RPS',
+                  'Breach Reason', 'Trials']
+
+
+def read_trial_result(csv_prefix, language):
+    """
+    Reads one trial's language row from report_stats.csv, its steady throughput from
+    report_stats_history.csv (the language's own rows when the trial ran several
+    languages with --csv-full-history) and its throttling info from report_schedule_lag.csv.
+    """
+    if not os.path.exists(f"{csv_prefix}_stats.csv"):
+        return None
+    stats = pd.read_csv(f"{csv_prefix}_stats.csv").set_index('Name')
+    if language not in stats.index:
+        return None
+    row = stats.loc[language]
+    lag_path = f"{csv_prefix}_schedule_lag.csv"
+    throttled, retry_after = 0, 0.0
+    if os.path.exists(lag_path):
+        lag = pd.read_csv(lag_path).set_index('Name')
+        if language in lag.index:
+            throttled = int(lag.loc[language, 'Throttled Count'])
+            retry_after = float(lag.loc[language, 'Max Retry-After'])
+    requests = int(row['Request Count'])
+    # The final Requests/s includes the ramp-up, so measure completions over the second half of the run
+    history = pd.read_csv(f"{csv_prefix}_stats_history.csv")
+    history = history[history['Name'] == (language if (history['Name'] == language).any() else 'Aggregated')]
+    achieved_rps = 0.0
+    if len(history) > 2:
+        middle, last = history.iloc[len(history) // 2], history.iloc[-1]
+        if last['Timestamp'] > middle['Timestamp']:
+            achieved_rps = ((last['Total Request Count'] - middle['Total Request Count'])
+                            / (last['Timestamp'] - middle['Timestamp']))
+    return {
+        'Achieved RPS': round(float(achieved_rps), 3),
+        'Requests': requests,
+        'p95 Latency': float(row['95%']) if requests else float('nan'),
+        'Error Rate': (row['Failure Count'] / requests) * 100 if requests > 0 else 100.0,
+        'Throttled': throttled,
+        'Max Retry-After': retry_after,
+    }
+
+
+def check_slo(result, args):
+    """
+    Returns (sustainable, reason) for one trial result. Open-loop latencies include
+    schedule lag, so a backlog that the API cannot drain shows up as a p95 breach.
+    """
+    if result is None or result['Requests'] == 0:
+        return False, "no completed requests"
+    if result['Throttled']:
+        return False, f"{result['Throttled']} x 429"
+    if result['Error Rate'] > args.slo_error_rate:
+        return False, f"error rate {result['Error Rate']:.2f}% > {args.slo_error_rate}%"
+    if result['p95 Latency'] > args.slo_p95_ms:
+        return False, f"p95 {result['p95 Latency']:.0f}ms > {args.slo_p95_ms}ms"
+    return True, "ok"
+
+
+def users_for_rate(offered_rps, args):
+    # Enough users to keep the schedule served even if every request took 4x the SLO
+    return math.ceil(offered_rps * max(args.slo_p95_ms / 1000 * 4, 1)) + 5
+
+
+def run_locust_trial(locustfile, users, trial_dir, extra_args, args, host, env):
+    """
+    Runs one trial and returns (csv_prefix, error): `error` is None when Locust ran and
+    wrote its reports, otherwise a short reason, so one broken trial doesn't end the search.
+    """
+    csv_prefix = os.path.join(trial_dir, 'report')
+    if args.workers:
+        exit_code = run_distributed_test(locustfile, users, users, f"{args.step_duration}s", trial_dir,
+                                         args.workers, host, env, extra_args=extra_args, log=lambda message: None)
+        stderr = f"see {os.path.join(trial_dir, 'master.log')}"
+    else:
+        command = [
+            "locust",
+            "-f", locustfile,
+            "--headless",
+            "-u", str(users),
+            "-r", str(users),
+            "--run-time", f"{args.step_duration}s",
+            "--csv", csv_prefix,
+            "--only-summary",
+        ] + extra_args
+        if host:
+            command += ["--host", host]
+        completed = subprocess.run(command, capture_output=True, text=True, env=env)
+        exit_code, stderr = completed.returncode, "\n".join(completed.stderr.splitlines()[-STDERR_TAIL_LINES:])
+    # Locust exits with 1 whenever any request failed; that is a result, not a broken trial
+    error = None
+    if exit_code not in (0, 1):
+        error = f"locust failed (exit code {exit_code})"
+    elif not os.path.exists(f"{csv_prefix}_stats.csv"):
+        error = "locust failed (no report_stats.csv)"
+    if error:
+        print(f"    !! {error}:\n{stderr}")
+    return csv_prefix, error
+
+
+def trial_result(language, offered_rps, csv_prefix, args, error=None):
+    result = None if error else read_trial_result(csv_prefix, language)
+    sustainable, reason = (False, error) if error else check_slo(result, args)
+    trial = {'Language': language, 'Offered RPS': offered_rps, 'Sustainable': sustainable, 'Reason': reason}
+    trial.update(result or {'Achieved RPS': 0, 'Requests': 0, 'p95 Latency': float('nan'), 'Error Rate': 100.0,
+                            'Throttled': 0, 'Max Retry-After': 0.0})
+    print(f"    -> {language}: p95 {trial['p95 Latency']}ms, errors {trial['Error Rate']:.2f}%, "
+          f"{'sustainable' if sustainable else 'SLO breached: ' + reason}")
+    return trial
+
+
+def cool_down(trials, args):
+    # Give the API time to recover before the next step, honouring any Retry-After it sent
+    pause = max([args.cooldown] + [trial['Max Retry-After'] for trial in trials if not trial['Sustainable']])
+    if pause:
+        time.sleep(pause)
+
+
+def run_trial(language, offered_rps, args, host, env):
+    trial_dir = os.path.join(CAPACITY_DIR, language, f"r{offered_rps:g}")
+    os.makedirs(trial_dir, exist_ok=True)
+    users = users_for_rate(offered_rps, args)
+    print(f"  Trial {language} @ {offered_rps:g} req/s ({users} users, {args.step_duration}s)")
+    csv_prefix, error = run_locust_trial(OPEN_LOOP_LOCUSTFILE_PATH, users, trial_dir,
+                                         ["--language-rates", f"{language}={offered_rps:g}"], args, host, env)
+    trial = trial_result(language, offered_rps, csv_prefix, args, error)
+    cool_down([trial], args)
+    return trial
+
+
+def run_parallel_trial(step, rates, args, host, env):
+    """
+    Runs every language in `rates` at once, each as its own user class with its own
+    users and arrival schedule (isolated_benchmarking.py), and returns one trial per language.
+    """
+    trial_dir = os.path.join(PARALLEL_CAPACITY_DIR, f"step{step}")
+    os.makedirs(trial_dir, exist_ok=True)
+    users = {language: users_for_rate(rate, args) for language, rate in rates.items()}
+    print(f"  Step {step}: " + ", ".join(f"{language} @ {rate:g} req/s" for language, rate in rates.items())
+          + f" ({sum(users.values())} users, {args.step_duration}s)")
+    extra_args = [
+        "--language-rates", ",".join(f"{language}={rate:g}" for language, rate in rates.items()),
+        "--language-users", ",".join(f"{language}={count}" for language, count in users.items()),
+        # Per-language history rows, so each language's achieved throughput is measured on its own
+        "--csv-full-history",
+    ] + [f"{language}User" for language in rates]
+    csv_prefix, error = run_locust_trial(ISOLATED_LOCUSTFILE_PATH, sum(users.values()), trial_dir, extra_args,
+                                         args, host, env)
+    trials = [trial_result(language, rate, csv_prefix, args, error) for language, rate in rates.items()]
+    for trial in trials:
+        trial['Step'] = step
+    cool_down(trials, args)
+    return trials
+
+
+class LanguageSearch:
+    """
+    One language's search: doubles the offered rate until the SLO breaks, then bisects
+    between the last sustainable and first failing rate until they are within --tolerance.
+    """
+
+    def __init__(self, language, args):
+        self.language = language
+        self.args = args
+        self.trials = []
+        self.best, self.failing = None, None
+        self.rate = args.start_rps if args.start_rps <= args.max_rps else None
+
+    def next_rate(self):
+        """
+        The next rate to try, or None once the search is over.
+        """
+        return None if self.rate is None else round(self.rate, 3)
+
+    def record(self, trial):
+        self.trials.append(trial)
+        if trial['Sustainable']:
+            self.best = trial
+        else:
+            self.failing = trial
+        if self.failing is None:
+            self.rate *= self.args.step_factor
+            if self.rate > self.args.max_rps:
+                self.rate = None
+        elif self.best is None:
+            self.rate = None
+        else:
+            low, high = self.best['Offered RPS'], self.failing['Offered RPS']
+            self.rate = (low + high) / 2 if (high - low) / high > self.args.tolerance else None
+
+    def summary(self):
+        best, failing = self.best, self.failing
+        return {
+            'Language': self.language,
+            'Max Sustainable RPS': best['Offered RPS'] if best else 0.0,
+            'p95 at Max': best['p95 Latency'] if best else float('nan'),
+            'Error Rate at Max': best['Error Rate'] if best else float('nan'),
+            'First Failing RPS': failing['Offered RPS'] if failing else float('nan'),
+            'Breach Reason': failing['Reason'] if failing else f"no breach up to {self.args.max_rps} req/s",
+            'Trials': len(self.trials),
+        }
+
+
+def search_language(language, args, host, env):
+    search = LanguageSearch(language, args)
+    while search.next_rate() is not None:
+        search.record(run_trial(language, search.next_rate(), args, host, env))
+    return search.summary(), search.trials
+
+
+def search_languages_in_parallel(languages, args, host, env):
+    """
+    Runs every language's search at the same time: each step drives all languages still
+    searching, each at its own next rate, so one sweep yields every language's curve.
+    """
+    searches = [LanguageSearch(language, args) for language in languages]
+    step = 0
+    while True:
+        rates = {search.language: search.next_rate() for search in searches if search.next_rate() is not None}
+        if not rates:
+            break
+        step += 1
+        trials = {trial['Language']: trial for trial in run_parallel_trial(step, rates, args, host, env)}
+        for search in searches:
+            if search.language in trials:
+                search.record(trials[search.language])
+    for search in searches:
+        print(f"--- {search.language}: max sustainable {search.summary()['Max Sustainable RPS']:g} req/s ---")
+    return [search.summary() for search in searches], [trial for search in searches for trial in search.trials]
+
+
+def plot_knee(trials_df, summary_df, slo_p95_ms, output_path, title='Capacity Search'):
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
+    for language, group in trials_df.sort_values('Offered RPS').groupby('Language'):
+        line, = ax1.plot(group['Offered RPS'], group['p95 Latency'], marker='o', label=language)
+        ax2.plot(group['Offered RPS'], group['Achieved RPS'], marker='o', color=line.get_color(), label=language)
+        knee = summary_df.set_index('Language').loc[language, 'Max Sustainable RPS']
+        if knee > 0:
+            ax1.axvline(knee, color=line.get_color(), linestyle=':', alpha=0.6)
+
+    ax1.axhline(slo_p95_ms, color='tab:red', linestyle='--', label=f'p95 SLO ({slo_p95_ms:g}ms)')
+    ax1.set_ylabel('p95 Latency (ms)')
+    ax1.set_title(f'{title}: p95 Latency vs Offered Load (dotted lines mark max sustainable RPS)')
+    ax1.grid(axis='y', linestyle='--', alpha=0.7)
+    ax1.legend(loc='upper left', ncol=2)
+
+    max_rps = trials_df['Offered RPS'].max()
+    ax2.plot([0, max_rps], [0, max_rps], color='grey', linestyle='--', label='Offered = Achieved')
+    ax2.set_xlabel('Offered Load (requests/s)')
+    ax2.set_ylabel('Achieved Throughput (requests/s)')
+    ax2.grid(axis='y', linestyle='--', alpha=0.7)
+
+    fig.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
+    print(f"Generated: {output_path}")
+
+
+def write_csv(path, fieldnames, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Finds the maximum sustainable open-loop RPS per language.")
+    parser.add_argument("--languages", default="all", help="Comma-separated language names, or 'all'.")
+    parser.add_argument("--slo-p95-ms", type=float, default=1000.0, help="p95 latency SLO in ms.")
+    parser.add_argument("--slo-error-rate", type=float, default=1.0, help="Error-rate SLO in percent.")
+    parser.add_argument("--start-rps", type=float, default=0.5)
+    parser.add_argument("--step-factor", type=float, default=2.0, help="Multiplier between ramp steps.")
+    parser.add_argument("--max-rps", type=float, default=200.0, help="Stop ramping at this rate per language.")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Stop bisecting once the sustainable/failing gap is within this fraction.")
+    parser.add_argument("--step-duration", type=int, default=60, help="Seconds per trial.")
+    parser.add_argument("--cooldown", type=float, default=10.0, help="Seconds to pause between trials.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Search every language at once, each with its own user class, users and rate.")
+    parser.add_argument("--workers", type=int, default=0, help="Run trials distributed over this many workers.")
+    parser.add_argument("--host", default=None, help="Override the target host.")
+    parser.add_argument("--mock", action="store_true", help="Search against the local mock server.")
+    parser.add_argument("--mock-port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--mock-profile", default="baseline",
+                        help=f"Mock latency profile ({', '.join(LATENCY_PROFILES)}) or path to a JSON profile.")
+    parser.add_argument("--mock-args", default="", help="Extra mock server arguments, e.g. '--rate-limit 20'.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    languages = LANGUAGE_NAMES if args.languages == "all" else [name.strip() for name in args.languages.split(",")]
+    unknown = set(languages) - set(LANGUAGE_NAMES)
+    if unknown:
+        print(f"ERROR: unknown languages: {', '.join(sorted(unknown))}")
+        return
+
+    host, mock_process = args.host, None
+    env = dict(os.environ)
+    if args.mock:
+        env["SARVAM_API_KEY"] = os.getenv("SARVAM_API_KEY", "mock-key")
+        host = mock_host(args.mock_port)
+        mock_process = start_mock_server(args.mock_port, args.mock_profile, args.mock_args.split())
+    elif not os.getenv("SARVAM_API_KEY"):
+        print("\nERROR: SARVAM_API_KEY environment variable is not set.")
+        return
+
+    output_dir = PARALLEL_CAPACITY_DIR if args.parallel else CAPACITY_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    summaries, all_trials = [], []
+    try:
+        if args.parallel:
+            print(f"\n--- Parallel capacity search for {', '.join(languages)} ---")
+            summaries, all_trials = search_languages_in_parallel(languages, args, host, env)
+        else:
+            for language in languages:
+                print(f"\n--- Capacity search for {language} ---")
+                summary, trials = search_language(language, args, host, env)
+                summaries.append(summary)
+                all_trials.extend(trials)
+                print(f"--- {language}: max sustainable {summary['Max Sustainable RPS']:g} req/s ---")
+    finally:
+        stop_mock_server(mock_process)
+
+    summary_path = os.path.join(output_dir, 'capacity_summary.csv')
+    write_csv(summary_path, SUMMARY_FIELDS, summaries)
+    write_csv(os.path.join(output_dir, 'capacity_trials.csv'), (['Step'] if args.parallel else []) + TRIAL_FIELDS,
+              all_trials)
+    print(f"\nSummary saved to: {summary_path}")
+    print(pd.DataFrame(summaries).to_string(index=False))
+
+    plot_knee(pd.DataFrame(all_trials), pd.DataFrame(summaries), args.slo_p95_ms,
+              os.path.join(output_dir, 'capacity_knee.png'),
+              'Parallel Capacity Search' if args.parallel else 'Capacity Search')
+
+
+if __name__ == "__main__":
+    main()
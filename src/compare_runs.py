@@ -0,0 +1,302 @@
+import argparse
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from history_analysis import raw_requests_frame, steady_state_window, window_rows
+from latency_histogram import LatencyHistogram, load_histograms
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_BASE_DIR = os.path.join(BASE_DIR, 'results')
+DEFAULT_PERCENTILES = [50, 95, 99]
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+# A change only counts as a regression when it is significant AND at least this large
+DEFAULT_THRESHOLD_PERCENT = 10.0
+DEFAULT_ERROR_THRESHOLD_POINTS = 0.5
+# Below this many requests in either run a name's row is "insufficient data": a one-request
+# histogram bootstraps to a constant, so its p-value is always 0 or 1
+DEFAULT_MIN_REQUESTS = 30
+# Columns of report_stats.csv used to rebuild an approximate distribution when a run has no HDR data
+STATS_PERCENTILES = [50, 66, 75, 80, 90, 95, 98, 99, 99.9, 99.99, 100]
+
+
+def resolve_run(run):
+    """
+    Accepts a run folder path or a configuration name under results/.
+    """
+    path = run if os.path.isdir(run) else os.path.join(RESULTS_BASE_DIR, run)
+    if not os.path.exists(os.path.join(path, 'report_stats.csv')):
+        raise SystemExit(f"No report_stats.csv in {path}")
+    return path
+
+
+def histograms_from_stats(stats):
+    """
+    Approximate per-name histograms rebuilt from report_stats.csv: each name's
+    Request Count latencies spread by linear interpolation between its min and
+    reported percentiles.
+    """
+    histograms = {}
+    for row in stats.itertuples(index=False):
+        count = int(row[stats.columns.get_loc('Request Count')])
+        if count == 0:
+            continue
+        points = [row[stats.columns.get_loc('Min Response Time')]] \
+            + [row[stats.columns.get_loc(f"{p:g}%")] for p in STATS_PERCENTILES]
+        quantiles = [0.0] + [p / 100 for p in STATS_PERCENTILES]
+        histogram = LatencyHistogram()
+        histogram.record_ms(np.interp((np.arange(count) + 0.5) / count, quantiles, np.maximum.accumulate(points)))
+        histograms[row[stats.columns.get_loc('Name')]] = histogram
+    return histograms
+
+
+class RunSamples:
+    """
+    What one run contributes to a comparison: per-name latency histograms, per-second
+    request counts inside the steady-state window and whole-run failure counts.
+
+    Latency comes from the most exact source available: raw records inside the
+    steady-state window, else the run's HDR histograms (whole run), else a
+    distribution rebuilt from report_stats.csv.
+    """
+
+    def __init__(self, config_path):
+        self.config_path = config_path
+        self.name = os.path.basename(os.path.normpath(config_path))
+        self.stats = pd.read_csv(os.path.join(config_path, 'report_stats.csv'))
+        self.requests = dict(zip(self.stats['Name'], self.stats['Request Count']))
+        self.failures = dict(zip(self.stats['Name'], self.stats['Failure Count']))
+        # Whole-run length as Locust measured it for report_stats.csv's Requests/s
+        aggregated = self.stats[self.stats['Name'] == 'Aggregated'].iloc[0]
+        self.duration = aggregated['Request Count'] / aggregated['Requests/s'] if aggregated['Requests/s'] else 1.0
+
+        _, self.start, self.end = steady_state_window(config_path)
+        self.seconds = max(self.end + 1 - self.start, 1)
+        raw = raw_requests_frame(config_path)
+        if raw is not None:
+            window = raw[(raw['Timestamp'] >= self.start) & (raw['Timestamp'] < self.end + 1)]
+            self.histograms = {}
+            for name, latencies in window.groupby('Name', observed=True)['Latency']:
+                self.histograms[name] = LatencyHistogram()
+                self.histograms[name].record_ms(latencies.to_numpy())
+            self.histograms['Aggregated'] = LatencyHistogram()
+            self.histograms['Aggregated'].record_ms(window['Latency'].to_numpy())
+            seconds = np.floor(window['Timestamp'].to_numpy() - self.start).astype(np.int64)
+            self.per_second = {name: np.bincount(seconds[(window['Name'] == name).to_numpy()], minlength=self.seconds)
+                               for name in window['Name'].cat.categories}
+            self.per_second['Aggregated'] = np.bincount(seconds, minlength=self.seconds)
+            self.latency_source = 'raw'
+            return
+
+        self.histograms = load_histograms(config_path)
+        self.latency_source = 'hdr'
+        if not self.histograms:
+            self.histograms = histograms_from_stats(self.stats)
+            self.latency_source = 'report_stats'
+        # Default histories only carry the Aggregated row
+        self.per_second = {}
+        window = pd.concat(window_rows(config_path, self.start, self.end,
+                                       usecols=['Timestamp', 'Name', 'Total Request Count']), ignore_index=True)
+        for name, rows in window.groupby('Name'):
+            elapsed = np.diff(rows['Timestamp'].to_numpy())
+            counts = np.diff(rows['Total Request Count'].to_numpy())
+            if (elapsed > 0).sum() >= 2:
+                self.per_second[name] = counts[elapsed > 0] / elapsed[elapsed > 0]
+
+    @property
+    def names(self):
+        return set(self.histograms) | set(self.per_second)
+
+
+def bootstrap_percentiles(histogram, percentiles, resamples, rng):
+    """
+    (resamples x percentiles) array of percentiles of multinomial resamples of the
+    histogram: each resample redraws the same number of requests from its buckets.
+    Only non-empty buckets take part, which keeps the arrays small.
+    """
+    occupied = np.flatnonzero(histogram.counts)
+    counts = histogram.counts[occupied]
+    total = int(counts.sum())
+    cumulative = np.cumsum(rng.multinomial(total, counts / total, size=resamples), axis=1)
+    values = histogram.values_for(occupied) / 1000.0
+    ranks = np.ceil(np.asarray(percentiles, dtype=np.float64) / 100.0 * total).clip(1, total)
+    result = np.empty((resamples, len(percentiles)))
+    for j, rank in enumerate(ranks):
+        result[:, j] = values[(cumulative < rank).sum(axis=1)]
+    return result
+
+
+def bootstrap_throughput(run, name, resamples, rng):
+    """
+    Resampled steady-state requests/s: the mean of per-second counts redrawn with
+    replacement when the run has them for this name, otherwise a Poisson redraw of
+    the name's whole-run request count.
+    """
+    per_second = run.per_second.get(name)
+    if per_second is not None and len(per_second) >= 2:
+        indexes = rng.integers(0, len(per_second), size=(resamples, len(per_second)))
+        return per_second[indexes].mean(axis=1), float(np.mean(per_second))
+    requests = run.requests.get(name, 0)
+    return rng.poisson(requests, resamples) / run.duration, requests / run.duration
+
+
+def two_sided_p_value(differences):
+    """
+    Bootstrap p-value for "no difference": how often the resampled difference falls
+    on either side of zero.
+    """
+    below, above = np.mean(differences <= 0), np.mean(differences >= 0)
+    return float(min(1.0, 2 * min(below, above)))
+
+
+def proportion_p_value(failures_a, requests_a, failures_b, requests_b):
+    """
+    Two-proportion z-test on failure rates.
+    """
+    if not requests_a or not requests_b:
+        return 1.0
+    pooled = (failures_a + failures_b) / (requests_a + requests_b)
+    variance = pooled * (1 - pooled) * (1 / requests_a + 1 / requests_b)
+    if variance == 0:
+        return 1.0
+    z = (failures_b / requests_b - failures_a / requests_a) / math.sqrt(variance)
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def compare(baseline, candidate, percentiles, resamples, confidence, threshold, error_threshold, alpha, rng,
+            min_requests=DEFAULT_MIN_REQUESTS):
+    """
+    One row per (name, metric): both runs' estimates with confidence intervals, the
+    relative change, its p-value and a verdict. Higher latency, lower throughput and
+    a higher failure rate are regressions when significant at `alpha` and larger
+    than the thresholds. Rows where either run has fewer than `min_requests` requests
+    behind the metric are "insufficient data" and never count as a regression.
+    """
+    low_q, high_q = (1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100
+    names = sorted(baseline.names & candidate.names - {'Aggregated'}) + ['Aggregated']
+    rows = []
+
+    def add_row(name, metric, base, base_samples, cand, cand_samples, worse_when_higher, counts):
+        change = (cand - base) / base * 100 if base else float('nan')
+        if min(counts) < min_requests:
+            p_value, verdict = float('nan'), 'insufficient data'
+        else:
+            p_value = two_sided_p_value(cand_samples - base_samples)
+            worse = change > threshold if worse_when_higher else change < -threshold
+            better = change < -threshold if worse_when_higher else change > threshold
+            significant = p_value < alpha
+            verdict = 'regression' if significant and worse else 'improvement' if significant and better else 'no change'
+        rows.append({
+            'Name': name, 'Metric': metric,
+            'Baseline': base, 'Baseline Low': np.percentile(base_samples, low_q),
+            'Baseline High': np.percentile(base_samples, high_q),
+            'Candidate': cand, 'Candidate Low': np.percentile(cand_samples, low_q),
+            'Candidate High': np.percentile(cand_samples, high_q),
+            'Change (%)': change, 'p-value': p_value, 'Verdict': verdict,
+        })
+
+    for name in names:
+        base_histogram, cand_histogram = baseline.histograms.get(name), candidate.histograms.get(name)
+        if base_histogram is not None and cand_histogram is not None \
+                and base_histogram.total_count and cand_histogram.total_count:
+            base_values = base_histogram.percentiles_ms(percentiles)
+            cand_values = cand_histogram.percentiles_ms(percentiles)
+            base_samples = bootstrap_percentiles(base_histogram, percentiles, resamples, rng)
+            cand_samples = bootstrap_percentiles(cand_histogram, percentiles, resamples, rng)
+            counts = (base_histogram.total_count, cand_histogram.total_count)
+            for j, p in enumerate(percentiles):
+                add_row(name, f"p{p:g} (ms)", base_values[j], base_samples[:, j],
+                        cand_values[j], cand_samples[:, j], True, counts)
+
+        base_samples, base_rate = bootstrap_throughput(baseline, name, resamples, rng)
+        cand_samples, cand_rate = bootstrap_throughput(candidate, name, resamples, rng)
+        requests_a, failures_a = baseline.requests.get(name, 0), baseline.failures.get(name, 0)
+        requests_b, failures_b = candidate.requests.get(name, 0), candidate.failures.get(name, 0)
+        add_row(name, 'Requests/s', base_rate, base_samples, cand_rate, cand_samples, False, (requests_a, requests_b))
+
+        if requests_a and requests_b:
+            rate_a, rate_b = failures_a / requests_a * 100, failures_b / requests_b * 100
+            if min(requests_a, requests_b) < min_requests:
+                p_value, verdict = float('nan'), 'insufficient data'
+            else:
+                p_value = proportion_p_value(failures_a, requests_a, failures_b, requests_b)
+                significant = p_value < alpha
+                verdict = 'regression' if significant and rate_b - rate_a > error_threshold else \
+                    'improvement' if significant and rate_a - rate_b > error_threshold else 'no change'
+            rows.append({
+                'Name': name, 'Metric': 'Failure Rate (%)', 'Baseline': rate_a, 'Candidate': rate_b,
+                'Change (%)': rate_b - rate_a, 'p-value': p_value, 'Verdict': verdict,
+            })
+    return pd.DataFrame(rows)
+
+
+def print_comparison(baseline, candidate, result):
+    print(f"\n--- {candidate.name} vs baseline {baseline.name} ---")
+    for run in (baseline, candidate):
+        print(f"{run.name}: latency from {run.latency_source}, steady state {run.start}-{run.end}")
+    table = result.copy()
+    for column in ['Baseline', 'Candidate']:
+        interval = ' [' + table[f'{column} Low'].map('{:.1f}'.format) + '-' + table[f'{column} High'].map('{:.1f}'.format) + ']'
+        table[column] = table[column].map('{:.1f}'.format) + interval.where(table[f'{column} Low'].notna(), '')
+    table['Change (%)'] = table['Change (%)'].map('{:+.1f}'.format)
+    table['p-value'] = table['p-value'].map('{:.3f}'.format).where(table['p-value'].notna(), '-')
+    print(table[['Name', 'Metric', 'Baseline', 'Candidate', 'Change (%)', 'p-value', 'Verdict']].to_string(index=False))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compares runs against the first (baseline) with bootstrap confidence intervals. "
+                    "Exits with 1 when any regression is found.")
+    parser.add_argument("runs", nargs="+", help="Run folders or configuration names under results/; the first is the baseline.")
+    parser.add_argument("--percentiles", default=",".join(str(p) for p in DEFAULT_PERCENTILES),
+                        help="Latency percentiles to compare, e.g. '50,95,99'.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PERCENT,
+                        help="Smallest relative change in latency or throughput (%%) that counts as a regression.")
+    parser.add_argument("--error-threshold", type=float, default=DEFAULT_ERROR_THRESHOLD_POINTS,
+                        help="Smallest failure rate increase (percentage points) that counts as a regression.")
+    parser.add_argument("--min-requests", type=int, default=DEFAULT_MIN_REQUESTS,
+                        help="Fewest requests per name in each run for its rows to be tested; below it they are "
+                             "reported as insufficient data.")
+    parser.add_argument("--alpha", type=float, default=1 - DEFAULT_CONFIDENCE, help="Significance level.")
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible resampling.")
+    parser.add_argument("--output", default=None, help="Also write every comparison row to this CSV.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if len(args.runs) < 2:
+        raise SystemExit("Give at least two runs: a baseline and one or more candidates.")
+    percentiles = [float(p) for p in args.percentiles.split(",")]
+    rng = np.random.default_rng(args.seed)
+    baseline = RunSamples(resolve_run(args.runs[0]))
+    results = []
+    for run in args.runs[1:]:
+        candidate = RunSamples(resolve_run(run))
+        result = compare(baseline, candidate, percentiles, args.resamples, 1 - args.alpha, args.threshold,
+                         args.error_threshold, args.alpha, rng, args.min_requests)
+        print_comparison(baseline, candidate, result)
+        results.append(result.assign(**{'Baseline Run': baseline.name, 'Candidate Run': candidate.name}))
+
+    combined = pd.concat(results, ignore_index=True)
+    if args.output:
+        combined.to_csv(args.output, index=False)
+        print(f"\nComparison saved to {args.output}")
+    regressions = combined[combined['Verdict'] == 'regression']
+    if regressions.empty:
+        print("\nNo regressions found.")
+        return 0
+    print(f"\n{len(regressions)} regression(s) found:")
+    for run, name, metric, base, cand in regressions[['Candidate Run', 'Name', 'Metric', 'Baseline', 'Candidate']].itertuples(
+            index=False, name=None):
+        print(f"  {run} {name} {metric}: {base:.1f} -> {cand:.1f}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+from locust import HttpUser, task, between, events
+from locust.runners import MasterRunner
+
+from phase_timing import install_phase_timing
+from sarvamai_benchmarking import SARVAM_API_KEY, WAIT_TIME_RANGE
+from workload_corpus import CORPUS_DIR, CorpusWorkload
+
+HEADERS = {
+    "api-subscription-key": SARVAM_API_KEY or "",
+    "Content-Type": "application/json",
+}
+
+workload = None
+
+
+@events.init_command_line_parser.add_listener
+def add_corpus_arguments(parser):
+    parser.add_argument("--corpus-dir", type=str, default=CORPUS_DIR,
+                        help="Folder of per-language corpus files (<language code>.txt, one input per line).")
+    parser.add_argument("--language-weights", type=str, default="",
+                        help="Traffic mix, e.g. 'Hindi=5,Tamil=2,Odia=1'. Defaults to every language equally.")
+    parser.add_argument("--length-weights", type=str, default="",
+                        help="Input-length mix, e.g. 'word=1,sentence=3,paragraph=1'. Defaults to equal buckets.")
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    global workload
+    options = environment.parsed_options
+    if options is None or isinstance(environment.runner, MasterRunner):
+        return
+    workload = CorpusWorkload(options.corpus_dir, options.language_weights, options.length_weights)
+    workload.describe()
+
+
+class CorpusSTUser(HttpUser):
+    """
+    STUser driven by the corpus files: inputs of varying length and a weighted language
+    mix instead of one fixed greeting per language. Requests are named
+    "<language> [<length bucket>]".
+    """
+    wait_time = between(*WAIT_TIME_RANGE)
+    host = "https://api.sarvam.ai"
+
+    def on_start(self):
+        if not SARVAM_API_KEY:
+            self.environment.process_exit_code = 1
+            raise Exception("SARVAM_API_KEY is not set. Cannot proceed with tests!")
+        install_phase_timing(self.client)
+
+    @task
+    def transliterate_corpus_input(self):
+        name, payload = workload.next_request()
+        self.client.post('/transliterate', json=payload, headers=HEADERS, name=name)
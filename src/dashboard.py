@@ -1,57 +1,177 @@
 import streamlit as st
+import pandas as pd
 import subprocess
 import os
 import glob
 import time
+from async_engine import build_command as build_async_engine_command
 from generate_individual_charts import generate_charts_for_config
+from distributed_runner import DistributedRun, default_worker_count
+from history_tail import HistoryTail, live_metrics
+from generator_health import generator_warning
+from results_catalog import write_run_metadata
+from mock_server import DEFAULT_PORT, LATENCY_PROFILES, mock_host, start_mock_server, stop_mock_server
 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 LOCUSTFILE_PATH = os.path.join(PROJECT_ROOT, 'sarvamai_benchmarking.py')
+FAST_LOCUSTFILE_PATH = os.path.join(PROJECT_ROOT, 'fast_benchmarking.py')
+OPEN_LOOP_LOCUSTFILE_PATH = os.path.join(PROJECT_ROOT, 'open_loop_benchmarking.py')
 RESULTS_BASE_DIR = os.path.join(PROJECT_ROOT, '..', 'results')
 
-def trigger_locust_test(users, spawn_rate, run_time_minutes, api_or_test_case):
+LIVE_REFRESH_SECONDS = 2
+LIVE_WINDOW_SECONDS = 600 # Seconds of history kept in the live charts
+
+
+class LocalLocustRun:
+    """
+    A single-process headless Locust run, started without blocking so the dashboard
+    can poll it. Output goes to locust.log in the run's folder.
+    """
+
+    def __init__(self, command, output_dir, env=None):
+        self.log_path = os.path.join(output_dir, "locust.log")
+        self.log_file = open(self.log_path, "w")
+        self.process = subprocess.Popen(command, stdout=self.log_file, stderr=subprocess.STDOUT, env=env)
+
+    def poll(self):
+        return self.process.poll()
+
+    def cancel(self):
+        # SIGTERM lets Locust stop the users and still write its final CSV reports
+        if self.process.poll() is None:
+            self.process.terminate()
+
+    def close(self):
+        self.cancel()
+        self.process.wait()
+        self.log_file.close()
+        return self.process.returncode
+
+
+def request_cancel(output_dir):
+    st.session_state.cancelled_run = output_dir
+
+
+def log_tail(path, lines=40):
+    if not os.path.exists(path):
+        return ""
+    with open(path, errors="replace") as f:
+        return "".join(f.readlines()[-lines:])
+
+
+def monitor_run(run, output_dir, max_error_rate=None):
+    """
+    Streams live RPS, p50/p95 and error rate from report_stats_history.csv until the
+    run exits. Returns True if it was cancelled for exceeding `max_error_rate` (%).
+    """
+    tail = HistoryTail(os.path.join(output_dir, "report_stats_history.csv"))
+    metric_columns = st.columns(4)
+    metric_placeholders = [column.empty() for column in metric_columns]
+    rps_chart, latency_chart, error_chart = st.empty(), st.empty(), st.empty()
+    history = None
+    auto_cancelled = False
+    while run.poll() is None:
+        new_rows = tail.read_new()
+        if not new_rows.empty:
+            metrics = live_metrics(new_rows)
+            history = metrics if history is None else pd.concat([history, metrics])
+            history = history[history.index > history.index.max() - LIVE_WINDOW_SECONDS]
+            if not history.empty:
+                latest = history.iloc[-1]
+                metric_placeholders[0].metric("Users", f"{latest['User Count']:.0f}")
+                metric_placeholders[1].metric("RPS", f"{latest['Requests/s']:.2f}")
+                metric_placeholders[2].metric("p95 (ms)", f"{latest['95%']:.0f}" if pd.notna(latest['95%']) else "N/A")
+                metric_placeholders[3].metric("Error rate", f"{latest['Error Rate (%)']:.1f}%")
+                rps_chart.line_chart(history[['Requests/s']])
+                latency_chart.line_chart(history[['50%', '95%']])
+                error_chart.line_chart(history[['Error Rate (%)']])
+                if (max_error_rate and not auto_cancelled and latest['Requests/s'] > 0
+                        and latest['Error Rate (%)'] > max_error_rate):
+                    st.warning(f"Error rate {latest['Error Rate (%)']:.1f}% exceeded {max_error_rate}%; stopping the test early.")
+                    run.cancel()
+                    auto_cancelled = True
+        time.sleep(LIVE_REFRESH_SECONDS)
+    return auto_cancelled
+
+
+def trigger_locust_test(users, spawn_rate, run_time_minutes, api_or_test_case, host=None, env=None,
+                        locustfile=LOCUSTFILE_PATH, workers=0, extra_args=(), max_error_rate=None, engine="locust"):
     st.info(f"Starting test for: {api_or_test_case} with {users} users, {spawn_rate} spawn rate, {run_time_minutes} min run time.")
 
     timestamp = time.strftime("%Y%m%d-%H%M%S")
     config_name = f"c{users}_s{spawn_rate}_rt{run_time_minutes}m_{timestamp}"
     output_dir = os.path.join(RESULTS_BASE_DIR, config_name)
     os.makedirs(output_dir, exist_ok=True)
+    write_run_metadata(output_dir, users, spawn_rate, f"{run_time_minutes}m", host, engine=engine,
+                       locustfile=os.path.basename(locustfile), workers=workers, extra_args=list(extra_args))
 
     command = [
         "locust",
-        "-f", LOCUSTFILE_PATH,
+        "-f", locustfile,
         "--headless",
         "-u", str(users),
         "-r", str(spawn_rate),
         "--run-time", f"{run_time_minutes}m",
         "--csv", os.path.join(output_dir, "report"),
     ]
+    if host:
+        command += ["--host", host]
+    command += list(extra_args)
+    if engine == "asyncio":
+        command = build_async_engine_command(users, spawn_rate, f"{run_time_minutes}m",
+                                             os.path.join(output_dir, "report"), host)
 
-    st.write(f"Executing command: `{' '.join(command)}`")
-
-    process = None
+    run = None
     try:
-        with st.spinner(f"Running Locust test for {config_name}... This might take a while..."):
-            process = subprocess.run(command, capture_output=True, text=True, check=True)
-        st.success(f"Locust test completed for {config_name}!")
-        st.write(f"Results saved to: `{output_dir}`")
-        generate_charts_for_config(output_dir)
-        png_files = glob.glob(os.path.join(output_dir, "*.png"))
-        if png_files:
-            for png_file in png_files:
-                st.image(png_file, caption=os.path.basename(png_file), use_container_width=True)
+        if workers:
+            run = DistributedRun(locustfile, users, spawn_rate, f"{run_time_minutes}m", output_dir, workers, host,
+                                 env, extra_args=extra_args, log=st.write)
+            log_path = os.path.join(output_dir, "master.log")
         else:
-            st.info("No chart image was generated for this test run.")
+            st.write(f"Executing command: `{' '.join(command)}`")
+            run = LocalLocustRun(command, output_dir, env)
+            log_path = run.log_path
+        st.button("Cancel running test", key=f"cancel_{config_name}", on_click=request_cancel, args=(output_dir,))
+        with st.spinner(f"Running Locust test for {config_name}... Live metrics refresh every {LIVE_REFRESH_SECONDS}s."):
+            auto_cancelled = monitor_run(run, output_dir, max_error_rate)
+        run, exit_code = None, run.close()
+        if exit_code != 0 and not auto_cancelled:
+            raise subprocess.CalledProcessError(exit_code, command[0], log_tail(log_path), "")
+        if auto_cancelled:
+            st.warning(f"Locust test stopped early for {config_name}; the reports cover the run up to that point.")
+        else:
+            st.success(f"Locust test completed for {config_name}!")
+        st.write(f"Results saved to: `{output_dir}`")
+        saturation_warning = generator_warning(output_dir)
+        if saturation_warning:
+            st.warning(saturation_warning)
+        show_charts(output_dir)
     except subprocess.CalledProcessError as e:
         st.error(f"Locust test failed for {config_name} with exit code {e.returncode}:")
-        st.code(e.stdout)
-        st.code(e.stderr)
+        st.code(e.output)
         if output_dir and os.path.exists(output_dir):
             st.warning(f"Partial results might be in: {output_dir}")
     except FileNotFoundError:
         st.error(f"Error: 'locust' command not found. Ensure Locust is installed and in your PATH.")
     except Exception as e:
         st.error(f"An unexpected error occurred during test execution for {config_name}: {e}")
+    finally:
+        # Reached with the run still open when the Cancel button reruns the script;
+        # Streamlit calls can't be made from here, so log to the console instead.
+        if run is not None:
+            if hasattr(run, "log"):
+                run.log = print
+            run.close()
+
+
+def show_charts(output_dir):
+    generate_charts_for_config(output_dir)
+    png_files = glob.glob(os.path.join(output_dir, "*.png"))
+    if png_files:
+        for png_file in png_files:
+            st.image(png_file, caption=os.path.basename(png_file), use_container_width=True)
+    else:
+        st.info("No chart image was generated for this test run.")
 
 ## Streamlit UI
 st.set_page_config(
@@ -74,6 +194,52 @@ api_options = {
 }
 selected_api = st.selectbox("Select API / Test Case for all configurations:", list(api_options.keys()))
 
+engine_options = {
+    "Locust (gevent)": "locust",
+    "asyncio (aiohttp, for very high user counts)": "asyncio",
+}
+engine = engine_options[st.selectbox("Load engine:", list(engine_options.keys()))]
+
+client_options = {
+    "Standard (requests-based STUser)": LOCUSTFILE_PATH,
+    "Fast (pooled, pre-serialized FastSTUser)": FAST_LOCUSTFILE_PATH,
+}
+if engine == "asyncio":
+    st.caption("The asyncio engine runs the closed-loop STUser workload in a single process; "
+               "client, open-loop and distributed options don't apply.")
+selected_client = st.selectbox("Load generator client:", list(client_options.keys()), disabled=engine == "asyncio")
+if engine == "locust" and client_options[selected_client] == FAST_LOCUSTFILE_PATH:
+    pool_size = st.number_input("Shared connection pool size (0 = one connection per user):", min_value=0, value=0, step=1)
+else:
+    pool_size = 0
+
+arrival_rate = st.number_input("Open-loop arrival rate (requests/s, 0 = closed loop with think time):",
+                               min_value=0.0, value=0.0, step=0.5, disabled=engine == "asyncio")
+language_rates = ""
+if arrival_rate > 0 and engine == "locust":
+    language_rates = st.text_input("Per-language rates (optional, e.g. Malayalam=2,Hindi=0.5):", value="")
+    st.caption("In open-loop mode 'Users' is the pool available to serve the schedule; size it to cover rate x worst-case latency.")
+
+use_distributed = st.checkbox("Distributed mode (one master plus a worker process per core)", value=False,
+                              disabled=engine == "asyncio")
+if use_distributed and engine == "locust":
+    worker_count = st.number_input("Worker processes:", min_value=1, value=default_worker_count(), step=1)
+else:
+    worker_count = 0
+
+max_error_rate = st.number_input("Stop a test early if its live error rate exceeds (%, 0 = never):",
+                                 min_value=0.0, max_value=100.0, value=0.0, step=5.0)
+
+use_mock_server = st.checkbox("Target local mock server (offline, no API key needed)", value=False)
+if use_mock_server:
+    mock_profile = st.selectbox("Mock latency profile:", list(LATENCY_PROFILES.keys()), index=1)
+
+if st.session_state.get('cancelled_run'):
+    cancelled_dir = st.session_state.pop('cancelled_run')
+    st.warning(f"Test cancelled; remaining configurations were skipped. Partial results are in: `{cancelled_dir}`")
+    if os.path.exists(os.path.join(cancelled_dir, 'report_stats.csv')):
+        show_charts(cancelled_dir)
+
 st.subheader("Add Test Configurations")
 
 # Button to add a new configuration
@@ -112,16 +278,37 @@ if st.session_state.test_configs:
 if st.session_state.test_configs:
     if st.button("Trigger All Locust Tests"):
         st.header("Starting All Configured Tests")
-        for i, config in enumerate(st.session_state.test_configs):
-            st.markdown(f"## Running Test Configuration {i+1}")
-            trigger_locust_test(
-                config["users"],
-                config["spawn_rate"],
-                config["run_time_minutes"],
-                selected_api
-            )
-            st.success(f"Finished Configuration {i+1}")
-            st.markdown("---")
+        host, mock_process = None, None
+        env = dict(os.environ, SARVAM_POOL_SIZE=str(pool_size))
+        if use_mock_server:
+            host = mock_host(DEFAULT_PORT)
+            env["SARVAM_API_KEY"] = os.getenv("SARVAM_API_KEY", "mock-key")
+            mock_process = start_mock_server(DEFAULT_PORT, mock_profile)
+            st.info(f"Local mock server running at {host} (profile: {mock_profile})")
+        locustfile, extra_args = client_options[selected_client], []
+        if arrival_rate > 0 and engine == "locust":
+            locustfile = OPEN_LOOP_LOCUSTFILE_PATH
+            extra_args = ["--arrival-rate", str(arrival_rate), "--language-rates", language_rates]
+        try:
+            for i, config in enumerate(st.session_state.test_configs):
+                st.markdown(f"## Running Test Configuration {i+1}")
+                trigger_locust_test(
+                    config["users"],
+                    config["spawn_rate"],
+                    config["run_time_minutes"],
+                    selected_api,
+                    host,
+                    env,
+                    locustfile,
+                    worker_count,
+                    extra_args,
+                    max_error_rate or None,
+                    engine
+                )
+                st.success(f"Finished Configuration {i+1}")
+                st.markdown("---")
+        finally:
+            stop_mock_server(mock_process)
         st.balloons()
         st.success("All configured tests have been completed!")
 else:
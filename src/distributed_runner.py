@@ -0,0 +1,199 @@
+import csv
+import os
+import subprocess
+import time
+
+import psutil
+
+from latency_histogram import write_percentile_summary
+from phase_report import merge_phase_reports
+from status_breakdown import write_status_reports
+
+DEFAULT_MASTER_PORT = 5557
+HEALTH_CHECK_INTERVAL = 2
+# Workers pinned above this CPU share are likely saturating and skewing latencies.
+WORKER_CPU_WARNING_PERCENT = 90
+MAX_WORKER_RESTARTS = 2
+
+
+def default_worker_count():
+    return os.cpu_count() or 1
+
+
+def build_master_command(locustfile, users, spawn_rate, run_time, csv_prefix, workers, host=None,
+                         master_port=DEFAULT_MASTER_PORT, extra_args=()):
+    command = [
+        "locust",
+        "-f", locustfile,
+        "--master",
+        "--headless",
+        "-u", str(users),
+        "-r", str(spawn_rate),
+        "--run-time", run_time,
+        "--csv", csv_prefix,
+        "--expect-workers", str(workers),
+        "--expect-workers-max-wait", "60",
+        "--master-bind-port", str(master_port),
+    ]
+    if host:
+        command += ["--host", host]
+    return command + list(extra_args)
+
+
+def build_worker_command(locustfile, master_port=DEFAULT_MASTER_PORT, host=None):
+    command = [
+        "locust",
+        "-f", locustfile,
+        "--worker",
+        "--master-host", "127.0.0.1",
+        "--master-port", str(master_port),
+    ]
+    if host:
+        command += ["--host", host]
+    return command
+
+
+class WorkerProcess:
+    """
+    One Locust worker process, with its log file and health history.
+    """
+
+    def __init__(self, index, command, output_dir, env=None):
+        self.index = index
+        self.command = command
+        self.env = env
+        self.log_path = os.path.join(output_dir, f"worker_{index}.log")
+        self.restarts = 0
+        self.process = None
+        self.start()
+
+    def start(self):
+        with open(self.log_path, "a") as log_file:
+            self.process = subprocess.Popen(self.command, stdout=log_file, stderr=subprocess.STDOUT, env=self.env)
+        self.ps = psutil.Process(self.process.pid)
+        self.ps.cpu_percent()  # Primes the counter so the first health check returns a real value
+
+    def sample(self):
+        try:
+            return self.ps.cpu_percent(), self.ps.memory_info().rss / (1024 * 1024)
+        except psutil.Error:
+            return 0.0, 0.0
+
+    def stop(self, timeout=15):
+        if self.process.poll() is None:
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.process.terminate()
+                self.process.wait(timeout=5)
+
+
+class DistributedRun:
+    """
+    A running master plus its local workers. Call `poll()` regularly (it also runs the
+    worker health checks) and `close()` once, after the master has exited or after
+    `cancel()`.
+    """
+
+    def __init__(self, locustfile, users, spawn_rate, run_time, output_dir, workers=None, host=None, env=None,
+                 master_port=DEFAULT_MASTER_PORT, extra_args=(), log=print):
+        self.workers = workers or default_worker_count()
+        self.output_dir = output_dir
+        self.log = log
+        os.makedirs(output_dir, exist_ok=True)
+        csv_prefix = os.path.join(output_dir, "report")
+
+        master_command = build_master_command(locustfile, users, spawn_rate, run_time, csv_prefix, self.workers,
+                                              host, master_port, extra_args)
+        worker_command = build_worker_command(locustfile, master_port, host)
+        log(f"Starting Locust master with {self.workers} workers: `{' '.join(master_command)}`")
+
+        # Workers have no --csv prefix, so tell them where to stream their raw request records
+        worker_env = dict(env or os.environ, SARVAM_RAW_DIR=os.path.abspath(output_dir))
+        with open(os.path.join(output_dir, "master.log"), "w") as master_log:
+            self.master = subprocess.Popen(master_command, stdout=master_log, stderr=subprocess.STDOUT, env=env)
+        self.worker_processes = [WorkerProcess(i, worker_command, output_dir, worker_env) for i in range(self.workers)]
+
+        self.health_path = os.path.join(output_dir, "workers_health.csv")
+        self.health_file = open(self.health_path, "w", newline="")
+        self.health_writer = csv.writer(self.health_file)
+        self.health_writer.writerow(["Timestamp", "Worker", "PID", "Status", "CPU %", "RSS MB", "Restarts"])
+        self.last_health_check = time.time()
+
+    def poll(self):
+        """
+        Returns the master's exit code, or None while the test is running.
+        """
+        if self.master.poll() is None and time.time() - self.last_health_check >= HEALTH_CHECK_INTERVAL:
+            self.check_workers()
+        return self.master.poll()
+
+    def check_workers(self):
+        self.last_health_check = time.time()
+        timestamp = int(self.last_health_check)
+        for worker in self.worker_processes:
+            exit_code = worker.process.poll()
+            if exit_code is None:
+                cpu, rss = worker.sample()
+                status = "busy" if cpu >= WORKER_CPU_WARNING_PERCENT else "ok"
+                if status == "busy":
+                    self.log(f"Warning: worker {worker.index} is at {cpu:.0f}% CPU; consider more workers.")
+            else:
+                cpu, rss, status = 0.0, 0.0, f"exited({exit_code})"
+            self.health_writer.writerow([timestamp, worker.index, worker.process.pid, status, round(cpu, 1),
+                                         round(rss, 1), worker.restarts])
+            # Workers exit cleanly (code 0) when the master tells them to quit at the end of the run
+            crashed = exit_code not in (None, 0)
+            if crashed and self.master.poll() is None and worker.restarts < MAX_WORKER_RESTARTS:
+                self.log(f"Worker {worker.index} exited with code {exit_code}; restarting (see {worker.log_path}).")
+                worker.restarts += 1
+                worker.start()
+        self.health_file.flush()
+
+    def cancel(self):
+        """
+        Asks the master to stop early; Locust still writes its final CSV reports.
+        """
+        if self.master.poll() is None:
+            self.master.terminate()
+
+    def close(self):
+        """
+        Waits for the master and workers to exit, merges the workers' histograms and
+        returns the master's exit code.
+        """
+        self.cancel()
+        self.master.wait()
+        for worker in self.worker_processes:
+            worker.stop()
+        self.health_file.close()
+        write_percentile_summary(self.output_dir)
+        write_status_reports(self.output_dir)
+        merge_phase_reports(self.output_dir)
+        self.log(f"Locust master exited with code {self.master.returncode}; worker health saved to {self.health_path}")
+        return self.master.returncode
+
+
+def run_distributed_test(locustfile, users, spawn_rate, run_time, output_dir, workers=None, host=None, env=None,
+                         master_port=DEFAULT_MASTER_PORT, extra_args=(), log=print):
+    """
+    Runs one Locust test as a master plus `workers` worker processes on this machine.
+
+    The master aggregates every worker's stats into the usual report_stats.csv,
+    report_stats_history.csv, report_failures.csv and report_exceptions.csv under
+    `output_dir`, so the chart scripts read distributed runs unchanged. Worker health
+    (exit status, CPU, RSS) is sampled every few seconds into workers_health.csv and
+    crashed workers are restarted up to MAX_WORKER_RESTARTS times. Each worker's raw
+    request records and HDR histograms are merged into report_hdr_percentiles.csv, and
+    their phase timings into report_phases.csv.
+
+    Returns the master's exit code.
+    """
+    run = DistributedRun(locustfile, users, spawn_rate, run_time, output_dir, workers, host, env, master_port,
+                         extra_args, log)
+    try:
+        while run.poll() is None:
+            time.sleep(0.5)
+    finally:
+        exit_code = run.close()
+    return exit_code
@@ -0,0 +1,38 @@
+from locust import FastHttpUser, task, between
+from geventhttpclient.client import HTTPClientPool
+import os
+import random
+
+from languages import build_request_bodies
+from sarvamai_benchmarking import SARVAM_API_KEY, WAIT_TIME_RANGE
+
+# Size of the keep-alive connection pool shared by every FastSTUser in this process.
+# 0 (the default) gives each user its own single-connection pool instead.
+POOL_SIZE = int(os.getenv("SARVAM_POOL_SIZE", "0"))
+
+HEADERS = {
+    "api-subscription-key": SARVAM_API_KEY or "",
+    "Content-Type": "application/json",
+}
+
+REQUEST_BODIES = build_request_bodies()
+
+
+class FastSTUser(FastHttpUser):
+    """
+    Low-overhead equivalent of STUser: same languages, same equal task weights, but
+    pre-encoded bodies sent through geventhttpclient with pooled keep-alive connections.
+    """
+    wait_time = between(*WAIT_TIME_RANGE)
+    host = "https://api.sarvam.ai"
+    client_pool = HTTPClientPool(concurrency=POOL_SIZE) if POOL_SIZE > 0 else None
+
+    def on_start(self):
+        if not SARVAM_API_KEY:
+            self.environment.process_exit_code = 1
+            raise Exception("SARVAM_API_KEY is not set. Cannot proceed with tests!")
+
+    @task
+    def transliterate_to_english(self):
+        name, body = random.choice(REQUEST_BODIES)
+        self.client.post('/transliterate', data=body, headers=HEADERS, name=name)
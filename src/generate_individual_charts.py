@@ -1,21 +1,100 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+from phase_report import PHASES
+
+# pandas and matplotlib are imported inside the functions that need them, so that
+# early exits (missing results, nothing to redraw) don't pay for loading them. The
+# up-to-date check reads run paths straight from SQLite; only ingesting new runs
+# into the catalog loads pandas.
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RESULTS_BASE_DIR = os.path.join(BASE_DIR, 'results')
+PHASE_COLORS = ['#9467bd', '#8c564b', '#e377c2', 'skyblue', '#2ca02c']
+
+
+def use_headless_backend():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def chart_path_for_config(config_path):
+    config_name = os.path.basename(os.path.normpath(config_path))
+    return os.path.join(config_path, f'{config_name}_language_p95_latency.png')
+
+
+def phase_chart_path_for_config(config_path):
+    config_name = os.path.basename(os.path.normpath(config_path))
+    return os.path.join(config_path, f'{config_name}_phase_breakdown.png')
+
+
+def generator_chart_path_for_config(config_path):
+    config_name = os.path.basename(os.path.normpath(config_path))
+    return os.path.join(config_path, f'{config_name}_generator_health.png')
 
-def generate_charts_for_config(config_path):
+
+def soak_chart_path_for_config(config_path):
+    config_name = os.path.basename(os.path.normpath(config_path))
+    return os.path.join(config_path, f'{config_name}_soak_trend.png')
+
+
+def status_chart_path_for_config(config_path):
+    config_name = os.path.basename(os.path.normpath(config_path))
+    return os.path.join(config_path, f'{config_name}_status_breakdown.png')
+
+
+def chart_is_up_to_date(config_path):
+    """
+    True when the p95 chart exists and is newer than the run's report_stats.csv, and
+    likewise the phase breakdown, generator health, soak trend and status breakdown
+    charts when the run has a report_phases.csv, report_generator*.csv,
+    report_soak_1m.csv or report_status_timeline.csv.
+    """
+    import glob
+
+    pairs = [(chart_path_for_config(config_path), os.path.join(config_path, 'report_stats.csv'))]
+    phases_csv_path = os.path.join(config_path, 'report_phases.csv')
+    if os.path.exists(phases_csv_path):
+        pairs.append((phase_chart_path_for_config(config_path), phases_csv_path))
+    generator_csv_paths = glob.glob(os.path.join(config_path, 'report_generator*.csv'))
+    if generator_csv_paths:
+        pairs.append((generator_chart_path_for_config(config_path), max(generator_csv_paths, key=os.path.getmtime)))
+    soak_csv_path = os.path.join(config_path, 'report_soak_1m.csv')
+    if os.path.exists(soak_csv_path):
+        pairs.append((soak_chart_path_for_config(config_path), soak_csv_path))
+    status_csv_path = os.path.join(config_path, 'report_status_timeline.csv')
+    if os.path.exists(status_csv_path):
+        pairs.append((status_chart_path_for_config(config_path), status_csv_path))
+    for chart_filename, csv_path in pairs:
+        if not os.path.exists(chart_filename) or not os.path.exists(csv_path):
+            return False
+        if os.path.getmtime(chart_filename) < os.path.getmtime(csv_path):
+            return False
+    return True
+
+
+def generate_charts_for_config(config_path, df=None, phases_df=None):
     """
     Generates and saves language-wise p95 latency chart for a single configuration.
+    `df` holds the run's report_stats.csv rows; it is read from disk when not given.
+    The phase breakdown chart is drawn too when the run has report_phases.csv rows, and
+    the generator health chart when it has report_generator*.csv samples, the soak
+    trend chart for soak runs, and the status breakdown chart when the run recorded
+    per-status-class histograms.
     """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    from generator_health import generator_warning
+    from status_breakdown import THROTTLE_CLASS, load_status_percentiles
+
     stats_csv_path = os.path.join(config_path, 'report_stats.csv')
-    
-    if not os.path.exists(stats_csv_path):
-        print(f"Warning: {stats_csv_path} not found. Skipping chart generation for this config.")
-        return
 
-    df = pd.read_csv(stats_csv_path)
+    if df is None:
+        if not os.path.exists(stats_csv_path):
+            print(f"Warning: {stats_csv_path} not found. Skipping chart generation for this config.")
+            return
+        df = pd.read_csv(stats_csv_path)
 
     # Filter out the 'Aggregated' row to focus on individual languages
     language_df = df[df['Name'] != 'Aggregated']
@@ -25,41 +104,343 @@ def generate_charts_for_config(config_path):
         return
 
     # Extract configuration name for chart title and filename
-    config_name = os.path.basename(config_path)
+    config_name = os.path.basename(os.path.normpath(config_path))
 
     # --- Language-wise Latency Comparisons (p95) ---
     plt.figure(figsize=(12, 7))
-    plt.bar(language_df['Name'], language_df['95%'], color='skyblue')
+    from workload_corpus import BUCKET_NAMES, split_request_name
+    languages, buckets = zip(*[split_request_name(name) for name in language_df['Name']])
+    if any(buckets):
+        # Corpus runs name requests "<language> [<length bucket>]": one bar per bucket within each language
+        p95 = language_df.assign(Language=languages, Bucket=buckets).pivot_table(
+            index='Language', columns='Bucket', values='95%', sort=False)
+        p95 = p95[[bucket for bucket in BUCKET_NAMES if bucket in p95.columns]]
+        width = 0.8 / len(p95.columns)
+        for i, bucket in enumerate(p95.columns):
+            plt.bar([x + (i - (len(p95.columns) - 1) / 2) * width for x in range(len(p95))], p95[bucket],
+                    width=width, label=bucket)
+        plt.xticks(range(len(p95)), p95.index)
+        plt.legend(title='Input length')
+    else:
+        plt.bar(language_df['Name'], language_df['95%'], color='skyblue')
     plt.xlabel('Language')
     plt.ylabel('p95 Latency (ms)')
-    plt.title(f'Language-wise p95 Latency for {config_name} Configuration')
+    title = f'Language-wise p95 Latency for {config_name} Configuration'
+    saturated = generator_warning(config_path) is not None
+    if saturated:
+        title += '\nWARNING: load generator saturated during this run, see the generator health chart'
+    # Locust's percentiles include the fast 429 rejections, which pull them down
+    statuses = load_status_percentiles(config_path)
+    if statuses is not None:
+        throttled = statuses.loc[(statuses['Name'] == 'Aggregated') & (statuses['Status'] == THROTTLE_CLASS),
+                                 'Share (%)']
+        if not throttled.empty and throttled.iloc[0] > 0:
+            title += (f'\nNOTE: {throttled.iloc[0]:.1f}% of requests were throttled (429) and are included here, '
+                      'see the status breakdown chart')
+    plt.title(title, color='tab:red' if saturated else 'black')
     plt.xticks(rotation=45, ha='right')
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout() # Adjust layout to prevent labels from overlapping
-    
-    chart_filename = os.path.join(config_path, f'{config_name}_language_p95_latency.png')
+
+    chart_filename = chart_path_for_config(config_path)
     plt.savefig(chart_filename)
     plt.close()
     print(f"Generated: {chart_filename}")
 
+    generate_phase_chart(config_path, phases_df)
+    generate_generator_chart(config_path)
+    generate_soak_chart(config_path)
+    generate_status_chart(config_path, df)
+
+
+def generate_phase_chart(config_path, phases_df=None):
+    """
+    Stacked DNS / Connect / TLS / TTFB / Body bars per language, for all requests and
+    for the slow ones, labelled with new vs reused connection counts.
+    """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
+    phases_csv_path = os.path.join(config_path, 'report_phases.csv')
+    if phases_df is None or phases_df.empty:
+        if not os.path.exists(phases_csv_path):
+            return
+        phases_df = pd.read_csv(phases_csv_path)
+
+    config_name = os.path.basename(os.path.normpath(config_path))
+    subsets = [subset for subset in ['all', 'slow'] if (phases_df['Subset'] == subset).any()]
+    fig, axes = plt.subplots(1, len(subsets), figsize=(8 * len(subsets), 7), squeeze=False)
+    for ax, subset in zip(axes[0], subsets):
+        rows = phases_df[phases_df['Subset'] == subset]
+        labels = [f"{name}\n{new} new / {reused} reused" for name, new, reused
+                  in zip(rows['Name'], rows['New Connections'], rows['Reused Connections'])]
+        left = [0.0] * len(rows)
+        for phase, color in zip(PHASES, PHASE_COLORS):
+            values = rows[f'{phase} (ms)'].tolist()
+            ax.barh(labels, values, left=left, color=color, label=phase)
+            left = [a + b for a, b in zip(left, values)]
+        ax.invert_yaxis()
+        ax.set_xlabel('Average time (ms)')
+        title = 'All requests' if subset == 'all' else 'Slow requests (>= 1s)'
+        ax.set_title(title)
+        ax.grid(axis='x', linestyle='--', alpha=0.7)
+    axes[0][0].legend(loc='lower right')
+    fig.suptitle(f'Request Phase Breakdown for {config_name} Configuration')
+    fig.tight_layout()
+
+    chart_filename = phase_chart_path_for_config(config_path)
+    fig.savefig(chart_filename)
+    plt.close(fig)
+    print(f"Generated: {chart_filename}")
+
 
-def main():
-    if not os.path.exists(RESULTS_BASE_DIR):
-        print(f"Results directory not found at {RESULTS_BASE_DIR}. Please run load tests first.")
+def generate_generator_chart(config_path):
+    """
+    Aggregated p95 latency and requests/s over time above each load-generating process's
+    CPU and event-loop lag, with the seconds where the generator was saturated shaded
+    red in every panel.
+    """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    from generator_health import CPU_LIMIT_PERCENT, LOOP_LAG_LIMIT_MS, load_generator_samples
+    from soak_history import history_chunk_paths, iter_history
+
+    samples = load_generator_samples(config_path)
+    if not samples or not (history_chunk_paths(config_path) or
+                           os.path.exists(os.path.join(config_path, 'report_stats_history.csv'))):
         return
+    history = pd.concat(block[block['Name'] == 'Aggregated'] for block in
+                        iter_history(config_path, usecols=['Timestamp', 'Name', 'Requests/s', '95%']))
+    start = history['Timestamp'].min()
 
-    # Iterate through each configuration folder in the results directory
-    config_folders = [f for f in os.listdir(RESULTS_BASE_DIR) if os.path.isdir(os.path.join(RESULTS_BASE_DIR, f))]
-    
-    if not config_folders:
-        print(f"No configuration folders found in {RESULTS_BASE_DIR}. Please run load tests first.")
+    config_name = os.path.basename(os.path.normpath(config_path))
+    fig, axes = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
+    latency_ax, cpu_ax, lag_ax = axes
+    latency_ax.plot(history['Timestamp'] - start, history['95%'], color='tab:orange', label='p95 latency (ms)')
+    latency_ax.set_ylabel('p95 Latency (ms)')
+    rps_ax = latency_ax.twinx()
+    rps_ax.plot(history['Timestamp'] - start, history['Requests/s'], color='tab:blue', label='Requests/s')
+    rps_ax.set_ylabel('Requests/s')
+    for name, df in samples.items():
+        process = name[len('report_generator'):-len('.csv')].lstrip('_') or 'generator'
+        cpu_ax.plot(df['Timestamp'] - start, df['CPU (%)'], label=process)
+        lag_ax.plot(df['Timestamp'] - start, df['Loop Lag Max (ms)'], label=process)
+        for timestamp in df.loc[df['Saturated'].notna(), 'Timestamp']:
+            for ax in axes:
+                ax.axvspan(timestamp - start - 0.5, timestamp - start + 0.5, color='tab:red', alpha=0.2, linewidth=0)
+    cpu_ax.axhline(CPU_LIMIT_PERCENT, color='tab:red', linestyle='--', linewidth=1)
+    cpu_ax.set_ylabel('Generator CPU (%)')
+    cpu_ax.set_ylim(bottom=0)
+    lag_ax.axhline(LOOP_LAG_LIMIT_MS, color='tab:red', linestyle='--', linewidth=1)
+    lag_ax.set_ylabel('Event-loop lag, max (ms)')
+    lag_ax.set_ylim(bottom=0)
+    lag_ax.set_xlabel('Seconds since start (red: generator saturated)')
+    for ax in axes:
+        ax.grid(linestyle='--', alpha=0.7)
+    cpu_ax.legend(loc='upper left')
+    latency_ax.legend(loc='upper left')
+    rps_ax.legend(loc='upper right')
+    fig.suptitle(f'Load Generator Health for {config_name} Configuration')
+    fig.tight_layout()
+
+    chart_filename = generator_chart_path_for_config(config_path)
+    fig.savefig(chart_filename)
+    plt.close(fig)
+    print(f"Generated: {chart_filename}")
+
+
+def generate_soak_chart(config_path):
+    """
+    Soak runs: Aggregated p50/p95 per 1-minute window with the 10-minute windows and the
+    fitted p95 trend on top, above requests/s and failure rate, over hours since start.
+    """
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from soak_history import AGGREGATE_FILENAMES, load_aggregate
+
+    if not os.path.exists(os.path.join(config_path, AGGREGATE_FILENAMES['1m'])):
+        return
+    minutes = load_aggregate(config_path, '1m')
+    minutes = minutes[minutes['Name'] == 'Aggregated']
+    if minutes.empty:
+        return
+    tens = load_aggregate(config_path, '10m')
+    tens = tens[tens['Name'] == 'Aggregated']
+    start = minutes['Timestamp'].min()
+    hours = (minutes['Timestamp'] - start) / 3600
+
+    config_name = os.path.basename(os.path.normpath(config_path))
+    fig, (latency_ax, rate_ax) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
+    latency_ax.plot(hours, minutes['50%'], color='tab:blue', alpha=0.6, label='p50 (1m)')
+    latency_ax.plot(hours, minutes['95%'], color='tab:orange', alpha=0.6, label='p95 (1m)')
+    latency_ax.step((tens['Timestamp'] - start) / 3600, tens['95%'], where='post', color='tab:red',
+                    label='p95 (10m)')
+    fit = minutes.dropna(subset=['95%'])
+    if len(fit) >= 3:
+        fit_hours = (fit['Timestamp'] - start) / 3600
+        slope, intercept = np.polyfit(fit_hours, fit['95%'], 1)
+        latency_ax.plot(fit_hours, intercept + slope * fit_hours, color='black', linestyle='--',
+                        label=f'p95 trend ({slope:+.1f} ms/h)')
+    latency_ax.set_ylabel('Latency (ms)')
+    latency_ax.set_ylim(bottom=0)
+    latency_ax.legend(loc='upper left')
+    rate_ax.plot(hours, minutes['Requests/s'], color='tab:blue', label='Requests/s')
+    rate_ax.set_ylabel('Requests/s')
+    rate_ax.set_ylim(bottom=0)
+    error_ax = rate_ax.twinx()
+    error_ax.plot(hours, minutes['Failure Rate (%)'], color='tab:red', label='Failure rate (%)')
+    error_ax.set_ylabel('Failure Rate (%)')
+    error_ax.set_ylim(bottom=0)
+    rate_ax.set_xlabel('Hours since start')
+    for ax in (latency_ax, rate_ax):
+        ax.grid(linestyle='--', alpha=0.7)
+    rate_ax.legend(loc='upper left')
+    error_ax.legend(loc='upper right')
+    fig.suptitle(f'Soak Trend for {config_name} Configuration')
+    fig.tight_layout()
+
+    chart_filename = soak_chart_path_for_config(config_path)
+    fig.savefig(chart_filename)
+    plt.close(fig)
+    print(f"Generated: {chart_filename}")
+
+
+def generate_status_chart(config_path, df=None):
+    """
+    Per language: p50/p95 of successful (2xx) requests only, beside Locust's p95 over
+    every request, with the share throttled (429) or failed on the right axis. Below,
+    throttled requests per second for each language and failed requests per second.
+    """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    from status_breakdown import (ERROR_CLASSES, THROTTLE_CLASS, load_status_percentiles, load_status_timeline,
+                                  success_and_throttling)
+
+    percentiles = load_status_percentiles(config_path)
+    timeline = load_status_timeline(config_path)
+    if percentiles is None or timeline is None:
+        return
+    summary = success_and_throttling(percentiles)
+    summary = summary[summary['Name'] != 'Aggregated'].set_index('Name')
+    if summary.empty:
+        return
+    if df is None and os.path.exists(os.path.join(config_path, 'report_stats.csv')):
+        df = pd.read_csv(os.path.join(config_path, 'report_stats.csv'))
+    if df is not None:
+        summary['All p95'] = df.set_index('Name')['95%'].reindex(summary.index)
+
+    config_name = os.path.basename(os.path.normpath(config_path))
+    fig, (latency_ax, timeline_ax) = plt.subplots(2, 1, figsize=(12, 10))
+    columns = [('Success p50', 'p50, 2xx only', 'tab:blue'), ('Success p95', 'p95, 2xx only', 'tab:orange'),
+               ('All p95', 'p95, all requests (Locust)', 'lightgray')]
+    columns = [column for column in columns if column[0] in summary.columns]
+    width = 0.8 / len(columns)
+    positions = range(len(summary))
+    for i, (column, label, color) in enumerate(columns):
+        latency_ax.bar([x + (i - (len(columns) - 1) / 2) * width for x in positions], summary[column],
+                       width=width, color=color, label=label)
+    latency_ax.set_xticks(list(positions))
+    latency_ax.set_xticklabels(summary.index, rotation=45, ha='right')
+    latency_ax.set_ylabel('Latency (ms)')
+    latency_ax.grid(axis='y', linestyle='--', alpha=0.7)
+    share_ax = latency_ax.twinx()
+    share_ax.plot(list(positions), summary['Throttled (%)'], 'o', color='tab:red', label='Throttled, 429 (%)')
+    share_ax.plot(list(positions), summary['Errors (%)'], 'x', color='black', label='5xx / timeout / connection (%)')
+    share_ax.set_ylabel('Share of Requests (%)')
+    share_ax.set_ylim(bottom=0, top=max(summary['Throttled (%)'].max(), summary['Errors (%)'].max(), 1) * 1.2)
+    latency_ax.legend(loc='upper left')
+    share_ax.legend(loc='upper right')
+
+    # Soak runs' timelines are per minute; counts are divided by the window to stay per second
+    window = int(timeline['Window (s)'].iloc[0]) if 'Window (s)' in timeline.columns else 1
+    start = timeline['Timestamp'].min()
+    seconds = range(int(start), int(timeline['Timestamp'].max()) + 1, window)
+    languages = timeline[timeline['Name'] != 'Aggregated']
+    throttled = languages.pivot_table(index='Timestamp', columns='Name', values=THROTTLE_CLASS,
+                                      aggfunc='sum').reindex(seconds, fill_value=0).fillna(0) / window
+    throttled = throttled.loc[:, throttled.sum() > 0]
+    elapsed = [second - start for second in seconds]
+    if not throttled.empty:
+        timeline_ax.stackplot(elapsed, throttled.T.to_numpy(), labels=[f'{name} 429/s' for name in throttled.columns],
+                              alpha=0.8)
+    aggregated = timeline[timeline['Name'] == 'Aggregated'].set_index('Timestamp').reindex(seconds, fill_value=0)
+    timeline_ax.plot(elapsed, aggregated[ERROR_CLASSES].sum(axis=1) / window, color='black', linestyle='--',
+                     label='5xx / timeout / connection per second')
+    timeline_ax.set_xlabel('Seconds since start (by request start time)')
+    timeline_ax.set_ylabel('Requests/s')
+    timeline_ax.set_ylim(bottom=0)
+    timeline_ax.grid(linestyle='--', alpha=0.7)
+    timeline_ax.legend(loc='upper left', fontsize='small', ncol=2)
+    fig.suptitle(f'Success-only Latency and Throttling for {config_name} Configuration')
+    fig.tight_layout()
+
+    chart_filename = status_chart_path_for_config(config_path)
+    fig.savefig(chart_filename)
+    plt.close(fig)
+    print(f"Generated: {chart_filename}")
+
+
+def render_chart_job(job):
+    config_path, df, phases_df = job
+    generate_charts_for_config(config_path, df, phases_df)
+    return config_path
+
+
+def render_charts(jobs, max_workers=None):
+    """
+    Renders (config_path, stats_df, phases_df) jobs, fanning out over a process pool with the
+    headless Agg backend when there is more than one chart to draw.
+    """
+    if max_workers == 1 or len(jobs) <= 1:
+        use_headless_backend()
+        for job in jobs:
+            render_chart_job(job)
         return
+    max_workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (4 * max_workers))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=use_headless_backend) as pool:
+        for _ in pool.map(render_chart_job, jobs, chunksize=chunksize):
+            pass
 
-    for folder_name in sorted(config_folders): # Sort for consistent order
-        config_path = os.path.join(RESULTS_BASE_DIR, folder_name)
-        generate_charts_for_config(config_path)
+
+def main(results_dir=RESULTS_BASE_DIR, max_workers=None, force=False):
+    if not os.path.exists(results_dir):
+        print(f"Results directory not found at {results_dir}. Please run load tests first.")
+        return
+
+    from results_catalog import open_catalog
+
+    # Iterate through each catalogued configuration in the results directory
+    with open_catalog(results_dir) as catalog:
+        run_paths = catalog.run_paths()
+        if not run_paths:
+            print(f"No configuration folders found in {results_dir}. Please run load tests first.")
+            return
+
+        config_paths = {config: os.path.join(results_dir, path) for config, path in run_paths.items()}
+        stale = [config for config, path in config_paths.items() if force or not chart_is_up_to_date(path)]
+        if not stale:
+            print(f"All {len(config_paths)} individual configuration charts are up to date.")
+            return
+        stats = catalog.stats(configs=stale)
+        phases = catalog.phases(configs=stale)
+
+    jobs = [(config_paths[config], stats[stats['config'] == config],
+             phases[phases['config'] == config] if not phases.empty else phases) for config in stale]
+    print(f"Rendering {len(jobs)} of {len(config_paths)} charts ({len(config_paths) - len(jobs)} up to date).")
+    render_charts(jobs, max_workers)
 
     print("\n--- All individual configuration charts generated! ---")
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generates language-wise p95 latency charts for every run.")
+    parser.add_argument("--results-dir", default=RESULTS_BASE_DIR)
+    parser.add_argument("--jobs", type=int, default=None, help="Rendering processes (defaults to the CPU count).")
+    parser.add_argument("--force", action="store_true", help="Redraw charts even when they are up to date.")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    main(args.results_dir, args.jobs, args.force)
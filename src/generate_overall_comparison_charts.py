@@ -1,6 +1,9 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+from generator_health import generator_warning
+from results_catalog import open_catalog
+from status_breakdown import load_status_percentiles, success_and_throttling
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RESULTS_BASE_DIR = os.path.join(BASE_DIR, 'results')
@@ -10,7 +13,8 @@ OVERALL_CHARTS_DIR = os.path.join(RESULTS_BASE_DIR, 'overall_charts')
 def collect_data_from_all_configs():
     """
     Collects p50, p75, p95 latency and average response time for the 'Aggregated'
-    row from all test configurations.
+    row from all test configurations, via the results catalog, plus the success-only
+    p95 and throttled share for runs recorded with per-status-class histograms.
     """
     all_data = []
     
@@ -18,29 +22,22 @@ def collect_data_from_all_configs():
         print(f"Results directory not found at {RESULTS_BASE_DIR}.")
         return pd.DataFrame()
 
-    config_folders = [f for f in os.listdir(RESULTS_BASE_DIR) if os.path.isdir(os.path.join(RESULTS_BASE_DIR, f)) and f != 'overall_charts']
+    with open_catalog(RESULTS_BASE_DIR) as catalog:
+        runs = catalog.runs()
+        aggregated_rows = catalog.stats(name='Aggregated')
 
-    if not config_folders:
+    if runs.empty:
         print(f"No configuration folders found in {RESULTS_BASE_DIR}.")
         return pd.DataFrame()
 
-    for folder_name in sorted(config_folders): # Ensure consistent order
-        config_path = os.path.join(RESULTS_BASE_DIR, folder_name)
-        stats_csv_path = os.path.join(config_path, 'report_stats.csv')
-
-        if not os.path.exists(stats_csv_path):
-            print(f"Warning: {stats_csv_path} not found. Skipping data collection for {folder_name}.")
-            continue
-
-        df = pd.read_csv(stats_csv_path)
-        
+    for folder_name, path in zip(runs['config'], runs['path']): # Catalog returns configs in a consistent order
         # Get the 'Aggregated' row, which summarizes overall performance
         # Check if 'Aggregated' row exists before trying to access it
-        if 'Aggregated' in df['Name'].values:
-            aggregated_row = df[df['Name'] == 'Aggregated'].iloc[0]
-        else:
-            print(f"Warning: 'Aggregated' row not found in {stats_csv_path}. Skipping data for {folder_name}.")
+        matching_rows = aggregated_rows[aggregated_rows['config'] == folder_name]
+        if matching_rows.empty:
+            print(f"Warning: 'Aggregated' row not found for {folder_name}. Skipping data for {folder_name}.")
             continue
+        aggregated_row = matching_rows.iloc[0]
 
         # Extract relevant metrics
         # Ensure 'Request Count' is not zero before division to avoid ZeroDivisionError
@@ -48,14 +45,30 @@ def collect_data_from_all_configs():
         failure_count = aggregated_row['Failure Count']
         error_rate = (failure_count / request_count) * 100 if request_count > 0 else 0
 
+        # Flag runs whose load generator was the bottleneck, so their numbers aren't taken at face value
+        label = folder_name
+        if generator_warning(os.path.join(RESULTS_BASE_DIR, path)):
+            label += ' (generator saturated)'
+
+        # NaN for runs recorded before the status-class breakdown existed
+        success_p95, throttled = float('nan'), float('nan')
+        statuses = load_status_percentiles(os.path.join(RESULTS_BASE_DIR, path))
+        if statuses is not None:
+            summary = success_and_throttling(statuses).set_index('Name')
+            if 'Aggregated' in summary.index:
+                success_p95 = summary.at['Aggregated', 'Success p95']
+                throttled = summary.at['Aggregated', 'Throttled (%)']
+
         data_point = {
-            'Configuration': folder_name,
+            'Configuration': label,
             'p50 Latency': aggregated_row['50%'],
             'p75 Latency': aggregated_row['75%'],
             'p95 Latency': aggregated_row['95%'],
             'Average Response Time': aggregated_row['Average Response Time'],
             'Requests/s': aggregated_row['Requests/s'],
-            'Error Rate': error_rate
+            'Error Rate': error_rate,
+            'Success p95 Latency': success_p95,
+            'Throttled (%)': throttled
         }
         all_data.append(data_point)
 
@@ -121,6 +134,28 @@ def main():
     plt.close()
     print(f"Generated: {os.path.join(OVERALL_CHARTS_DIR, 'overall_rps_error_rate.png')}")
 
+    # --- Success-only p95 next to the throttled share, so rate limiting isn't read as speed ---
+    status_df = df_overall.dropna(subset=['Throttled (%)'])
+    if not status_df.empty:
+        fig, ax1 = plt.subplots(figsize=(14, 8))
+        status_df.set_index('Configuration')[['p95 Latency', 'Success p95 Latency']].plot(
+            kind='bar', ax=ax1, color=['lightgray', 'tab:orange'])
+        ax1.set_xlabel('Configuration')
+        ax1.set_ylabel('Latency (ms)')
+        ax1.legend(['p95, all requests (Locust)', 'p95, 2xx only'], loc='upper left')
+        plt.setp(ax1.get_xticklabels(), rotation=45, ha='right')
+        ax1.grid(axis='y', linestyle='--', alpha=0.7)
+        ax2 = ax1.twinx()
+        ax2.plot(range(len(status_df)), status_df['Throttled (%)'], marker='o', linestyle='--', color='tab:red',
+                 label='Throttled, 429 (%)')
+        ax2.set_ylabel('Throttled (%)', color='tab:red')
+        ax2.set_ylim(bottom=0)
+        ax2.legend(loc='upper right')
+        ax1.set_title('Success-only p95 and Throttled Share Across Configurations (Aggregated)')
+        fig.tight_layout()
+        plt.savefig(os.path.join(OVERALL_CHARTS_DIR, 'overall_success_latency_throttling.png'))
+        plt.close()
+        print(f"Generated: {os.path.join(OVERALL_CHARTS_DIR, 'overall_success_latency_throttling.png')}")
 
     print("\n--- All overall comparison charts generated! ---")
 
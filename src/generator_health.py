@@ -0,0 +1,122 @@
+import csv
+import glob
+import math
+import os
+import time
+
+import psutil
+
+try:
+    import resource
+except ImportError:  # Windows has no rlimits
+    resource = None
+
+GENERATOR_FILENAME = "report_generator.csv"
+GENERATOR_PATTERN = "report_generator*.csv"
+GENERATOR_HEADER = ["Timestamp", "User Count", "CPU (%)", "RSS (MB)", "Open Sockets",
+                    "Loop Lag Avg (ms)", "Loop Lag Max (ms)", "Saturated"]
+SAMPLE_INTERVAL_SECONDS = 1.0
+# The lag probe asks to wake up every LAG_PROBE_INTERVAL_SECONDS; anything later is time the
+# event loop spent busy with other work, which also delays every response it is timing.
+LAG_PROBE_INTERVAL_SECONDS = 0.05
+
+# A sample is saturated when any of these is crossed. The engines are single-threaded, so
+# 90% means 90% of one core (Locust logs its own warning at the same level).
+CPU_LIMIT_PERCENT = 90
+LOOP_LAG_LIMIT_MS = 50
+SOCKET_LIMIT_FRACTION = 0.9
+MEMORY_LIMIT_FRACTION = 0.9
+
+
+class GeneratorSampler:
+    """
+    Samples the load-generating process (CPU, RSS, open sockets and the event-loop lag
+    reported by the caller's probe) into a report_generator CSV, one row per second.
+    """
+
+    def __init__(self, path):
+        self.process = psutil.Process()
+        self.process.cpu_percent(None)
+        self.socket_limit = open_file_limit() * SOCKET_LIMIT_FRACTION
+        self.memory_limit_mb = psutil.virtual_memory().total / 2 ** 20 * MEMORY_LIMIT_FRACTION
+        self.lags_ms = []
+        self.saturated_samples = 0
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(GENERATOR_HEADER)
+
+    def record_lag(self, lag_ms):
+        self.lags_ms.append(max(lag_ms, 0.0))
+
+    def sample(self, user_count):
+        cpu = self.process.cpu_percent(None)
+        rss_mb = self.process.memory_info().rss / 2 ** 20
+        sockets = len(self.process.net_connections(kind="inet"))
+        lags, self.lags_ms = self.lags_ms, []
+        lag_avg = sum(lags) / len(lags) if lags else 0.0
+        lag_max = max(lags, default=0.0)
+        reasons = saturation_reasons(cpu, lag_max, sockets, rss_mb, self.socket_limit, self.memory_limit_mb)
+        if reasons:
+            self.saturated_samples += 1
+        self.writer.writerow([int(time.time()), user_count, round(cpu, 1), round(rss_mb, 1), sockets,
+                              round(lag_avg, 2), round(lag_max, 2), ";".join(reasons)])
+        self.file.flush()
+        return reasons
+
+    def close(self):
+        self.file.close()
+
+
+def open_file_limit():
+    """
+    The process's soft open-file limit, which caps its sockets; inf where there is none
+    (or, on Windows, no way to read it), so the socket check never fires.
+    """
+    if resource is None:
+        return math.inf
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return math.inf if soft == resource.RLIM_INFINITY else soft
+
+
+def saturation_reasons(cpu, lag_max_ms, sockets, rss_mb, socket_limit, memory_limit_mb):
+    reasons = []
+    if cpu >= CPU_LIMIT_PERCENT:
+        reasons.append("cpu")
+    if lag_max_ms >= LOOP_LAG_LIMIT_MS:
+        reasons.append("loop_lag")
+    if sockets >= socket_limit:
+        reasons.append("sockets")
+    if rss_mb >= memory_limit_mb:
+        reasons.append("memory")
+    return reasons
+
+
+def load_generator_samples(output_dir):
+    """
+    Every report_generator*.csv in the run (one per load-generating process) as
+    {file name: DataFrame}.
+    """
+    import pandas as pd
+
+    return {os.path.basename(path): pd.read_csv(path)
+            for path in sorted(glob.glob(os.path.join(output_dir, GENERATOR_PATTERN)))}
+
+
+def generator_warning(output_dir):
+    """
+    A "load generator saturated" message naming the process, how long and why, or None
+    when no process crossed a limit (or the run has no generator samples).
+    """
+    messages = []
+    for path in sorted(glob.glob(os.path.join(output_dir, GENERATOR_PATTERN))):
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        saturated = [row for row in rows if row["Saturated"]]
+        if not saturated:
+            continue
+        reasons = sorted({reason for row in saturated for reason in row["Saturated"].split(";")})
+        messages.append(f"{os.path.basename(path)}: {len(saturated)} of {len(rows)} samples "
+                        f"({', '.join(reasons)})")
+    if not messages:
+        return None
+    return "Load generator saturated; latency numbers may include client-side delay. " + "; ".join(messages)
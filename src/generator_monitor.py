@@ -0,0 +1,53 @@
+from locust.runners import MasterRunner, WorkerRunner
+import os
+import time
+
+import gevent
+
+from generator_health import (GENERATOR_FILENAME, LAG_PROBE_INTERVAL_SECONDS, SAMPLE_INTERVAL_SECONDS,
+                              GeneratorSampler)
+from request_recorder import recorder_output_dir
+
+
+def probe_loop_lag(sampler):
+    while True:
+        start = time.perf_counter()
+        gevent.sleep(LAG_PROBE_INTERVAL_SECONDS)
+        sampler.record_lag((time.perf_counter() - start - LAG_PROBE_INTERVAL_SECONDS) * 1000)
+
+
+def sample_every_second(sampler, runner):
+    while True:
+        gevent.sleep(SAMPLE_INTERVAL_SECONDS)
+        reasons = sampler.sample(runner.user_count)
+        if reasons and sampler.saturated_samples == 1:
+            print(f"[WARNING]: load generator saturated ({', '.join(reasons)}); latency numbers now include "
+                  f"client-side delay. See {GENERATOR_FILENAME}.")
+
+
+def register_generator_monitor(events):
+    """
+    Samples every load-generating process (CPU, RSS, open sockets, gevent loop lag) into
+    report_generator<suffix>.csv next to the reports (see recorder_output_dir) while
+    the test runs. Distributed workers write _worker<N> files; the master generates no load.
+    """
+    state = {"sampler": None, "greenlets": []}
+
+    @events.test_start.add_listener
+    def on_test_start(environment, **kwargs):
+        runner = environment.runner
+        output_dir = recorder_output_dir(environment)
+        if isinstance(runner, MasterRunner) or output_dir is None:
+            return
+        suffix = f"_worker{runner.worker_index}" if isinstance(runner, WorkerRunner) else ""
+        sampler = GeneratorSampler(os.path.join(output_dir, f"report_generator{suffix}.csv"))
+        state["sampler"] = sampler
+        state["greenlets"] = [gevent.spawn(probe_loop_lag, sampler), gevent.spawn(sample_every_second, sampler, runner)]
+
+    @events.test_stop.add_listener
+    def on_test_stop(environment, **kwargs):
+        sampler, state["sampler"] = state["sampler"], None
+        if sampler is None:
+            return
+        gevent.killall(state["greenlets"])
+        sampler.close()
@@ -0,0 +1,312 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from latency_histogram import LatencyHistogram, load_raw_requests
+from soak_history import history_chunk_paths, iter_history
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_BASE_DIR = os.path.join(BASE_DIR, 'results')
+STEADY_STATE_FILENAME = 'report_steady_state.csv'
+SPIKES_FILENAME = 'report_spikes.csv'
+
+# Locust's "current" percentiles and RPS in the history cover a sliding 10s window, so
+# rows within this many seconds of the ramp-up end still include ramp-up requests.
+ROLLING_WINDOW_SECONDS = 10
+STEADY_PERCENTILES = [50, 95, 99]
+# A second is a spike when its latency is SPIKE_FACTOR x the language's steady-state
+# median and at least SPIKE_MIN_DELTA_MS above it.
+SPIKE_FACTOR = 3.0
+SPIKE_MIN_DELTA_MS = 500
+# Without per-name history or raw capture, an Aggregated spike lists at most this many
+# names whose whole-run max (report_stats.csv) was high enough to have caused it
+SPIKE_CANDIDATES = 3
+HISTORY_COLUMNS = ['Timestamp', 'User Count', 'Name', 'Requests/s', '50%', '95%', '99%', '100%',
+                   'Total Request Count', 'Total Failure Count']
+LATENCY_COLUMNS = ['Timestamp', 'Name', '50%', '95%', '99%', '100%']
+# What the steady-state window and window throughput need; streamed rather than loaded
+WINDOW_COLUMNS = ['Timestamp', 'User Count', 'Name', 'Total Request Count', 'Total Failure Count']
+
+
+def load_history(config_path, usecols=HISTORY_COLUMNS):
+    """
+    report_stats_history.csv with "N/A" as NaN, reading only the columns analysed here.
+    Soak runs have no such file; their compressed history chunks are read instead. Holds
+    the whole history in memory: for the window alone, use steady_state_window and
+    stream_window_throughput.
+    """
+    if history_chunk_paths(config_path):
+        return pd.concat(iter_history(config_path, usecols=usecols), ignore_index=True).astype(
+            {'Name': 'category'})
+    return pd.read_csv(os.path.join(config_path, 'report_stats_history.csv'), usecols=usecols,
+                       na_values=['N/A'], dtype={'Name': 'category'})
+
+
+def detect_steady_state(history):
+    """
+    Returns (ramp_end, steady_start, steady_end) timestamps from the Aggregated rows:
+    the ramp-up ends when the user count first reaches its peak, the steady window
+    starts one rolling window later and ends at the last row still at the peak.
+    """
+    aggregated = history[history['Name'] == 'Aggregated']
+    timestamps = aggregated['Timestamp'].to_numpy()
+    users = aggregated['User Count'].to_numpy()
+    at_peak = np.flatnonzero(users == users.max())
+    ramp_end, steady_end = timestamps[at_peak[0]], timestamps[at_peak[-1]]
+    steady_start = min(ramp_end + ROLLING_WINDOW_SECONDS, steady_end)
+    return int(ramp_end), int(steady_start), int(steady_end)
+
+
+def steady_state_window(config_path):
+    """
+    detect_steady_state over the run's streamed history, keeping only the Aggregated
+    rows' timestamps and user counts, so a multi-day soak run fits in memory.
+    """
+    blocks = iter_history(config_path, usecols=['Timestamp', 'User Count', 'Name'])
+    return detect_steady_state(pd.concat([block[block['Name'] == 'Aggregated'] for block in blocks],
+                                         ignore_index=True))
+
+
+def window_rows(config_path, start, end, usecols=WINDOW_COLUMNS):
+    """
+    Streams the history and yields each block's rows between two timestamps.
+    """
+    for block in iter_history(config_path, usecols=usecols):
+        yield block[(block['Timestamp'] >= start) & (block['Timestamp'] <= end)]
+
+
+def raw_requests_frame(config_path):
+    """
+    Every raw request record in the run as one DataFrame (Name, Timestamp, Status, Latency).
+    Returns None when the run has no raw capture.
+    """
+    frames = []
+    for records, names in load_raw_requests(config_path):
+        frames.append(pd.DataFrame({
+            'Name': pd.Categorical.from_codes(records['name'].astype(np.int64), categories=names),
+            'Timestamp': np.asarray(records['timestamp']),
+            'Status': np.asarray(records['status']),
+            'Latency': np.asarray(records['latency_ms']),
+        }))
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+    # Workers each number their names independently
+    return pd.concat([frame.astype({'Name': str}) for frame in frames], ignore_index=True).astype({'Name': 'category'})
+
+
+def window_throughput(history, start, end):
+    """
+    Requests/s and failure rate (%) per name between two timestamps, from the
+    cumulative Total Request/Failure Count columns.
+    """
+    window = history[(history['Timestamp'] >= start) & (history['Timestamp'] <= end)]
+    grouped = window.groupby('Name', observed=True)
+    first, last = grouped.first(), grouped.last()
+    requests = last['Total Request Count'] - first['Total Request Count']
+    failures = last['Total Failure Count'] - first['Total Failure Count']
+    elapsed = (last['Timestamp'] - first['Timestamp']).where(lambda seconds: seconds > 0)
+    return pd.DataFrame({
+        'Requests': requests,
+        'Throughput': requests / elapsed,
+        'Failure Rate': (failures / requests.where(requests > 0) * 100).fillna(0),
+    })
+
+
+def stream_window_throughput(config_path, start, end):
+    """
+    window_throughput over the streamed history. Only each block's first and last row
+    per name is kept, which is all the cumulative counts need.
+    """
+    ends = []
+    for window in window_rows(config_path, start, end):
+        grouped = window.groupby('Name', sort=False)
+        ends += [grouped.head(1), grouped.tail(1)]
+    return window_throughput(pd.concat(ends, ignore_index=True), start, end)
+
+
+def raw_window_throughput(raw, start, end):
+    """
+    Same as window_throughput, counted from the raw records started inside the window.
+    Status 0 (no response) and 4xx/5xx count as failures.
+    """
+    window = raw[(raw['Timestamp'] >= start) & (raw['Timestamp'] < end + 1)]
+    failed = (window['Status'] == 0) | (window['Status'] >= 400)
+    counts = pd.DataFrame({'Requests': window.groupby('Name', observed=True).size(),
+                           'Failures': failed.groupby(window['Name'], observed=True).sum()})
+    counts.loc['Aggregated'] = [len(window), failed.sum()]
+    elapsed = max(end + 1 - start, 1)
+    return pd.DataFrame({
+        'Requests': counts['Requests'],
+        'Throughput': counts['Requests'] / elapsed,
+        'Failure Rate': (counts['Failures'] / counts['Requests'].where(counts['Requests'] > 0) * 100).fillna(0),
+    })
+
+
+def steady_state_percentiles(history, raw, start, end):
+    """
+    Per-name steady-state percentiles. Exact (HDR histogram of the raw records
+    started inside the window) when raw capture exists; otherwise the median of
+    Locust's rolling-window percentiles across the window's history rows.
+    """
+    columns = [f"{p}%" for p in STEADY_PERCENTILES]
+    if raw is not None:
+        window = raw[(raw['Timestamp'] >= start) & (raw['Timestamp'] < end + 1)]
+        rows = {}
+        for name, latencies in window.groupby('Name', observed=True)['Latency']:
+            histogram = LatencyHistogram()
+            histogram.record_ms(latencies.to_numpy())
+            rows[name] = histogram.percentiles_ms(STEADY_PERCENTILES)
+        if len(window):
+            histogram = LatencyHistogram()
+            histogram.record_ms(window['Latency'].to_numpy())
+            rows['Aggregated'] = histogram.percentiles_ms(STEADY_PERCENTILES)
+        result = pd.DataFrame.from_dict(rows, orient='index', columns=columns)
+        result['Source'] = 'raw'
+        return result
+    window = history[(history['Timestamp'] >= start) & (history['Timestamp'] <= end)]
+    result = window.groupby('Name', observed=True)[columns].median()
+    result['Source'] = 'history'
+    return result
+
+
+def per_second_latency(history, raw):
+    """
+    Long-format (Name, Timestamp, Latency) series of each name's worst latency per
+    second. From raw records when available; otherwise from the history's rolling
+    window max ('100%'), which only has per-language rows with --csv-full-history.
+    """
+    if raw is not None:
+        seconds = raw.assign(Timestamp=np.floor(raw['Timestamp']).astype(np.int64))
+        series = seconds.groupby(['Name', 'Timestamp'], observed=True)['Latency'].max().reset_index()
+        aggregated = seconds.groupby('Timestamp')['Latency'].max().reset_index().assign(Name='Aggregated')
+        return pd.concat([series.astype({'Name': str}), aggregated], ignore_index=True).astype({'Name': 'category'})
+    return history[['Name', 'Timestamp', '100%']].rename(columns={'100%': 'Latency'}).dropna()
+
+
+def find_spikes(series, start, end):
+    """
+    Contiguous intervals where a name's per-second latency stands out from its
+    steady-state median. Returns one row per interval.
+    """
+    series = series.sort_values(['Name', 'Timestamp'], kind='stable').reset_index(drop=True)
+    in_window = (series['Timestamp'] >= start) & (series['Timestamp'] <= end)
+    names = series['Name'].cat.codes.to_numpy()
+    baseline = series['Latency'].where(in_window).groupby(names).transform('median')
+    baseline = baseline.fillna(series['Latency'].groupby(names).transform('median'))
+    spike = (series['Latency'] > SPIKE_FACTOR * baseline) & (series['Latency'] - baseline > SPIKE_MIN_DELTA_MS)
+    if not spike.any():
+        return pd.DataFrame(columns=['Name', 'Start', 'End', 'Duration', 'Peak Latency', 'Baseline Latency'])
+
+    # A new interval starts at every spike second whose previous second (same name) was not one
+    timestamps = series['Timestamp'].to_numpy()
+    continues = np.zeros(len(series), dtype=bool)
+    continues[1:] = spike.to_numpy()[:-1] & (names[1:] == names[:-1]) & (timestamps[1:] - timestamps[:-1] <= 1)
+    interval_ids = np.cumsum(spike.to_numpy() & ~continues)
+    spikes = series[spike].assign(Interval=interval_ids[spike.to_numpy()], Baseline=baseline[spike])
+    intervals = spikes.astype({'Name': str}).groupby('Interval').agg(
+        Name=('Name', 'first'), Start=('Timestamp', 'min'), End=('Timestamp', 'max'),
+        **{'Peak Latency': ('Latency', 'max'), 'Baseline Latency': ('Baseline', 'first')})
+    intervals.insert(3, 'Duration', intervals['End'] - intervals['Start'] + 1)
+    return intervals.sort_values(['Start', 'Name']).reset_index(drop=True)
+
+
+def spike_candidates(config_path, spikes):
+    """
+    For each spike, the names whose whole-run Max Response Time in report_stats.csv
+    clears the same spike threshold, slowest first, as "Name 1234ms; ..." text. Only a
+    shortlist: the whole-run max does not say when a name was slow.
+    """
+    stats = pd.read_csv(os.path.join(config_path, 'report_stats.csv'), usecols=['Name', 'Max Response Time'])
+    stats = stats[stats['Name'] != 'Aggregated'].sort_values('Max Response Time', ascending=False)
+    candidates = []
+    for baseline in spikes['Baseline Latency']:
+        threshold = max(SPIKE_FACTOR * baseline, baseline + SPIKE_MIN_DELTA_MS)
+        slow = stats[stats['Max Response Time'] >= threshold].head(SPIKE_CANDIDATES)
+        candidates.append('; '.join(f"{name} {latency:.0f}ms" for name, latency in
+                                    zip(slow['Name'], slow['Max Response Time'])))
+    return candidates
+
+
+def minmax_downsample(values, max_points):
+    """
+    Indices of at most `max_points` of `values` (in order) that keep the minimum and
+    maximum of each of max_points / 2 equal slices, so a single-second spike still
+    shows after thinning a long history for plotting. NaNs are only kept for slices
+    that have nothing else.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    if count <= max_points:
+        return np.arange(count)
+    buckets = max(max_points // 2, 1)
+    edges = np.linspace(0, count, buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    # lexsort puts NaNs last within each slice, so the first entry is the slice's min (or max)
+    lowest = np.lexsort((values, bucket))[edges[:-1]]
+    highest = np.lexsort((-values, bucket))[edges[:-1]]
+    return np.unique(np.concatenate([lowest, highest]))
+
+
+def analyse_run(config_path):
+    """
+    Writes report_steady_state.csv and report_spikes.csv for one run and returns
+    (steady_state_df, spikes_df, (ramp_end, steady_start, steady_end)).
+    """
+    raw = raw_requests_frame(config_path)
+    window = steady_state_window(config_path)
+    _, start, end = window
+
+    throughput = stream_window_throughput(config_path, start, end)
+    if raw is not None:
+        # Default histories only carry the Aggregated row; the raw records cover every language
+        throughput = raw_window_throughput(raw, start, end).combine_first(throughput)
+    # Without raw records, percentiles and spikes come from every second of the history
+    history = load_history(config_path, usecols=LATENCY_COLUMNS) if raw is None else None
+    steady = throughput.join(steady_state_percentiles(history, raw, start, end), how='outer')
+    steady.index.name = 'Name'
+    steady.insert(0, 'Window Start', start)
+    steady.insert(1, 'Window End', end)
+    steady = steady.reset_index()
+    steady.to_csv(os.path.join(config_path, STEADY_STATE_FILENAME), index=False)
+
+    spikes = find_spikes(per_second_latency(history, raw), start, end)
+    if raw is None and (history['Name'] == 'Aggregated').all():
+        # Only the Aggregated row was recorded, so no spike can be pinned on a language
+        spikes['Candidates'] = spike_candidates(config_path, spikes)
+    spikes.to_csv(os.path.join(config_path, SPIKES_FILENAME), index=False)
+    return steady, spikes, window
+
+
+def print_summary(config_path, steady, spikes, window):
+    ramp_end, start, end = window
+    print(f"\n--- {os.path.basename(os.path.normpath(config_path))} ---")
+    print(f"Ramp-up ended at {ramp_end}; steady state {start}-{end} ({end - start}s)")
+    print(steady.drop(columns=['Window Start', 'Window End']).round(2).to_string(index=False))
+    if spikes.empty:
+        print("No latency spikes.")
+    for name, spike_start, _, duration, peak, baseline, *candidates in spikes.itertuples(index=False, name=None):
+        print(f"Spike: {name} reached {peak:.0f}ms at {spike_start} for {duration}s "
+              f"(+{spike_start - ramp_end}s after ramp-up; steady median {baseline:.0f}ms)")
+        if candidates:
+            print(f"  Only Aggregated history was recorded; attributing it needs --csv-full-history or raw capture. "
+                  f"Slow enough over the whole run (report_stats.csv max): {candidates[0] or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Steady-state percentiles and latency spikes from report_stats_history.csv.")
+    parser.add_argument("config_paths", nargs="*", help="Run folders (defaults to every run under results/).")
+    args = parser.parse_args()
+    config_paths = args.config_paths or sorted(
+        entry.path for entry in os.scandir(RESULTS_BASE_DIR)
+        if os.path.exists(os.path.join(entry.path, 'report_stats_history.csv')))
+    for config_path in config_paths:
+        steady, spikes, window = analyse_run(config_path)
+        print_summary(config_path, steady, spikes, window)
+
+
+if __name__ == "__main__":
+    main()
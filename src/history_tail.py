@@ -0,0 +1,62 @@
+import io
+import os
+
+# Columns of report_stats_history.csv that Locust writes as "N/A" before any response arrives
+NUMERIC_COLUMNS = ['Timestamp', 'User Count', 'Requests/s', 'Failures/s', '50%', '66%', '75%', '80%', '90%',
+                   '95%', '98%', '99%', '99.9%', '99.99%', '100%', 'Total Request Count', 'Total Failure Count',
+                   'Total Median Response Time', 'Total Average Response Time', 'Total Min Response Time',
+                   'Total Max Response Time', 'Total Average Content Size']
+
+
+class HistoryTail:
+    """
+    Incrementally reads a report_stats_history.csv that Locust is still appending to.
+
+    Each `read_new()` call seeks to where the previous one stopped and parses only the
+    complete lines written since, so polling a long run costs O(new rows) rather than
+    re-reading the whole file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.header = None
+
+    def read_new(self):
+        """
+        New rows as a DataFrame (empty when nothing complete has been written yet).
+        """
+        import pandas as pd
+
+        if not os.path.exists(self.path):
+            return pd.DataFrame()
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        # Leave a half-written last line for the next call
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return pd.DataFrame()
+        self.offset += end
+        text = chunk[:end].decode('utf-8')
+        if self.header is None:
+            self.header, _, text = text.partition('\n')
+        if not text:
+            return pd.DataFrame()
+        df = pd.read_csv(io.StringIO(text), header=None, names=self.header.split(','))
+        for column in NUMERIC_COLUMNS:
+            if column in df.columns:
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+        return df
+
+
+def live_metrics(history_df):
+    """
+    Per-second Aggregated RPS, p50/p95 and error rate (%) from report_stats_history.csv rows.
+    """
+    aggregated = history_df[history_df['Name'] == 'Aggregated']
+    requests_per_second = aggregated['Requests/s']
+    metrics = aggregated[['Timestamp', 'User Count', 'Requests/s', '50%', '95%']].copy()
+    metrics['Error Rate (%)'] = (aggregated['Failures/s'] / requests_per_second.where(requests_per_second > 0)
+                                 * 100).fillna(0)
+    return metrics.set_index('Timestamp')
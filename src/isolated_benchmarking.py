@@ -0,0 +1,69 @@
+from locust import events
+from locust.runners import WorkerRunner
+import time
+
+# Also registers --arrival-rate / --language-rates and the schedule-lag and throttling report
+import open_loop_benchmarking
+from languages import LANGUAGE_NAMES
+from open_loop_benchmarking import ArrivalSchedule, parse_language_rates
+
+# {language name: that language's own ArrivalSchedule}
+schedules = {}
+
+
+def user_class_name(language):
+    return f"{language}User"
+
+
+@events.init_command_line_parser.add_listener
+def add_isolation_arguments(parser):
+    parser.add_argument("--language-users", type=str, default="",
+                        help="Users per language class, e.g. 'Malayalam=12,Hindi=6'. Defaults to an even split of -u.")
+
+
+@events.init.add_listener
+def on_init(environment, **kwargs):
+    # The master (or local runner) dispatches users, so the per-class counts only matter there
+    options = environment.parsed_options
+    if options is None or not options.language_users:
+        return
+    for name, count in parse_language_rates(0, options.language_users).items():
+        globals()[user_class_name(name)].fixed_count = int(count)
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    options = environment.parsed_options
+    if options is None:
+        return
+    rates = parse_language_rates(options.arrival_rate, options.language_rates)
+    phase = 0.0
+    runner = environment.runner
+    if isinstance(runner, WorkerRunner):
+        worker_count = max(options.expect_workers or 1, 1)
+        rates = {name: rate / worker_count for name, rate in rates.items()}
+        phase = (runner.worker_index % worker_count) / worker_count
+    start_time = time.time() + 1.0
+    schedules.clear()
+    for name, rate in rates.items():
+        schedules[name] = ArrivalSchedule({name: rate}, start_time, phase)
+
+
+class IsolatedLanguageUser(open_loop_benchmarking.OpenLoopSTUser):
+    """
+    OpenLoopSTUser bound to one language: every language gets its own user class (see
+    below), user pool and constant-arrival-rate schedule, so a slow or throttled language
+    only delays its own users and each language's offered rate holds on its own.
+    Select the languages to run by passing their class names (e.g. HindiUser) to Locust.
+    """
+    abstract = True
+    language = None
+
+    def next_slot(self):
+        return schedules[self.language].next_send()
+
+
+# One concrete user class per language, e.g. MalayalamUser
+for language in LANGUAGE_NAMES:
+    globals()[user_class_name(language)] = type(user_class_name(language), (IsolatedLanguageUser,),
+                                                {"language": language})
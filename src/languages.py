@@ -0,0 +1,38 @@
+import json
+
+# Source languages exercised by the benchmark, in the same order as the STUser tasks.
+# Every language is transliterated to English (en-IN).
+TARGET_LANGUAGE_CODE = "en-IN"
+
+LANGUAGES = [
+    {"name": "Bengali", "code": "bn-IN", "input": "নমস্কার"},       # "Namaskar"
+    {"name": "Gujarati", "code": "gu-IN", "input": "કેમ છો"},        # "Kem Cho" (How are you?)
+    {"name": "Hindi", "code": "hi-IN", "input": "नमस्ते"},           # "Namaste"
+    {"name": "Kannada", "code": "kn-IN", "input": "ನಮಸ್ಕಾರ"},        # "Namaskara"
+    {"name": "Malayalam", "code": "ml-IN", "input": "നമസ്കാരം"},     # "Namaskaram"
+    {"name": "Marathi", "code": "mr-IN", "input": "नमस्कार"},        # "Namaskar"
+    {"name": "Odia", "code": "od-IN", "input": "ନମସ୍କାର"},           # "Namaskara"
+    {"name": "Punjabi", "code": "pa-IN", "input": "ਸਤ ਸ੍ਰੀ ਅਕਾਲ"},    # "Sat Sri Akal"
+    {"name": "Tamil", "code": "ta-IN", "input": "வணக்கம்"},          # "Vanakkam"
+    {"name": "Telugu", "code": "te-IN", "input": "నమస్కారం"},        # "Namaskaram"
+]
+
+LANGUAGE_NAMES = [language["name"] for language in LANGUAGES]
+LANGUAGES_BY_CODE = {language["code"]: language for language in LANGUAGES}
+LANGUAGES_BY_NAME = {language["name"]: language for language in LANGUAGES}
+
+
+def build_request_bodies():
+    """
+    Serializes each language's /transliterate payload once, at load time.
+    Returns a list of (name, utf-8 JSON body) pairs.
+    """
+    bodies = []
+    for language in LANGUAGES:
+        payload = {
+            "input": language["input"],
+            "source_language_code": language["code"],
+            "target_language_code": TARGET_LANGUAGE_CODE
+        }
+        bodies.append((language["name"], json.dumps(payload, ensure_ascii=False).encode("utf-8")))
+    return bodies
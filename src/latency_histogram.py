@@ -0,0 +1,148 @@
+import csv
+import glob
+import json
+import os
+import sys
+
+import numpy as np
+
+# One record per request, packed so the .bin files can be memory-mapped directly.
+REQUEST_DTYPE = np.dtype([
+    ("timestamp", "<f8"),   # Request start, seconds since the epoch
+    ("name", "<u2"),        # Index into the run's names list (see raw_requests_*.json)
+    ("status", "<u2"),      # HTTP status code, 0 when no response was received
+    ("latency_ms", "<f4"),  # Response time as reported to Locust
+])
+
+RAW_REQUESTS_PATTERN = "raw_requests*.bin"
+HISTOGRAM_PATTERN = "latency_hdr*.npz"
+PERCENTILE_SUMMARY_FILENAME = "report_hdr_percentiles.csv"
+SUMMARY_PERCENTILES = [50, 66, 75, 80, 90, 95, 98, 99, 99.9, 99.99, 100]
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of latencies recorded in microseconds.
+
+    Values below 2 * 10^significant_digits are counted exactly; larger values land in
+    buckets whose width keeps the relative error under 10^-significant_digits. Counts
+    are a plain int64 array, so histograms from different workers or runs merge
+    exactly by addition.
+    """
+
+    def __init__(self, significant_digits=3, max_value_us=2 ** 36, counts=None):
+        self.significant_digits = significant_digits
+        self.max_value_us = max_value_us
+        self.sub_bucket_bits = int(np.ceil(np.log2(2 * 10 ** significant_digits)))
+        self.sub_bucket_half = 1 << (self.sub_bucket_bits - 1)
+        bucket_count = max(int(np.ceil(np.log2(max_value_us))) - self.sub_bucket_bits + 1, 0) + 1
+        size = (bucket_count + 1) * self.sub_bucket_half
+        self.counts = np.zeros(size, dtype=np.int64) if counts is None else counts.astype(np.int64)
+
+    @property
+    def total_count(self):
+        return int(self.counts.sum())
+
+    def indices_for(self, values_us):
+        values = np.clip(np.asarray(values_us, dtype=np.int64), 0, self.max_value_us)
+        magnitude = np.floor(np.log2(np.maximum(values, 1))).astype(np.int64)
+        buckets = np.maximum(magnitude - (self.sub_bucket_bits - 1), 0)
+        return buckets * self.sub_bucket_half + (values >> buckets)
+
+    def values_for(self, indices):
+        """
+        Midpoint value (in microseconds) represented by each bucket index.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        buckets = np.maximum(indices // self.sub_bucket_half - 1, 0)
+        sub_buckets = indices - buckets * self.sub_bucket_half
+        lowest = sub_buckets << buckets
+        return lowest + ((1 << buckets) - 1) / 2.0
+
+    def record_ms(self, latencies_ms):
+        indices = self.indices_for(np.round(np.asarray(latencies_ms, dtype=np.float64) * 1000))
+        self.counts += np.bincount(indices, minlength=len(self.counts))[:len(self.counts)]
+
+    def merge(self, other):
+        self.counts += other.counts
+        return self
+
+    def percentiles_ms(self, percentiles):
+        """
+        Latency in ms at each percentile (0-100) of the recorded values.
+        """
+        total = self.total_count
+        if total == 0:
+            return [float("nan")] * len(percentiles)
+        cumulative = np.cumsum(self.counts)
+        ranks = np.ceil(np.asarray(percentiles, dtype=np.float64) / 100.0 * total).clip(1, total)
+        indices = np.searchsorted(cumulative, ranks)
+        return list(self.values_for(indices) / 1000.0)
+
+
+def save_histograms(path, histograms):
+    """
+    Saves {name: LatencyHistogram} to one .npz file.
+    """
+    np.savez_compressed(path, **{name: histogram.counts for name, histogram in histograms.items()})
+
+
+def load_histograms(output_dir, pattern=HISTOGRAM_PATTERN):
+    """
+    Loads and merges every latency_hdr*.npz file (one per Locust process) in `output_dir`,
+    or every file matching `pattern`.
+    """
+    merged = {}
+    for path in sorted(glob.glob(os.path.join(output_dir, pattern))):
+        with np.load(path) as data:
+            for name in data.files:
+                histogram = LatencyHistogram(counts=data[name])
+                if name in merged:
+                    merged[name].merge(histogram)
+                else:
+                    merged[name] = histogram
+    return merged
+
+
+def load_raw_requests(output_dir):
+    """
+    Memory-maps every raw_requests*.bin file in `output_dir`.
+
+    Returns (records, names): a list of structured arrays with REQUEST_DTYPE and, for
+    each, the list its `name` column indexes into.
+    """
+    records = []
+    for path in sorted(glob.glob(os.path.join(output_dir, RAW_REQUESTS_PATTERN))):
+        if os.path.getsize(path) < REQUEST_DTYPE.itemsize:
+            continue
+        with open(os.path.splitext(path)[0] + ".json", encoding="utf-8") as f:
+            names = json.load(f)["names"]
+        records.append((np.memmap(path, dtype=REQUEST_DTYPE, mode="r"), names))
+    return records
+
+
+def write_percentile_summary(output_dir):
+    """
+    Merges the per-process histograms in `output_dir` into report_hdr_percentiles.csv.
+    """
+    histograms = load_histograms(output_dir)
+    if not histograms:
+        return None
+    summary_path = os.path.join(output_dir, PERCENTILE_SUMMARY_FILENAME)
+    with open(summary_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "Request Count"] + [f"{p:g}%" for p in SUMMARY_PERCENTILES])
+        names = sorted(name for name in histograms if name != "Aggregated")
+        for name in names + (["Aggregated"] if "Aggregated" in histograms else []):
+            histogram = histograms[name]
+            values = histogram.percentiles_ms(SUMMARY_PERCENTILES)
+            writer.writerow([name, histogram.total_count] + [round(value, 3) for value in values])
+    return summary_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python latency_histogram.py <results/config_dir>")
+        sys.exit(1)
+    path = write_percentile_summary(sys.argv[1])
+    print(f"Generated: {path}" if path else f"No {HISTOGRAM_PATTERN} files found in {sys.argv[1]}.")
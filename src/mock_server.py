@@ -0,0 +1,259 @@
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+
+import gevent
+from gevent.pywsgi import WSGIServer
+
+from languages import LANGUAGES, LANGUAGES_BY_CODE
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+MOCK_SERVER_PATH = os.path.abspath(__file__)
+DEFAULT_PORT = 8765
+
+# Per-language latency model: a log-normal body around `median_ms` plus an optional
+# heavy tail, hit with probability `tail_probability`, drawn uniformly from `tail_ms`.
+# `per_char_ms` adds a service time proportional to the input length.
+DEFAULT_LATENCY = {"median_ms": 210, "sigma": 0.15, "tail_probability": 0.0, "tail_ms": [0, 0], "per_char_ms": 0.0}
+
+# Built-in latency profiles modelled on the recorded runs under results/.
+LATENCY_PROFILES = {
+    # Zero service time, used to measure the load generator's own ceiling.
+    "instant": {"*": {"median_ms": 0, "sigma": 0.0}},
+    # Quiet API, similar to c1_s1_rt1m / c5_s2_rt1m.
+    "baseline": {"*": {}},
+    # Malayalam / Marathi / Kannada spikes into the 3.5-4.5s range seen in c10_s2_rt3m.
+    "c10_s2_rt3m": {
+        "*": {},
+        "Kannada": {"tail_probability": 0.06, "tail_ms": [3000, 4500]},
+        "Malayalam": {"tail_probability": 0.07, "tail_ms": [3500, 4600]},
+        "Marathi": {"tail_probability": 0.07, "tail_ms": [3200, 4150]},
+        "Punjabi": {"tail_probability": 0.02, "tail_ms": [1500, 2550]},
+    },
+    # Latency growing with the input length, for corpus-driven runs.
+    "length_scaling": {"*": {"median_ms": 180, "per_char_ms": 1.5}},
+    # Gujarati / Odia carrying the highest p95 at 25 users, as in c25_s4_rt5m.
+    "c25_s4_rt5m": {
+        "*": {"median_ms": 230},
+        "Gujarati": {"tail_probability": 0.08, "tail_ms": [550, 700]},
+        "Odia": {"tail_probability": 0.07, "tail_ms": [500, 650]},
+    },
+}
+
+
+def build_latency_model(profile):
+    """
+    Expands a latency profile ('*' defaults plus per-language overrides) into a
+    complete model keyed by language code.
+    """
+    defaults = dict(DEFAULT_LATENCY, **profile.get("*", {}))
+    model = {}
+    for language in LANGUAGES:
+        model[language["code"]] = dict(defaults, **profile.get(language["name"], {}))
+    return model
+
+
+def load_latency_profile(name_or_path):
+    if name_or_path in LATENCY_PROFILES:
+        return LATENCY_PROFILES[name_or_path]
+    with open(name_or_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `burst` tokens.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def try_acquire(self):
+        """
+        Takes one token. Returns 0 on success, otherwise the seconds until one is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class MockTransliterationApp:
+    """
+    WSGI stand-in for the Sarvam `/transliterate` endpoint.
+    """
+
+    def __init__(self, latency_model, latency_scale=1.0, error_rate_429=0.0, error_rate_500=0.0,
+                 max_concurrency=0, rate_limit=0.0, burst=None, seed=None):
+        self.latency_model = latency_model
+        self.latency_scale = latency_scale
+        self.error_rate_429 = error_rate_429
+        self.error_rate_500 = error_rate_500
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate_limit, burst or rate_limit) if rate_limit > 0 else None
+        self.random = random.Random(seed)
+        self.in_flight = 0
+        self.counters = {"requests": 0, "ok": 0, "throttled": 0, "errors": 0, "rejected": 0}
+
+    def sample_latency(self, language_code, input_length=0):
+        params = self.latency_model[language_code]
+        if params["tail_probability"] and self.random.random() < params["tail_probability"]:
+            latency_ms = self.random.uniform(*params["tail_ms"])
+        elif params["median_ms"] > 0:
+            latency_ms = params["median_ms"] * math.exp(self.random.gauss(0, params["sigma"]))
+        else:
+            latency_ms = 0
+        latency_ms += params["per_char_ms"] * input_length
+        return latency_ms * self.latency_scale / 1000.0
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        method = environ.get("REQUEST_METHOD", "GET")
+
+        if path == "/health":
+            return self.respond(start_response, "200 OK", {"status": "ok", "in_flight": self.in_flight, **self.counters})
+        if path != "/transliterate" or method != "POST":
+            return self.respond(start_response, "404 Not Found", {"error": "Not found"})
+
+        self.counters["requests"] += 1
+        if not environ.get("HTTP_API_SUBSCRIPTION_KEY"):
+            self.counters["rejected"] += 1
+            return self.respond(start_response, "403 Forbidden", {"error": "Missing api-subscription-key header"})
+
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            payload = json.loads(environ["wsgi.input"].read(length) or b"{}")
+            language_code = payload["source_language_code"]
+            text = payload["input"]
+        except (ValueError, KeyError, TypeError):
+            self.counters["rejected"] += 1
+            return self.respond(start_response, "400 Bad Request", {"error": "Invalid request body"})
+        if language_code not in self.latency_model:
+            self.counters["rejected"] += 1
+            return self.respond(start_response, "400 Bad Request", {"error": f"Unsupported language: {language_code}"})
+
+        if self.bucket is not None:
+            retry_after = self.bucket.try_acquire()
+            if retry_after:
+                return self.throttle(start_response, "Rate limit exceeded", retry_after)
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            return self.throttle(start_response, "Too many concurrent requests", 1)
+        if self.error_rate_429 and self.random.random() < self.error_rate_429:
+            return self.throttle(start_response, "Too many requests", 1)
+
+        self.in_flight += 1
+        try:
+            gevent.sleep(self.sample_latency(language_code, len(text)))
+        finally:
+            self.in_flight -= 1
+
+        if self.error_rate_500 and self.random.random() < self.error_rate_500:
+            self.counters["errors"] += 1
+            return self.respond(start_response, "500 Internal Server Error", {"error": "Internal Server Error"})
+
+        self.counters["ok"] += 1
+        return self.respond(start_response, "200 OK", {
+            "request_id": uuid.uuid4().hex,
+            "transliterated_text": LANGUAGES_BY_CODE[language_code]["name"].lower() if text else "",
+            "source_language_code": language_code,
+        })
+
+    def throttle(self, start_response, message, retry_after):
+        self.counters["throttled"] += 1
+        return self.respond(start_response, "429 Too Many Requests", {"error": message},
+                            [("Retry-After", str(max(1, math.ceil(retry_after))))])
+
+    @staticmethod
+    def respond(start_response, status, body, extra_headers=()):
+        data = json.dumps(body).encode("utf-8")
+        headers = [("Content-Type", "application/json"), ("Content-Length", str(len(data)))]
+        start_response(status, headers + list(extra_headers))
+        return [data]
+
+
+def mock_host(port=DEFAULT_PORT):
+    return f"http://127.0.0.1:{port}"
+
+
+def start_mock_server(port=DEFAULT_PORT, profile="baseline", extra_args=None):
+    """
+    Starts the mock server in a child process and waits until it answers /health.
+    """
+    command = [sys.executable, MOCK_SERVER_PATH, "--port", str(port), "--profile", profile]
+    command += list(extra_args or [])
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT)
+    if not wait_for_server(mock_host(port)):
+        process.terminate()
+        raise RuntimeError(f"Mock server did not come up on port {port}.")
+    return process
+
+
+def wait_for_server(host, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{host}/health", timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def stop_mock_server(process):
+    if process is not None and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Sarvam /transliterate endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--profile", default="baseline",
+                        help=f"Built-in latency profile ({', '.join(LATENCY_PROFILES)}) or path to a JSON profile.")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier applied to every sampled latency.")
+    parser.add_argument("--error-rate-429", type=float, default=0.0, help="Fraction of requests rejected with 429.")
+    parser.add_argument("--error-rate-500", type=float, default=0.0, help="Fraction of requests failed with 500.")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="In-flight cap; excess requests get 429 (0 = unlimited).")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Token-bucket rate in requests/s (0 = unlimited).")
+    parser.add_argument("--burst", type=float, default=None, help="Token-bucket size (defaults to --rate-limit).")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    app = MockTransliterationApp(
+        build_latency_model(load_latency_profile(args.profile)),
+        latency_scale=args.latency_scale,
+        error_rate_429=args.error_rate_429,
+        error_rate_500=args.error_rate_500,
+        max_concurrency=args.max_concurrency,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        seed=args.seed,
+    )
+    server = WSGIServer((args.host, args.port), app, log=None, backlog=2048)
+    print(f"Mock transliteration server listening on http://{args.host}:{args.port} (profile: {args.profile})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+from locust import FastHttpUser, task, constant, events
+from locust.runners import WorkerRunner
+from locust.stats import RequestStats, StatsEntry
+import csv
+import heapq
+import time
+
+import gevent
+
+from fast_benchmarking import HEADERS, REQUEST_BODIES
+from sarvamai_benchmarking import SARVAM_API_KEY
+
+LAG_CSV_HEADER = ["Name", "Request Count", "Late Count", "Average Lag", "50%", "95%", "99%", "Max Lag",
+                  "Throttled Count", "Max Retry-After"]
+# A request counts as "late" when it left more than this many ms after its scheduled send time.
+LATE_THRESHOLD_MS = 10
+
+
+@events.init_command_line_parser.add_listener
+def add_arrival_rate_arguments(parser):
+    parser.add_argument("--arrival-rate", type=float, default=1.0,
+                        help="Target requests/s across all languages, independent of response times.")
+    parser.add_argument("--language-rates", type=str, default="",
+                        help="Per-language targets, e.g. 'Malayalam=2,Hindi=0.5'. Overrides --arrival-rate.")
+
+
+def parse_language_rates(arrival_rate, language_rates):
+    """
+    Returns {language name: requests/s}. Without explicit per-language rates the
+    overall arrival rate is split evenly, matching STUser's equal task weights.
+    """
+    names = [name for name, _ in REQUEST_BODIES]
+    if not language_rates:
+        return {name: arrival_rate / len(names) for name in names}
+    rates = {}
+    for item in language_rates.split(","):
+        name, _, rate = item.partition("=")
+        name = name.strip()
+        if name not in names:
+            raise ValueError(f"Unknown language in --language-rates: {name!r}")
+        rates[name] = float(rate)
+    return rates
+
+
+class ArrivalSchedule:
+    """
+    Merged constant-arrival-rate schedule for several languages.
+
+    Each language fires every 1/rate seconds from the schedule start; `next_send`
+    hands out the earliest pending (send time, language) slot. Slots are handed out
+    regardless of whether earlier requests have completed, so a slow API shows up as
+    schedule lag instead of silently lowering the offered load.
+    """
+
+    def __init__(self, rates, start_time, phase=0.0):
+        self.heap = []
+        for index, (name, rate) in enumerate(sorted(rates.items())):
+            if rate > 0:
+                interval = 1.0 / rate
+                heapq.heappush(self.heap, (start_time + phase * interval, index, name, interval))
+
+    def next_send(self):
+        send_time, index, name, interval = heapq.heappop(self.heap)
+        heapq.heappush(self.heap, (send_time + interval, index, name, interval))
+        return send_time, name
+
+
+schedule = None
+lag_stats = RequestStats(use_response_times_cache=False)
+# {language name: [429 count, largest Retry-After seen in seconds]}
+throttling = {}
+REQUEST_BODIES_BY_NAME = dict(REQUEST_BODIES)
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    global schedule
+    if environment.parsed_options is None:
+        return
+    options = environment.parsed_options
+    rates = parse_language_rates(options.arrival_rate, options.language_rates)
+    phase = 0.0
+    runner = environment.runner
+    if isinstance(runner, WorkerRunner):
+        # Every worker offers an equal share; staggering the phase interleaves their sends.
+        worker_count = max(options.expect_workers or 1, 1)
+        rates = {name: rate / worker_count for name, rate in rates.items()}
+        phase = (runner.worker_index % worker_count) / worker_count
+    schedule = ArrivalSchedule(rates, time.time() + 1.0, phase)
+    lag_stats.reset_all()
+    throttling.clear()
+
+
+def record_throttle(name, retry_after, count=1):
+    entry = throttling.setdefault(name, [0, 0.0])
+    entry[0] += count
+    entry[1] = max(entry[1], retry_after)
+
+
+def parse_retry_after(response):
+    try:
+        return max(0.0, float(response.headers.get("Retry-After") or 0))
+    except ValueError:
+        return 0.0
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data):
+    data["schedule_lag"] = lag_stats.serialize_stats()
+    data["throttling"] = dict(throttling)
+    lag_stats.reset_all()
+    throttling.clear()
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data):
+    for entry_data in data.get("schedule_lag", []):
+        entry = StatsEntry.unserialize(entry_data, lag_stats)
+        lag_stats.get(entry.name, entry.method).extend(entry)
+        lag_stats.total.extend(entry)
+    for name, (count, retry_after) in data.get("throttling", {}).items():
+        record_throttle(name, retry_after, count)
+
+
+@events.quitting.add_listener
+def write_schedule_lag_csv(environment, **kwargs):
+    options = environment.parsed_options
+    if isinstance(environment.runner, WorkerRunner) or options is None or not options.csv_prefix:
+        return
+    with open(f"{options.csv_prefix}_schedule_lag.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(LAG_CSV_HEADER)
+        entries = sorted(lag_stats.entries.values(), key=lambda entry: entry.name)
+        for entry in entries + [lag_stats.total]:
+            if not entry.num_requests:
+                continue
+            late = sum(count for lag, count in entry.response_times.items() if lag > LATE_THRESHOLD_MS)
+            if entry is lag_stats.total:
+                name = "Aggregated"
+                throttled = sum(count for count, _ in throttling.values())
+                max_retry_after = max((retry_after for _, retry_after in throttling.values()), default=0.0)
+            else:
+                name = entry.name
+                throttled, max_retry_after = throttling.get(name, (0, 0.0))
+            writer.writerow([
+                name,
+                entry.num_requests,
+                late,
+                round(entry.avg_response_time, 2),
+                entry.get_response_time_percentile(0.5),
+                entry.get_response_time_percentile(0.95),
+                entry.get_response_time_percentile(0.99),
+                round(entry.max_response_time, 2),
+                throttled,
+                max_retry_after,
+            ])
+
+
+class OpenLoopSTUser(FastHttpUser):
+    """
+    Open-loop counterpart of STUser: users pull send slots from a shared
+    constant-arrival-rate schedule instead of thinking between requests.
+
+    Reported response times are measured from the scheduled send time, so they
+    include any delay caused by all users being busy (coordinated omission). Run
+    enough users to cover rate x worst-case latency; the shortfall is visible in
+    report_schedule_lag.csv.
+
+    A 429 response makes the user back off for the Retry-After period before it
+    takes its next slot; the resulting lag is charged to the requests that follow.
+    """
+    wait_time = constant(0)
+    host = "https://api.sarvam.ai"
+
+    def on_start(self):
+        if not SARVAM_API_KEY:
+            self.environment.process_exit_code = 1
+            raise Exception("SARVAM_API_KEY is not set. Cannot proceed with tests!")
+
+    def next_slot(self):
+        return schedule.next_send()
+
+    @task
+    def transliterate_on_schedule(self):
+        send_time, name = self.next_slot()
+        delay = send_time - time.time()
+        if delay > 0:
+            gevent.sleep(delay)
+        lag_ms = max(0.0, (time.time() - send_time) * 1000)
+        lag_stats.log_request("LAG", name, lag_ms, 0)
+
+        with self.client.post('/transliterate', data=REQUEST_BODIES_BY_NAME[name], headers=HEADERS, name=name,
+                              catch_response=True) as response:
+            response.request_meta["response_time"] += lag_ms
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response)
+            record_throttle(name, retry_after)
+            if retry_after:
+                gevent.sleep(retry_after)
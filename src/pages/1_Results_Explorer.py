@@ -0,0 +1,151 @@
+import streamlit as st
+import pandas as pd
+import glob
+import os
+
+from generate_individual_charts import generate_charts_for_config
+from history_analysis import minmax_downsample
+from results_catalog import RESULTS_BASE_DIR, open_catalog
+from soak_history import history_chunk_paths, iter_history
+
+HISTORY_COLUMNS = ['Timestamp', 'User Count', 'Name', 'Requests/s', 'Failures/s', '50%', '95%', '99%']
+METRICS = {
+    "p95 latency (ms)": '95%',
+    "p50 latency (ms)": '50%',
+    "p99 latency (ms)": '99%',
+    "Requests/s": 'Requests/s',
+    "Failures/s": 'Failures/s',
+    "Users": 'User Count',
+}
+DEFAULT_MAX_POINTS = 1000
+# Histories of this many runs stay cached; older entries are evicted first
+HISTORY_CACHE_ENTRIES = 64
+
+
+def catalog_signature(results_dir):
+    """
+    Count and newest mtime of the runs' report_stats.csv files: cheap to compute on
+    every rerun, and changes whenever a run is added, removed or rewritten.
+    """
+    mtimes = [entry.stat().st_mtime for entry in os.scandir(results_dir)
+              if entry.is_dir() and os.path.exists(os.path.join(entry.path, 'report_stats.csv'))]
+    return len(mtimes), max(mtimes, default=0.0)
+
+
+@st.cache_data(show_spinner="Reading the results catalog...")
+def load_runs(results_dir, signature):
+    """
+    One row per catalogued run: its metadata and Aggregated stats. Comes from the
+    SQLite catalog, so only new or changed runs' CSVs are read. `signature` is only
+    the cache key.
+    """
+    with open_catalog(results_dir) as catalog:
+        runs = catalog.runs()
+        aggregated = catalog.stats(name='Aggregated')
+    if runs.empty:
+        return runs
+    aggregated = aggregated[['config', 'Request Count', 'Failure Count', 'Requests/s', '50%', '95%', '99%']]
+    runs = runs[['config', 'path', 'users', 'spawn_rate', 'run_time', 'host', 'started_at']].merge(
+        aggregated, on='config', how='left')
+    runs['Error Rate (%)'] = (runs['Failure Count'] / runs['Request Count'] * 100).round(2)
+    return runs.sort_values(['started_at', 'config'], na_position='first').reset_index(drop=True)
+
+
+def history_mtime(config_path):
+    paths = history_chunk_paths(config_path) or [os.path.join(config_path, 'report_stats_history.csv')]
+    return max((os.path.getmtime(path) for path in paths if os.path.exists(path)), default=None)
+
+
+@st.cache_data(max_entries=HISTORY_CACHE_ENTRIES, show_spinner="Loading run history...")
+def load_history(config_path, mtime):
+    """
+    A run's per-second history (Locust CSV or soak chunks), with seconds counted from
+    the run's first row so runs started at different times line up. Cached per
+    (run, mtime), so a run that is still being written is reloaded as it grows.
+    """
+    history = pd.concat(iter_history(config_path, usecols=HISTORY_COLUMNS), ignore_index=True)
+    history['Seconds'] = history['Timestamp'] - history['Timestamp'].min()
+    return history
+
+
+def downsampled_series(history, name, column, max_points):
+    series = history.loc[history['Name'] == name, ['Seconds', column]]
+    return series.iloc[minmax_downsample(series[column].to_numpy(), max_points)]
+
+
+## Streamlit UI
+st.set_page_config(page_title="Results Explorer", layout="wide")
+st.title("Results Explorer")
+st.caption("Browse every run under results/ and overlay their histories. History is only read for the runs you "
+           "select, cached until its files change, and thinned to the per-slice min/max before plotting.")
+
+results_dir = st.sidebar.text_input("Results directory:", value=RESULTS_BASE_DIR)
+if not os.path.isdir(results_dir):
+    st.error(f"Results directory not found at {results_dir}. Please run load tests first.")
+    st.stop()
+
+runs = load_runs(results_dir, catalog_signature(results_dir))
+if runs.empty:
+    st.info(f"No runs found in {results_dir}. Please run load tests first.")
+    st.stop()
+
+name_filter = st.sidebar.text_input("Filter runs by name:", value="")
+hosts = sorted(runs['host'].dropna().unique())
+selected_hosts = st.sidebar.multiselect("Hosts:", hosts, default=hosts)
+filtered = runs[runs['config'].str.contains(name_filter, case=False, regex=False)]
+if hosts:
+    filtered = filtered[filtered['host'].isin(selected_hosts) | filtered['host'].isna()]
+max_points = st.sidebar.slider("Points per run and series:", min_value=100, max_value=5000,
+                               value=DEFAULT_MAX_POINTS, step=100)
+
+st.subheader(f"Runs ({len(filtered)} of {len(runs)})")
+st.dataframe(filtered.drop(columns=['path']), hide_index=True)
+
+configs = st.multiselect("Runs to overlay:", list(filtered['config']), default=list(filtered['config'])[-2:])
+if not configs:
+    st.info("Select one or more runs to overlay their histories.")
+    st.stop()
+
+paths = dict(zip(runs['config'], runs['path']))
+histories = {}
+for config in configs:
+    config_path = os.path.join(results_dir, paths[config])
+    mtime = history_mtime(config_path)
+    if mtime is None:
+        st.warning(f"{config} has no history (report_stats_history.csv); it is left out of the overlay.")
+        continue
+    histories[config] = load_history(config_path, mtime)
+
+if histories:
+    names = sorted(set().union(*(history['Name'].unique() for history in histories.values())) - {'Aggregated'})
+    metric_column, name_column = st.columns(2)
+    metric = metric_column.selectbox("Metric:", list(METRICS))
+    name = name_column.selectbox("Request name:", ['Aggregated'] + names,
+                                 help="Per-language history needs runs recorded with --csv-full-history.")
+    column = METRICS[metric]
+    overlay = []
+    for config, history in histories.items():
+        series = downsampled_series(history, name, column, max_points)
+        overlay.append(series.assign(Run=config).rename(columns={'Seconds': 'Seconds since start', column: metric}))
+    overlay = pd.concat(overlay, ignore_index=True)
+    if overlay.empty:
+        st.info(f"None of the selected runs has {name} rows in its history.")
+    else:
+        st.line_chart(overlay, x='Seconds since start', y=metric, color='Run')
+        st.caption(f"{len(overlay)} points plotted from "
+                   f"{sum((history['Name'] == name).sum() for history in histories.values())} history rows.")
+
+st.subheader("Aggregated stats")
+st.dataframe(runs[runs['config'].isin(configs)].drop(columns=['path']), hide_index=True)
+
+st.subheader("Charts")
+chart_config = st.selectbox("Run:", configs)
+chart_path = os.path.join(results_dir, paths[chart_config])
+if st.button("Regenerate charts for this run"):
+    generate_charts_for_config(chart_path)
+png_files = sorted(glob.glob(os.path.join(chart_path, "*.png")))
+if png_files:
+    for png_file in png_files:
+        st.image(png_file, caption=os.path.basename(png_file))
+else:
+    st.info("No chart image was generated for this run yet.")
@@ -0,0 +1,53 @@
+import csv
+import glob
+import os
+
+PHASES = ["DNS", "Connect", "TLS", "TTFB", "Body"]
+# Requests at least this slow are also summarised separately, to show where the tail comes from
+SLOW_REQUEST_MS = 1000
+PHASES_FILENAME = "report_phases.csv"
+WORKER_PHASES_PATTERN = "report_phases_worker*.csv"
+PHASES_HEADER = ["Name", "Subset", "Requests", "New Connections", "Reused Connections"] \
+    + [f"{phase} (ms)" for phase in PHASES] + [f"{phase} Total (ms)" for phase in PHASES]
+
+
+def write_phase_rows(path, rows):
+    """
+    Writes {(name, subset): [requests, new, reused, *phase_totals_ms]} as a phases CSV:
+    per-phase averages for reading plus the totals, so per-process files can be summed.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(PHASES_HEADER)
+        for (name, subset), row in sorted(rows.items(), key=lambda item: (item[0][0] == "Aggregated", item[0])):
+            requests, totals = row[0], row[3:]
+            writer.writerow([name, subset] + list(row[:3]) + [round(total / requests, 3) for total in totals]
+                            + [round(total, 3) for total in totals])
+
+
+def read_phase_rows(path):
+    rows = {}
+    with open(path, newline="") as f:
+        for record in csv.DictReader(f):
+            rows[(record["Name"], record["Subset"])] = \
+                [int(record["Requests"]), int(record["New Connections"]), int(record["Reused Connections"])] \
+                + [float(record[f"{phase} Total (ms)"]) for phase in PHASES]
+    return rows
+
+
+def merge_phase_reports(output_dir):
+    """
+    Sums each distributed worker's report_phases_worker<N>.csv into report_phases.csv.
+    """
+    merged = {}
+    for path in sorted(glob.glob(os.path.join(output_dir, WORKER_PHASES_PATTERN))):
+        for key, row in read_phase_rows(path).items():
+            if key in merged:
+                merged[key] = [a + b for a, b in zip(merged[key], row)]
+            else:
+                merged[key] = row
+    if not merged:
+        return None
+    summary_path = os.path.join(output_dir, PHASES_FILENAME)
+    write_phase_rows(summary_path, merged)
+    return summary_path
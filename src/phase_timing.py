@@ -0,0 +1,158 @@
+from locust.runners import MasterRunner, WorkerRunner
+import os
+import socket
+import time
+
+from gevent.local import local
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from phase_report import PHASES, SLOW_REQUEST_MS, write_phase_rows
+from request_recorder import recorder_output_dir
+
+# Timings of the request the current greenlet is making
+_current = local()
+
+
+def reset_current_request():
+    _current.start = time.perf_counter()
+    _current.start_wall = time.time()
+    _current.new_connection = False
+    _current.dns_ms = _current.connect_ms = _current.tls_ms = 0.0
+    _current.headers_received = None
+
+
+class TimedConnectionMixin:
+    """
+    Splits connection setup into DNS lookup, TCP connect and TLS handshake.
+    Only runs for new connections; reused keep-alive connections skip connect().
+    """
+
+    def _new_conn(self):
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            address = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except socket.gaierror:
+            # Let urllib3 raise its usual NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        self._dns_host = address
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+        _current.dns_ms = (resolved - start) * 1000
+        _current.connect_ms = (time.perf_counter() - resolved) * 1000
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _current.new_connection = True
+        if isinstance(self, HTTPSConnection):
+            total_ms = (time.perf_counter() - start) * 1000
+            _current.tls_ms = max(total_ms - _current.dns_ms - _current.connect_ms, 0.0)
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedPoolMixin:
+    """
+    Marks the start of each request attempt and when its response headers arrived.
+    """
+
+    def _make_request(self, *args, **kwargs):
+        reset_current_request()
+        response = super()._make_request(*args, **kwargs)
+        _current.headers_received = time.perf_counter()
+        return response
+
+
+class TimedHTTPConnectionPool(TimedPoolMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(TimedPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def install_phase_timing(session):
+    """
+    Makes a requests session (e.g. a Locust HttpUser's `self.client`) use the timed
+    connection pools. Call it before the session's first request.
+    """
+    for adapter in session.adapters.values():
+        adapter.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+class PhaseStats:
+    """
+    Per-name sums of each phase and connection counts, for all requests and for
+    requests slower than SLOW_REQUEST_MS.
+    """
+
+    def __init__(self):
+        self.rows = {}
+
+    def record(self, name, response_time, phases, new_connection):
+        subsets = ["all", "slow"] if response_time >= SLOW_REQUEST_MS else ["all"]
+        for key in [(name, subset) for subset in subsets] + [("Aggregated", subset) for subset in subsets]:
+            row = self.rows.setdefault(key, [0, 0, 0] + [0.0] * len(PHASES))
+            row[0] += 1
+            row[1 if new_connection else 2] += 1
+            for i, value in enumerate(phases):
+                row[3 + i] += value
+
+    def write(self, path):
+        write_phase_rows(path, self.rows)
+
+
+def register_phase_recorder(events):
+    """
+    Collects the phase timings of every request made through install_phase_timing()
+    sessions and writes report_phases<suffix>.csv at test stop. Distributed workers
+    write _worker<N> files that DistributedRun merges into report_phases.csv.
+    """
+    state = {"stats": None}
+
+    @events.test_start.add_listener
+    def on_test_start(environment, **kwargs):
+        if not isinstance(environment.runner, MasterRunner):
+            state["stats"] = PhaseStats()
+
+    @events.request.add_listener
+    def on_request(name, response_time, start_time=None, **kwargs):
+        stats = state["stats"]
+        headers_received = getattr(_current, "headers_received", None)
+        if stats is None or headers_received is None or start_time is None:
+            return
+        # Measured from Locust's own start and response_time, so the phases add up to the
+        # reported latency: TTFB also covers preparing and sending the request, and the
+        # body ends where Locust stopped its clock.
+        headers_ms = (_current.start_wall - start_time) * 1000 + (headers_received - _current.start) * 1000
+        setup_ms = _current.dns_ms + _current.connect_ms + _current.tls_ms
+        ttfb_ms = max(headers_ms - setup_ms, 0.0)
+        body_ms = max(response_time - headers_ms, 0.0)
+        stats.record(name, response_time,
+                     [_current.dns_ms, _current.connect_ms, _current.tls_ms, ttfb_ms, body_ms],
+                     _current.new_connection)
+        _current.headers_received = None
+
+    @events.test_stop.add_listener
+    def on_test_stop(environment, **kwargs):
+        stats, state["stats"] = state["stats"], None
+        output_dir = recorder_output_dir(environment)
+        if stats is None or output_dir is None or not stats.rows:
+            return
+        suffix = f"_worker{environment.runner.worker_index}" if isinstance(environment.runner, WorkerRunner) else ""
+        stats.write(os.path.join(output_dir, f"report_phases{suffix}.csv"))
@@ -0,0 +1,132 @@
+from locust.runners import MasterRunner, WorkerRunner
+import json
+import os
+
+import numpy as np
+from gevent.threadpool import ThreadPool
+
+from latency_histogram import REQUEST_DTYPE, LatencyHistogram, save_histograms, write_percentile_summary
+from status_breakdown import StatusBreakdown, status_class, write_status_reports
+
+# Records buffered in memory before one batched write to disk.
+BATCH_SIZE = 4096
+
+
+class RequestRecorder:
+    """
+    Streams every request's start time, name, status and latency into an append-only
+    raw_requests<suffix>.bin file (REQUEST_DTYPE records, memory-mappable with
+    np.memmap) and keeps per-name HDR histograms saved as latency_hdr<suffix>.npz, plus
+    the per-status-class histograms and per-second counts of StatusBreakdown.
+
+    Records are buffered and written in batches on a dedicated thread, so disk I/O
+    never blocks the gevent loop that drives the users.
+    """
+
+    def __init__(self, output_dir, suffix="", write_raw=True, status_chunk_seconds=None):
+        os.makedirs(output_dir, exist_ok=True)
+        self.raw_path = os.path.join(output_dir, f"raw_requests{suffix}.bin")
+        self.names_path = os.path.join(output_dir, f"raw_requests{suffix}.json")
+        self.histogram_path = os.path.join(output_dir, f"latency_hdr{suffix}.npz")
+        self.names = []
+        self.name_indexes = {}
+        self.histograms = {"Aggregated": LatencyHistogram()}
+        self.buffer = np.empty(BATCH_SIZE, dtype=REQUEST_DTYPE)
+        self.classes = np.empty(BATCH_SIZE, dtype=np.uint8)
+        self.buffered = 0
+        self.statuses = StatusBreakdown(output_dir, suffix, status_chunk_seconds)
+        # Histogram-only recorders (soak runs) keep memory and disk use constant
+        self.file = open(self.raw_path, "wb") if write_raw else None
+        self.writer = ThreadPool(1)
+
+    def name_index(self, name):
+        index = self.name_indexes.get(name)
+        if index is None:
+            index = self.name_indexes[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def record(self, name, start_time, status, latency_ms, exception=None):
+        self.buffer[self.buffered] = (start_time, self.name_index(name), status, latency_ms)
+        self.classes[self.buffered] = status_class(status, exception)
+        self.buffered += 1
+        if self.buffered == BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.buffered:
+            return
+        batch = self.buffer[:self.buffered].copy()
+        classes = self.classes[:self.buffered].copy()
+        self.buffered = 0
+        for index, name in enumerate(self.names):
+            latencies = batch["latency_ms"][batch["name"] == index]
+            if len(latencies):
+                self.histograms.setdefault(name, LatencyHistogram()).record_ms(latencies)
+        self.histograms["Aggregated"].record_ms(batch["latency_ms"])
+        self.writer.spawn(self.statuses.write_counts, self.statuses.add_batch(self.names, batch, classes))
+        if self.file is not None:
+            self.writer.spawn(self.file.write, batch.tobytes())
+
+    def close(self):
+        self.flush()
+        self.writer.join()
+        self.writer.kill()
+        if self.file is not None:
+            self.file.close()
+            with open(self.names_path, "w", encoding="utf-8") as f:
+                json.dump({"dtype": REQUEST_DTYPE.descr, "names": self.names}, f, ensure_ascii=False)
+        save_histograms(self.histogram_path, self.histograms)
+        self.statuses.close()
+
+
+def recorder_output_dir(environment):
+    """
+    SARVAM_RAW_DIR wins; otherwise records go next to the --csv reports.
+    """
+    if os.getenv("SARVAM_RAW_DIR"):
+        return os.getenv("SARVAM_RAW_DIR")
+    options = environment.parsed_options
+    if options is not None and options.csv_prefix:
+        return os.path.dirname(os.path.abspath(options.csv_prefix))
+    return None
+
+
+def register_request_recorder(events):
+    """
+    Hooks a RequestRecorder into Locust's events. Set SARVAM_RAW_CAPTURE=0 to disable,
+    or SARVAM_RAW_CAPTURE=hdr to keep only the histograms (no raw_requests file).
+    """
+    state = {"recorder": None}
+
+    @events.test_start.add_listener
+    def on_test_start(environment, **kwargs):
+        if os.getenv("SARVAM_RAW_CAPTURE", "1") == "0" or isinstance(environment.runner, MasterRunner):
+            return
+        output_dir = recorder_output_dir(environment)
+        if output_dir is None:
+            return
+        suffix = f"_worker{environment.runner.worker_index}" if isinstance(environment.runner, WorkerRunner) else ""
+        # Soak runs rotate the per-second status counts into compressed chunks, like their history
+        options = environment.parsed_options
+        chunk_seconds = options.soak_chunk_minutes * 60 if getattr(options, "soak_dir", "") else None
+        state["recorder"] = RequestRecorder(output_dir, suffix, write_raw=os.getenv("SARVAM_RAW_CAPTURE") != "hdr",
+                                            status_chunk_seconds=chunk_seconds)
+
+    @events.request.add_listener
+    def on_request(name, response_time, response=None, start_time=None, exception=None, **kwargs):
+        recorder = state["recorder"]
+        if recorder is None:
+            return
+        status = getattr(response, "status_code", 0) or 0
+        recorder.record(name, start_time or 0.0, status, response_time, exception)
+
+    @events.test_stop.add_listener
+    def on_test_stop(environment, **kwargs):
+        recorder, state["recorder"] = state["recorder"], None
+        if recorder is None:
+            return
+        recorder.close()
+        if not isinstance(environment.runner, WorkerRunner):
+            write_percentile_summary(os.path.dirname(recorder.raw_path))
+            write_status_reports(os.path.dirname(recorder.raw_path))
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import time
+
+from phase_report import PHASES_FILENAME
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_BASE_DIR = os.path.join(BASE_DIR, 'results')
+CATALOG_FILENAME = 'catalog.sqlite'
+RUN_METADATA_FILENAME = 'run_metadata.json'
+DEFAULT_HOST = "https://api.sarvam.ai"
+
+# Folder names written by run_tests.py (c25_s4_rt5m) and the dashboard (c10_s2_rt1m_20250606-192039)
+CONFIG_NAME_PATTERN = re.compile(r"^c(?P<users>\d+)_s(?P<spawn_rate>\d+)_rt(?P<run_time>\d+[smh])(?:_(?P<timestamp>\d{8}-\d{6}))?$")
+
+RUNS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    config TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    stats_mtime REAL NOT NULL,
+    stats_size INTEGER NOT NULL,
+    stats_sha1 TEXT NOT NULL,
+    users INTEGER,
+    spawn_rate REAL,
+    run_time TEXT,
+    host TEXT,
+    git_commit TEXT,
+    started_at TEXT,
+    ingested_at REAL NOT NULL
+)
+"""
+STATS_INDEX = "CREATE INDEX IF NOT EXISTS stats_config ON stats (config)"
+
+
+def current_git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=BASE_DIR).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_run_metadata(output_dir, users, spawn_rate, run_time, host=None, **extra):
+    """
+    Records how a run was launched next to its reports, for the catalog to pick up.
+    """
+    metadata = {
+        'users': users,
+        'spawn_rate': spawn_rate,
+        'run_time': run_time,
+        'host': host or DEFAULT_HOST,
+        'git_commit': current_git_commit(),
+        'started_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    metadata.update(extra)
+    with open(os.path.join(output_dir, RUN_METADATA_FILENAME), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def mark_run_complete(output_dir, exit_code, **extra):
+    """
+    Stamps run_metadata.json once the run has finished, so interrupted runs can be told apart.
+    """
+    metadata_path = os.path.join(output_dir, RUN_METADATA_FILENAME)
+    metadata = {}
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    metadata.update(completed_at=time.strftime("%Y-%m-%dT%H:%M:%S"), exit_code=exit_code, **extra)
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def read_run_metadata(config_path):
+    """
+    Metadata from run_metadata.json, falling back to what the folder name encodes.
+    """
+    config_name = os.path.basename(config_path)
+    metadata = {'users': None, 'spawn_rate': None, 'run_time': None, 'host': None, 'git_commit': None,
+                'started_at': None}
+    match = CONFIG_NAME_PATTERN.match(config_name)
+    if match:
+        metadata['users'] = int(match['users'])
+        metadata['spawn_rate'] = float(match['spawn_rate'])
+        metadata['run_time'] = match['run_time']
+        if match['timestamp']:
+            metadata['started_at'] = time.strftime(
+                "%Y-%m-%dT%H:%M:%S", time.strptime(match['timestamp'], "%Y%m%d-%H%M%S"))
+    metadata_path = os.path.join(config_path, RUN_METADATA_FILENAME)
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            stored = json.load(f)
+        metadata.update({key: stored[key] for key in metadata if stored.get(key) is not None})
+    return metadata
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultsCatalog:
+    """
+    SQLite index of every run under results/: one `runs` row of metadata per config
+    folder, its report_stats.csv rows in `stats` and its report_phases.csv rows (when
+    present) in `phases`, with the same column names as the CSVs. `refresh()` only
+    re-reads reports whose mtime/size and hash changed.
+    """
+
+    def __init__(self, results_dir=RESULTS_BASE_DIR):
+        self.results_dir = results_dir
+        os.makedirs(results_dir, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(results_dir, CATALOG_FILENAME))
+        self.connection.execute(RUNS_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def has_table(self, name):
+        return self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+    def has_stats_table(self):
+        return self.has_table('stats')
+
+    def refresh(self):
+        """
+        Ingests new or changed runs and drops runs whose folders are gone.
+        Returns the number of runs (re)ingested.
+        """
+        known = {row[0]: row[1:] for row in self.connection.execute(
+            "SELECT config, stats_mtime, stats_size, stats_sha1, ingested_at FROM runs")}
+        seen = set()
+        ingested = 0
+        for entry in sorted(os.scandir(self.results_dir), key=lambda e: e.name):
+            stats_csv_path = os.path.join(entry.path, 'report_stats.csv')
+            if not entry.is_dir() or not os.path.exists(stats_csv_path):
+                continue
+            seen.add(entry.name)
+            stat = os.stat(stats_csv_path)
+            previous = known.get(entry.name)
+            # Distributed runs merge their phase timings after the stats are final
+            phases_path = os.path.join(entry.path, PHASES_FILENAME)
+            phases_changed = previous and os.path.exists(phases_path) and os.path.getmtime(phases_path) > previous[3]
+            if previous and previous[0] == stat.st_mtime and previous[1] == stat.st_size and not phases_changed:
+                continue
+            sha1 = file_sha1(stats_csv_path)
+            if previous and previous[2] == sha1 and not phases_changed:
+                # Touched but unchanged: just remember the new mtime
+                self.connection.execute("UPDATE runs SET stats_mtime = ?, stats_size = ? WHERE config = ?",
+                                        (stat.st_mtime, stat.st_size, entry.name))
+                continue
+            self.ingest_run(entry.name, entry.path, stats_csv_path, stat, sha1)
+            ingested += 1
+
+        for config in set(known) - seen:
+            self.delete_run(config)
+        self.connection.commit()
+        return ingested
+
+    def ingest_run(self, config, config_path, stats_csv_path, stat, sha1):
+        import pandas as pd
+        df = pd.read_csv(stats_csv_path)
+        df.insert(0, 'config', config)
+        self.delete_run(config)
+        df.to_sql('stats', self.connection, if_exists='append', index=False)
+        self.connection.execute(STATS_INDEX)
+        phases_path = os.path.join(config_path, PHASES_FILENAME)
+        if os.path.exists(phases_path):
+            phases = pd.read_csv(phases_path)
+            phases.insert(0, 'config', config)
+            phases.to_sql('phases', self.connection, if_exists='append', index=False)
+        metadata = read_run_metadata(config_path)
+        self.connection.execute(
+            "INSERT INTO runs (config, path, stats_mtime, stats_size, stats_sha1, users, spawn_rate, run_time, host, "
+            "git_commit, started_at, ingested_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (config, os.path.relpath(config_path, self.results_dir), stat.st_mtime, stat.st_size, sha1,
+             metadata['users'], metadata['spawn_rate'], metadata['run_time'], metadata['host'],
+             metadata['git_commit'], metadata['started_at'], time.time()))
+
+    def delete_run(self, config):
+        self.connection.execute("DELETE FROM runs WHERE config = ?", (config,))
+        for table in ('stats', 'phases'):
+            if self.has_table(table):
+                self.connection.execute(f"DELETE FROM {table} WHERE config = ?", (config,))
+
+    def runs(self):
+        import pandas as pd
+        return pd.read_sql("SELECT * FROM runs ORDER BY config", self.connection)
+
+    def run_paths(self):
+        """
+        {config: folder relative to results_dir} for every catalogued run, without pandas.
+        """
+        return dict(self.connection.execute("SELECT config, path FROM runs ORDER BY config"))
+
+    def stats(self, name=None, configs=None):
+        """
+        report_stats.csv rows for the catalogued runs, optionally filtered by
+        request name (e.g. 'Aggregated') and config names.
+        """
+        import pandas as pd
+        if not self.has_stats_table():
+            return pd.DataFrame()
+        query, params = "SELECT * FROM stats WHERE 1 = 1", []
+        if name is not None:
+            query += " AND Name = ?"
+            params.append(name)
+        if configs is not None:
+            query += f" AND config IN ({', '.join('?' for _ in configs)})"
+            params.extend(configs)
+        return pd.read_sql(query + " ORDER BY config", self.connection, params=params)
+
+    def phases(self, configs=None):
+        """
+        report_phases.csv rows (per-phase timings) for the catalogued runs that have them.
+        """
+        import pandas as pd
+        if not self.has_table('phases'):
+            return pd.DataFrame()
+        query, params = "SELECT * FROM phases", []
+        if configs is not None:
+            query += f" WHERE config IN ({', '.join('?' for _ in configs)})"
+            params.extend(configs)
+        return pd.read_sql(query + " ORDER BY config", self.connection, params=params)
+
+
+def open_catalog(results_dir=RESULTS_BASE_DIR):
+    """
+    Opens the catalog and brings it up to date with the results directory.
+    """
+    catalog = ResultsCatalog(results_dir)
+    ingested = catalog.refresh()
+    if ingested:
+        print(f"Results catalog: ingested {ingested} new or changed run(s).")
+    return catalog
+
+
+if __name__ == "__main__":
+    with open_catalog() as catalog:
+        print(catalog.runs().drop(columns=['stats_sha1', 'ingested_at']).to_string(index=False))
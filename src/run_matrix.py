@@ -0,0 +1,178 @@
+import csv
+import json
+import os
+import statistics
+import time
+
+import requests
+import yaml
+
+from languages import LANGUAGES, TARGET_LANGUAGE_CODE
+from results_catalog import DEFAULT_HOST, RUN_METADATA_FILENAME
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MATRIX_PATH = os.path.join(BASE_DIR, 'run_matrix.yaml')
+DEFAULT_COOLDOWN = {
+    'max_seconds': 120,
+    'probe_interval_seconds': 5,
+    'probes_per_check': 3,
+    'tolerance': 0.25,
+}
+PROBE_TIMEOUT_SECONDS = 10
+# Locust exits with 1 whenever any request failed; anything else means the run itself broke
+COMPLETE_EXIT_CODES = (0, 1)
+
+
+def load_run_matrix(path=DEFAULT_MATRIX_PATH):
+    """
+    Reads the YAML run matrix. Returns (runs, cooldown): a list of
+    {users, spawn_rate, run_time} dicts and the cooldown settings.
+    """
+    with open(path) as f:
+        matrix = yaml.safe_load(f) or {}
+    runs = []
+    for i, run in enumerate(matrix.get('runs') or []):
+        missing = {'users', 'spawn_rate', 'run_time'} - set(run)
+        if missing:
+            raise ValueError(f"Run {i + 1} in {path} is missing {', '.join(sorted(missing))}")
+        runs.append({'users': int(run['users']), 'spawn_rate': run['spawn_rate'], 'run_time': str(run['run_time'])})
+    cooldown = dict(DEFAULT_COOLDOWN, **(matrix.get('cooldown') or {}))
+    return runs, cooldown
+
+
+def run_dir_name(run):
+    return f"c{run['users']}_s{run['spawn_rate']}_rt{run['run_time']}"
+
+
+def run_time_seconds(run_time):
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    return int(run_time[:-1]) * units[run_time[-1]] if run_time[-1] in units else int(run_time)
+
+
+def run_target(host=None, engine='locust', locustfile='sarvamai_benchmarking.py', extra_args=()):
+    """
+    What a run was pointed at and how it generated load, as recorded in run_metadata.json.
+    """
+    return {'host': host or DEFAULT_HOST, 'engine': engine,
+            'locustfile': os.path.basename(locustfile), 'extra_args': [str(arg) for arg in extra_args]}
+
+
+def successful_requests(output_dir):
+    """
+    Aggregated Request Count minus Failure Count from the run's report_stats.csv.
+    """
+    with open(os.path.join(output_dir, 'report_stats.csv'), newline='') as f:
+        for row in csv.DictReader(f):
+            if row['Name'] == 'Aggregated':
+                return int(row['Request Count']) - int(row['Failure Count'])
+    return 0
+
+
+def run_is_complete(output_dir, run_time, target=None):
+    """
+    True when a previous invocation finished this run against the same target
+    (see run_target) with at least one successful request: its run_metadata.json
+    was marked complete with a COMPLETE_EXIT_CODES exit code, or (for runs
+    predating that marker, which were all default STUser runs against the real
+    API) its history spans the whole run time.
+    """
+    target = target or run_target()
+    if not os.path.exists(os.path.join(output_dir, 'report_stats.csv')):
+        return False
+    # A run where every request failed (bad key, target down) is re-run rather than kept
+    if successful_requests(output_dir) <= 0:
+        return False
+    metadata_path = os.path.join(output_dir, RUN_METADATA_FILENAME)
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+        # Older metadata predates the engine field; those runs all used Locust
+        recorded = run_target(metadata.get('host'), metadata.get('engine', 'locust'),
+                              metadata.get('locustfile', 'sarvamai_benchmarking.py'), metadata.get('extra_args', []))
+        return ('completed_at' in metadata and metadata.get('exit_code') in COMPLETE_EXIT_CODES
+                and recorded == target)
+    if target != run_target():
+        return False
+    history_path = os.path.join(output_dir, 'report_stats_history.csv')
+    if not os.path.exists(history_path):
+        return False
+    with open(history_path) as f:
+        lines = f.read().splitlines()
+    if len(lines) < 3:
+        return False
+    elapsed = int(lines[-1].split(',', 1)[0]) - int(lines[1].split(',', 1)[0])
+    # Locust's first and last history rows are a second or two inside the run time
+    return elapsed >= run_time_seconds(run_time) - 5
+
+
+class AdaptiveCooldown:
+    """
+    Replaces a fixed sleep between runs: measures the endpoint's idle latency once
+    before the sweep, then after each run probes it until the median latency is back
+    within `tolerance` of that baseline (or `max_seconds` pass).
+    """
+
+    def __init__(self, host, api_key, max_seconds=120, probe_interval_seconds=5, probes_per_check=3, tolerance=0.25):
+        self.url = f"{host.rstrip('/')}/transliterate"
+        self.headers = {"api-subscription-key": api_key or "", "Content-Type": "application/json"}
+        language = LANGUAGES[0]
+        self.payload = {"input": language["input"], "source_language_code": language["code"],
+                        "target_language_code": TARGET_LANGUAGE_CODE}
+        self.max_seconds = max_seconds
+        self.probe_interval_seconds = probe_interval_seconds
+        self.probes_per_check = probes_per_check
+        self.tolerance = tolerance
+        self.baseline_ms = None
+        self.session = requests.Session()
+
+    def probe_ms(self):
+        """
+        One request's latency in ms, or None if it failed or was throttled.
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, json=self.payload, headers=self.headers,
+                                         timeout=PROBE_TIMEOUT_SECONDS)
+        except requests.RequestException:
+            return None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return elapsed_ms if response.ok else None
+
+    def check_ms(self):
+        """
+        Median latency of `probes_per_check` probes, or None if any probe failed.
+        """
+        latencies = [self.probe_ms() for _ in range(self.probes_per_check)]
+        if None in latencies:
+            return None
+        return statistics.median(latencies)
+
+    def measure_baseline(self):
+        self.baseline_ms = self.check_ms()
+        if self.baseline_ms is None:
+            print("Warning: baseline latency probe failed; cooldowns will use the full max_seconds.")
+        else:
+            print(f"Baseline probe latency: {self.baseline_ms:.0f} ms")
+        return self.baseline_ms
+
+    def wait(self):
+        """
+        Blocks until latency is back to baseline. Returns the seconds waited.
+        """
+        start = time.time()
+        if self.baseline_ms is None:
+            time.sleep(self.max_seconds)
+            return self.max_seconds
+        threshold_ms = self.baseline_ms * (1 + self.tolerance)
+        while time.time() - start < self.max_seconds:
+            latency_ms = self.check_ms()
+            if latency_ms is not None and latency_ms <= threshold_ms:
+                waited = time.time() - start
+                print(f"Cooldown: probe latency {latency_ms:.0f} ms is back within {threshold_ms:.0f} ms "
+                      f"after {waited:.0f}s.")
+                return waited
+            status = "failed or throttled" if latency_ms is None else f"{latency_ms:.0f} ms"
+            print(f"Cooldown: probe {status}, waiting for <= {threshold_ms:.0f} ms...")
+            time.sleep(min(self.probe_interval_seconds, max(self.max_seconds - (time.time() - start), 0)))
+        print(f"Cooldown: latency not back to baseline after {self.max_seconds}s; continuing.")
+        return self.max_seconds
@@ -1,65 +1,227 @@
 import subprocess
 import os
 import time
-import shutil
 import math
-
-
-concurrency = [1, 5, 10, 25]
-spawn_rate = [1, 2, 2, 4]
-run_time = ["1m", "1m", "3m", "5m"]
+import argparse
+from distributed_runner import default_worker_count, run_distributed_test
+from generator_health import generator_warning
+from results_catalog import DEFAULT_HOST, mark_run_complete, write_run_metadata
+from mock_server import DEFAULT_PORT, LATENCY_PROFILES, mock_host, start_mock_server, stop_mock_server
+from async_engine import build_command as build_async_engine_command
+from soak_history import DEFAULT_CHUNK_MINUTES, HOURLY_FILENAME, TREND_FILENAME, analyse_soak_run
+from trace_replay import describe_trace
+from workload_corpus import CORPUS_DIR, write_length_bucket_summary
+from run_matrix import DEFAULT_MATRIX_PATH, AdaptiveCooldown, load_run_matrix, run_dir_name, run_is_complete, run_target
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOCUSTFILE_PATH = os.path.join(BASE_DIR, 'sarvamai_benchmarking.py')
+FAST_LOCUSTFILE_PATH = os.path.join(BASE_DIR, 'fast_benchmarking.py')
+OPEN_LOOP_LOCUSTFILE_PATH = os.path.join(BASE_DIR, 'open_loop_benchmarking.py')
+CORPUS_LOCUSTFILE_PATH = os.path.join(BASE_DIR, 'corpus_benchmarking.py')
+TRACE_LOCUSTFILE_PATH = os.path.join(BASE_DIR, 'trace_benchmarking.py')
+LOCUSTFILES = {"requests": LOCUSTFILE_PATH, "fast": FAST_LOCUSTFILE_PATH}
 RESULTS_DIR = os.path.join(BASE_DIR, "..", 'results')
+# Bytes of locust.log echoed after each run; the full log stays in the run folder
+LOG_TAIL_BYTES = 4000
 
-def run_locust_test(num_users, spawn_rate_val, run_time_val):
+def print_log_tail(log_path, max_bytes=LOG_TAIL_BYTES):
+    with open(log_path, "rb") as f:
+        f.seek(max(os.path.getsize(log_path) - max_bytes, 0))
+        print(f.read().decode("utf-8", errors="replace"))
+
+def run_locust_test(num_users, spawn_rate_val, run_time_val, host=None, env=None,
+                    locustfile=LOCUSTFILE_PATH, workers=0, extra_args=(), engine="locust", soak=False):
     dir_name = f"c{num_users}_s{spawn_rate_val}_rt{run_time_val}"
     output_dir = os.path.join(RESULTS_DIR, dir_name)
 
     os.makedirs(output_dir, exist_ok=True)
+    write_run_metadata(output_dir, num_users, spawn_rate_val, run_time_val, host, engine=engine,
+                       locustfile=os.path.basename(locustfile), workers=workers, extra_args=list(extra_args))
     print(f"\n--- Starting test: Concurrency={num_users}, Spawn Rate={spawn_rate_val}, Run Time={run_time_val} ---")
     print(f"Results will be saved to: {output_dir}")
     
     command = [
         "locust",
-        "-f", LOCUSTFILE_PATH,
+        "-f", locustfile,
         "--headless",
         "-u", str(num_users),
         "-r", str(spawn_rate_val),
         "--run-time", run_time_val,
-        f"--csv={os.path.join(output_dir, 'report')}"
     ]
+    if soak:
+        # Soak runs skip Locust's ever-growing --csv history for rotated, compressed chunks;
+        # the per-process recorders follow SARVAM_RAW_DIR and keep histograms only by default
+        command += ["--soak-dir", output_dir]
+        env = dict(env or os.environ, SARVAM_RAW_DIR=output_dir)
+        env.setdefault("SARVAM_RAW_CAPTURE", "hdr")
+    else:
+        command.append(f"--csv={os.path.join(output_dir, 'report')}")
+    if host:
+        command += ["--host", host]
+    command += list(extra_args)
+    if engine == "asyncio":
+        command = build_async_engine_command(num_users, spawn_rate_val, run_time_val,
+                                             os.path.join(output_dir, 'report'), host)
 
+    exit_code = None
     try:
-        process = subprocess.run(command, capture_output=True, text=True, check=True)
-        print("Locust test completed successfully.")
-        print("STDOUT:\n", process.stdout)
+        if workers:
+            exit_code = run_distributed_test(locustfile, num_users, spawn_rate_val, run_time_val, output_dir,
+                                             workers, host, env, extra_args=extra_args)
+            print(f"Distributed Locust test finished with exit code {exit_code}.")
+        else:
+            # Output goes straight to a file: a multi-hour run would otherwise buffer it all in memory
+            log_path = os.path.join(output_dir, "locust.log")
+            with open(log_path, "w") as log_file:
+                exit_code = subprocess.run(command, stdout=log_file, stderr=subprocess.STDOUT, env=env).returncode
+            # Locust exits with 1 whenever any request failed; the run itself still completed
+            print(f"Locust test finished with exit code {exit_code}. Output: {log_path}")
+            print_log_tail(log_path)
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+    if exit_code is not None and os.path.exists(os.path.join(output_dir, 'report_stats.csv')):
+        saturation_warning = generator_warning(output_dir)
+        if saturation_warning:
+            print(f"WARNING: {saturation_warning}")
+        mark_run_complete(output_dir, exit_code, generator_saturated=saturation_warning is not None)
+        # Only corpus-driven runs have length buckets to summarise
+        if write_length_bucket_summary(output_dir):
+            print(f"Latency by input length saved to {output_dir}/report_length_buckets.csv")
+        if soak:
+            analyse_soak_run(output_dir)
+            print(f"Soak summaries saved to {output_dir}/{HOURLY_FILENAME} and {TREND_FILENAME}")
     print(f"--- Test for {dir_name} finished. ---\n\n")
-    time.sleep(120)
+    return exit_code
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Runs the Locust load test configurations.")
+    parser.add_argument("--matrix", default=DEFAULT_MATRIX_PATH,
+                        help="YAML file listing the runs (users, spawn_rate, run_time) and cooldown settings.")
+    parser.add_argument("--rerun", action="store_true",
+                        help="Run every configuration again, even those with complete results.")
+    parser.add_argument("--mock", action="store_true",
+                        help="Run against the bundled local mock server instead of api.sarvam.ai.")
+    parser.add_argument("--mock-port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--mock-profile", default="baseline",
+                        help=f"Mock latency profile ({', '.join(LATENCY_PROFILES)}) or path to a JSON profile.")
+    parser.add_argument("--engine", choices=["locust", "asyncio"], default="locust",
+                        help="'asyncio' runs the STUser workload on src/async_engine.py (aiohttp) instead of Locust.")
+    parser.add_argument("--client", choices=list(LOCUSTFILES), default="requests",
+                        help="'requests' runs STUser; 'fast' runs the pooled, pre-serialized FastSTUser.")
+    parser.add_argument("--pool-size", type=int, default=0,
+                        help="Shared keep-alive pool size for --client fast (0 = one connection per user).")
+    parser.add_argument("--arrival-rate", type=float, default=None,
+                        help="Open-loop mode: offer this many requests/s regardless of response times.")
+    parser.add_argument("--language-rates", default="",
+                        help="Open-loop per-language requests/s, e.g. 'Malayalam=2,Hindi=0.5'.")
+    parser.add_argument("--corpus", action="store_true",
+                        help="Send varied-length inputs from the per-language corpus files instead of fixed greetings.")
+    parser.add_argument("--corpus-dir", default=CORPUS_DIR,
+                        help="Folder of <language code>.txt corpus files for --corpus.")
+    parser.add_argument("--language-weights", default="",
+                        help="--corpus traffic mix, e.g. 'Hindi=5,Tamil=2,Odia=1' (defaults to equal weights).")
+    parser.add_argument("--length-weights", default="",
+                        help="--corpus input-length mix over word, phrase, sentence and paragraph, e.g. 'word=1,paragraph=2'.")
+    parser.add_argument("--trace", default="",
+                        help="Replay this traffic trace (timestamp,language_code,input CSV) with its recorded timing.")
+    parser.add_argument("--speedup", type=float, default=1.0,
+                        help="--trace time compression, e.g. 10 replays an hour of traffic in 6 minutes.")
+    parser.add_argument("--soak", action="store_true",
+                        help="Memory-bounded mode for multi-hour runs: rotated, compressed history and 1m/10m aggregates.")
+    parser.add_argument("--soak-chunk-minutes", type=float, default=DEFAULT_CHUNK_MINUTES,
+                        help="Minutes of per-second history per compressed chunk in --soak mode.")
+    parser.add_argument("--distributed", action="store_true",
+                        help="Run each configuration as a Locust master plus worker processes.")
+    parser.add_argument("--workers", type=int, default=default_worker_count(),
+                        help="Worker processes for --distributed (defaults to the CPU core count).")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    open_loop = args.arrival_rate is not None or args.language_rates
+    if args.engine == "asyncio" and (args.distributed or open_loop or args.client != "requests"):
+        print("\nERROR: --engine asyncio runs the closed-loop STUser workload in one process; "
+              "it can't be combined with --distributed, --client fast or open-loop options.")
+        return
+    if args.corpus and (args.engine != "locust" or open_loop or args.client != "requests"):
+        print("\nERROR: --corpus runs its own closed-loop user class on Locust; "
+              "it can't be combined with --engine asyncio, --client fast or open-loop options.")
+        return
+    if args.trace and (args.engine != "locust" or open_loop or args.corpus or args.client != "requests"):
+        print("\nERROR: --trace replays its own open-loop user class on Locust; "
+              "it can't be combined with --engine asyncio, --client fast, --corpus or open-loop options.")
+        return
+    if args.soak and (args.engine != "locust" or args.distributed):
+        print("\nERROR: --soak records through a Locust plugin on a single process; "
+              "it can't be combined with --engine asyncio or --distributed.")
+        return
     start_time = time.time()
-    if os.path.exists(RESULTS_DIR):
-        print(f"Clearing existing results directory: {RESULTS_DIR}")
-        shutil.rmtree(RESULTS_DIR)
+    runs, cooldown_settings = load_run_matrix(args.matrix)
+    locustfile, extra_args = LOCUSTFILES[args.client], []
+    if open_loop:
+        # Open-loop runs keep -u as the pool of users available to serve the schedule
+        locustfile = OPEN_LOOP_LOCUSTFILE_PATH
+        extra_args = ["--arrival-rate", str(args.arrival_rate or 0), "--language-rates", args.language_rates]
+        print(f"Open-loop mode: arrival rate {args.arrival_rate} req/s, language rates '{args.language_rates}'")
+    if args.corpus:
+        locustfile = CORPUS_LOCUSTFILE_PATH
+        extra_args = ["--corpus-dir", args.corpus_dir, "--language-weights", args.language_weights,
+                      "--length-weights", args.length_weights]
+        print(f"Corpus mode: {args.corpus_dir}, language weights '{args.language_weights}', "
+              f"length weights '{args.length_weights}'")
+    if args.trace:
+        locustfile = TRACE_LOCUSTFILE_PATH
+        extra_args = ["--trace", os.path.abspath(args.trace), "--speedup", str(args.speedup)]
+        trace = describe_trace(args.trace, args.speedup)
+        print(f"Trace replay: {trace['requests']} requests over {trace['duration_seconds']:.0f}s at "
+              f"{args.speedup:g}x (peak {trace['peak_rate']} req/s); runs stop when the trace ends or at their run time")
+    if args.soak:
+        extra_args = extra_args + ["--soak-chunk-minutes", str(args.soak_chunk_minutes)]
+        print(f"Soak mode: history rotated every {args.soak_chunk_minutes} minutes")
+
+    host = mock_host(args.mock_port) if args.mock else None
+    # Earlier results are kept; runs already finished against the same target are skipped
+    # so an interrupted sweep resumes, while a mock result never stands in for a real one
     os.makedirs(RESULTS_DIR, exist_ok=True)
-    print(f"Created main results directory: {RESULTS_DIR}")
+    target = run_target(host, args.engine, locustfile, extra_args)
+    pending = []
+    for run in runs:
+        if not args.rerun and run_is_complete(os.path.join(RESULTS_DIR, run_dir_name(run)), run['run_time'], target):
+            print(f"Skipping {run_dir_name(run)}: complete results already exist (use --rerun to repeat it).")
+        else:
+            pending.append(run)
+    if not pending:
+        print("Every run in the matrix already has complete results.")
+        return
 
-    if not os.getenv("SARVAM_API_KEY"):
+    mock_process = None
+    env = dict(os.environ, SARVAM_POOL_SIZE=str(args.pool_size))
+    if args.mock:
+        # The mock accepts any key, so a placeholder keeps STUser.on_start happy.
+        env["SARVAM_API_KEY"] = os.getenv("SARVAM_API_KEY", "mock-key")
+        print(f"Starting local mock server at {host} (profile: {args.mock_profile})")
+        mock_process = start_mock_server(args.mock_port, args.mock_profile)
+    elif not os.getenv("SARVAM_API_KEY"):
         print("\nERROR: SARVAM_API_KEY environment variable is not set.")
         print("Please set it before running this script (e.g., export SARVAM_API_KEY='YOUR_KEY').")
         return
 
-    for i in range(4):
-        num_users = concurrency[i]
-        spawn_rate_val = spawn_rate[i]
-        run_time_val = run_time[i]
-        run_locust_test(num_users, spawn_rate_val, run_time_val)
-        
+    # The mock recovers instantly, so only the real API gets a cooldown between runs
+    cooldown = None
+    if not args.mock and len(pending) > 1:
+        cooldown = AdaptiveCooldown(DEFAULT_HOST, env.get("SARVAM_API_KEY"), **cooldown_settings)
+        cooldown.measure_baseline()
+
+    try:
+        for i, run in enumerate(pending):
+            run_locust_test(run['users'], run['spawn_rate'], run['run_time'], host, env,
+                            locustfile, args.workers if args.distributed else 0, extra_args, args.engine, args.soak)
+            if cooldown and i < len(pending) - 1:
+                cooldown.wait()
+    finally:
+        stop_mock_server(mock_process)
+
     end_time = time.time()
     
     total_seconds = end_time - start_time
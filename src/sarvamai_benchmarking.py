@@ -1,21 +1,39 @@
-from locust import HttpUser, task, between
+from locust import HttpUser, task, between, events
 import os
 
+from generator_monitor import register_generator_monitor
+from phase_timing import install_phase_timing, register_phase_recorder
+from request_recorder import register_request_recorder
+from soak_recorder import register_soak_recorder
+
 SARVAM_API_KEY = os.getenv("SARVAM_API_KEY")
 
+# Optional "min,max" override of the think time, e.g. SARVAM_WAIT_TIME=0,0 for generator ceiling benchmarks
+WAIT_TIME_RANGE = tuple(float(x) for x in os.getenv("SARVAM_WAIT_TIME", "4,8").split(","))
+
 if not SARVAM_API_KEY:
     print("[WARNING]: SARVAM_API_KEY is not set in the environment variables!")
 
+# Streams every request into raw_requests*.bin + latency_hdr*.npz next to the CSV reports
+register_request_recorder(events)
+# Splits each request into DNS / connect / TLS / TTFB / body in report_phases*.csv
+register_phase_recorder(events)
+# Samples the generator's own CPU / RSS / sockets / loop lag into report_generator*.csv
+register_generator_monitor(events)
+# --soak-dir: memory-bounded reports for multi-hour runs (rotated, compressed history + 1m/10m aggregates)
+register_soak_recorder(events)
+
 class STUser(HttpUser):
     # For 4th configuration, i have to use wait time between(5, 10), because i was getting error that "too many request"
     # For configuration 1, 2, 3 i have used wait time between(2, 5)
-    wait_time = between(4, 8)
+    wait_time = between(*WAIT_TIME_RANGE)
     host = "https://api.sarvam.ai"
     
     def on_start(self):
         if not SARVAM_API_KEY:
             self.environment.process_exit_code = 1
             raise Exception("SARVAM_API_KEY is not set. Cannot proceed with tests!")
+        install_phase_timing(self.client)
     
     @task
     def transliterate_bengali_to_english(self):
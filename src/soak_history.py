@@ -0,0 +1,217 @@
+import argparse
+import csv
+import glob
+import gzip
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_BASE_DIR = os.path.join(BASE_DIR, 'results')
+# Soak runs keep their per-second history as gzip-compressed, time-based chunks in this subfolder
+HISTORY_CHUNK_DIR = 'history'
+HISTORY_CHUNK_PATTERN = 'report_stats_history_*.csv.gz'
+DEFAULT_CHUNK_MINUTES = 60
+AGGREGATE_RESOLUTIONS = {'1m': 60, '10m': 600}
+AGGREGATE_FILENAMES = {resolution: f'report_soak_{resolution}.csv' for resolution in AGGREGATE_RESOLUTIONS}
+AGGREGATE_HEADER = ['Timestamp', 'Window (s)', 'User Count', 'Name', 'Requests', 'Failures', 'Requests/s',
+                    'Failure Rate (%)', 'Average', '50%', '95%', '99%', 'Max']
+HOURLY_FILENAME = 'report_soak_hourly.csv'
+TREND_FILENAME = 'report_soak_trend.csv'
+STREAM_ROWS = 100_000
+# Chunk columns kept as text; every other column is numeric
+TEXT_COLUMNS = ('Type', 'Name', 'Status')
+# A name is "degrading" when its fitted p95 trend grows by more than this over the run
+DEGRADATION_THRESHOLD_PERCENT = 20
+
+
+class HistoryChunkWriter:
+    """
+    Appends history rows to history/report_stats_history_<start>.csv.gz (or another
+    folder and prefix), starting a new chunk every `chunk_seconds`. Each chunk is
+    flushed as it goes, so an interrupted run loses at most the last few rows.
+    """
+
+    def __init__(self, output_dir, header, chunk_seconds=DEFAULT_CHUNK_MINUTES * 60,
+                 chunk_dir=HISTORY_CHUNK_DIR, prefix='report_stats_history'):
+        self.chunk_dir = os.path.join(output_dir, chunk_dir)
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        self.prefix = prefix
+        self.header = header
+        self.chunk_seconds = chunk_seconds
+        self.file = None
+        self.writer = None
+        self.chunk_end = 0
+
+    def write_rows(self, timestamp, rows):
+        if self.file is None or timestamp >= self.chunk_end:
+            self.rotate(timestamp)
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def rotate(self, timestamp):
+        self.close()
+        name = time.strftime('%Y%m%d-%H%M%S', time.localtime(timestamp))
+        self.file = gzip.open(os.path.join(self.chunk_dir, f'{self.prefix}_{name}.csv.gz'), 'wt',
+                              newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.header)
+        self.chunk_end = timestamp + self.chunk_seconds
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def history_chunk_paths(config_path):
+    # Chunk names sort chronologically
+    return sorted(glob.glob(os.path.join(config_path, HISTORY_CHUNK_DIR, HISTORY_CHUNK_PATTERN)))
+
+
+def read_chunk_rows(path):
+    """
+    Yields a chunk's rows as dicts. A chunk still being written (or cut off by a crash)
+    has no gzip trailer yet; its rows are read up to that point.
+    """
+    with gzip.open(path, 'rt', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        try:
+            for row in reader:
+                yield row
+        except (EOFError, gzip.BadGzipFile):
+            return
+
+
+def iter_history(config_path, usecols=None, rows=STREAM_ROWS):
+    """
+    Streams a run's history as DataFrames of at most `rows` rows: soak chunks when the
+    run has them, otherwise report_stats_history.csv read in pieces. Memory use stays
+    constant however long the run was.
+    """
+    paths = history_chunk_paths(config_path)
+    if not paths:
+        history_path = os.path.join(config_path, 'report_stats_history.csv')
+        yield from pd.read_csv(history_path, usecols=usecols, na_values=['N/A'], chunksize=rows)
+        return
+    yield from iter_chunks(paths, usecols, rows)
+
+
+def iter_chunks(paths, usecols=None, rows=STREAM_ROWS):
+    """
+    Streams the rows of HistoryChunkWriter chunks, in order, as DataFrames of at most `rows` rows.
+    """
+    block = []
+    for path in paths:
+        for row in read_chunk_rows(path):
+            block.append({key: row[key] for key in usecols} if usecols else row)
+            if len(block) == rows:
+                yield history_frame(block)
+                block = []
+    if block:
+        yield history_frame(block)
+
+
+def history_frame(rows):
+    frame = pd.DataFrame(rows).replace({'N/A': np.nan, '': np.nan})
+    for column in frame.columns:
+        if column not in TEXT_COLUMNS:
+            frame[column] = pd.to_numeric(frame[column])
+    return frame
+
+
+def has_soak_history(config_path):
+    return bool(history_chunk_paths(config_path)) or os.path.exists(
+        os.path.join(config_path, AGGREGATE_FILENAMES['1m']))
+
+
+def hourly_summary(config_path):
+    """
+    Per-hour Aggregated requests, failures and worst per-second p95/max latency, built
+    by streaming the per-second history. Catches short spikes the 1m/10m averages smooth out.
+    """
+    hours = {}
+    columns = ['Timestamp', 'Name', 'Requests/s', 'Failures/s', '95%', '100%']
+    for block in iter_history(config_path, usecols=columns):
+        block = block[block['Name'] == 'Aggregated']
+        grouped = block.assign(Hour=block['Timestamp'] // 3600 * 3600).groupby('Hour').agg(
+            Seconds=('Timestamp', 'size'), Requests=('Requests/s', 'sum'), Failures=('Failures/s', 'sum'),
+            WorstP95=('95%', 'max'), WorstMax=('100%', 'max'))
+        for hour, row in grouped.iterrows():
+            if hour in hours:
+                current = hours[hour]
+                hours[hour] = [current[0] + row['Seconds'], current[1] + row['Requests'], current[2] + row['Failures'],
+                               np.fmax(current[3], row['WorstP95']), np.fmax(current[4], row['WorstMax'])]
+            else:
+                hours[hour] = row.tolist()
+    summary = pd.DataFrame.from_dict(hours, orient='index',
+                                     columns=['Seconds', 'Requests', 'Failures', 'Worst 1s p95', 'Worst 1s Max'])
+    summary.index.name = 'Hour'
+    return summary.sort_index().reset_index()
+
+
+def load_aggregate(config_path, resolution='1m'):
+    return pd.read_csv(os.path.join(config_path, AGGREGATE_FILENAMES[resolution]), na_values=['N/A'])
+
+
+def soak_trend(aggregate):
+    """
+    Per-name least-squares slope of p50/p95 latency (ms per hour) and of the failure
+    rate over the run, plus the first and last hour's medians of the windowed p95.
+    A name is degrading when its fitted p95 grows by more than DEGRADATION_THRESHOLD_PERCENT.
+    """
+    rows = []
+    for name, windows in aggregate.dropna(subset=['95%']).groupby('Name', sort=False):
+        hours = (windows['Timestamp'] - windows['Timestamp'].min()).to_numpy() / 3600
+        duration = hours.max()
+        if len(windows) < 3 or duration <= 0:
+            continue
+        p50_slope = np.polyfit(hours, windows['50%'].to_numpy(), 1)[0]
+        p95_slope, p95_start = np.polyfit(hours, windows['95%'].to_numpy(), 1)
+        error_slope = np.polyfit(hours, windows['Failure Rate (%)'].to_numpy(), 1)[0]
+        first_hour = windows.loc[hours <= min(1, duration / 2), '95%'].median()
+        last_hour = windows.loc[hours >= max(duration - 1, duration / 2), '95%'].median()
+        growth = p95_slope * duration / p95_start * 100 if p95_start > 0 else 0.0
+        rows.append({
+            'Name': name, 'Hours': round(duration, 2),
+            'p50 Slope (ms/h)': p50_slope, 'p95 Slope (ms/h)': p95_slope,
+            'Failure Rate Slope (pp/h)': error_slope,
+            'First Hour p95': first_hour, 'Last Hour p95': last_hour,
+            'p95 Growth (%)': growth, 'Degrading': growth > DEGRADATION_THRESHOLD_PERCENT,
+        })
+    return pd.DataFrame(rows)
+
+
+def analyse_soak_run(config_path):
+    """
+    Writes report_soak_hourly.csv and report_soak_trend.csv for a soak run and returns both.
+    """
+    hourly = hourly_summary(config_path)
+    hourly.to_csv(os.path.join(config_path, HOURLY_FILENAME), index=False)
+    trend = soak_trend(load_aggregate(config_path, '1m'))
+    trend.to_csv(os.path.join(config_path, TREND_FILENAME), index=False)
+    return hourly, trend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hourly summary and latency trend of soak runs, streamed in constant memory.")
+    parser.add_argument("config_paths", nargs="*", help="Soak run folders (defaults to every soak run under results/).")
+    args = parser.parse_args()
+    config_paths = args.config_paths or sorted(
+        entry.path for entry in os.scandir(RESULTS_BASE_DIR) if entry.is_dir() and has_soak_history(entry.path))
+    for config_path in config_paths:
+        hourly, trend = analyse_soak_run(config_path)
+        print(f"\n--- {os.path.basename(os.path.normpath(config_path))} ---")
+        print(hourly.assign(Hour=pd.to_datetime(hourly['Hour'], unit='s')).round(1).to_string(index=False))
+        if trend.empty:
+            print("Not enough 1m windows for a trend yet.")
+            continue
+        print(trend.round(2).to_string(index=False))
+        for name in trend.loc[trend['Degrading'], 'Name']:
+            print(f"Degrading: {name} p95 grew over the run; check for leaks or queue build-up on the API side.")
+
+
+if __name__ == "__main__":
+    main()
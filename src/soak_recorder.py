@@ -0,0 +1,178 @@
+from locust.runners import WorkerRunner
+from locust.stats import PERCENTILES_TO_REPORT, StatsCSV, calculate_response_time_percentile, get_readable_percentiles
+import csv
+import os
+import time
+
+import gevent
+
+from soak_history import (AGGREGATE_FILENAMES, AGGREGATE_HEADER, AGGREGATE_RESOLUTIONS, DEFAULT_CHUNK_MINUTES,
+                          HistoryChunkWriter)
+
+HISTORY_HEADER = ["Timestamp", "User Count", "Type", "Name", "Requests/s", "Failures/s",
+                  *get_readable_percentiles(PERCENTILES_TO_REPORT),
+                  "Total Request Count", "Total Failure Count", "Total Median Response Time",
+                  "Total Average Response Time", "Total Min Response Time", "Total Max Response Time",
+                  "Total Average Content Size"]
+# report_stats / failures / exceptions are rewritten this often, like Locust's own --csv writer
+REPORT_INTERVAL_SECONDS = 10
+
+
+def snapshot(entry):
+    return entry.num_requests, entry.num_failures, entry.total_response_time, dict(entry.response_times)
+
+
+def window_stats(current, previous):
+    """
+    Requests, failures, total response time and the response-time histogram accumulated
+    between two snapshots of the same stats entry.
+    """
+    requests, failures, total_time, response_times = current
+    if previous is not None:
+        requests -= previous[0]
+        failures -= previous[1]
+        total_time -= previous[2]
+        response_times = {key: count - previous[3].get(key, 0) for key, count in response_times.items()
+                          if count > previous[3].get(key, 0)}
+    return requests, failures, total_time, response_times
+
+
+def window_percentile(requests, response_times, percent):
+    if not requests:
+        return "N/A"
+    return int(calculate_response_time_percentile(response_times, requests, percent))
+
+
+class SoakRecorder:
+    """
+    Replaces Locust's --csv writer for soak runs. Locust keeps the whole history file open
+    and growing for the length of the run; this writes the Aggregated per-second history
+    into rotating gzip chunks, per-name 1m/10m aggregates, and the usual report_stats /
+    failures / exceptions CSVs, holding only the last snapshot of each window in memory.
+    """
+
+    def __init__(self, environment, output_dir, chunk_seconds):
+        self.environment = environment
+        self.output_dir = output_dir
+        self.report_prefix = os.path.join(output_dir, "report")
+        self.history = HistoryChunkWriter(output_dir, HISTORY_HEADER, chunk_seconds)
+        self.csv = StatsCSV(environment, PERCENTILES_TO_REPORT)
+        self.aggregate_files = {}
+        self.aggregate_writers = {}
+        for resolution in AGGREGATE_RESOLUTIONS:
+            self.aggregate_files[resolution] = open(os.path.join(output_dir, AGGREGATE_FILENAMES[resolution]), "w",
+                                                    newline="")
+            self.aggregate_writers[resolution] = csv.writer(self.aggregate_files[resolution])
+            self.aggregate_writers[resolution].writerow(AGGREGATE_HEADER)
+        now = time.time()
+        self.user_count = environment.runner.user_count
+        self.last_second = (now, snapshot(environment.stats.total))
+        self.window_starts = {resolution: (now, self.snapshot_entries()) for resolution in AGGREGATE_RESOLUTIONS}
+        self.next_report = now + REPORT_INTERVAL_SECONDS
+
+    def snapshot_entries(self):
+        entries = {entry.name: snapshot(entry) for entry in self.environment.stats.entries.values()}
+        entries["Aggregated"] = snapshot(self.environment.stats.total)
+        return entries
+
+    def tick(self):
+        now = time.time()
+        # Kept from the last tick: by the time close() runs the users have already stopped
+        self.user_count = self.environment.runner.user_count
+        self.write_second(now)
+        for resolution, seconds in AGGREGATE_RESOLUTIONS.items():
+            if now - self.window_starts[resolution][0] >= seconds:
+                self.write_window(resolution, now)
+        if now >= self.next_report:
+            self.write_reports()
+            self.next_report = now + REPORT_INTERVAL_SECONDS
+
+    def write_second(self, now):
+        total = self.environment.stats.total
+        start, previous = self.last_second
+        current = snapshot(total)
+        requests, failures, _, response_times = window_stats(current, previous)
+        elapsed = max(now - start, 1e-9)
+        self.last_second = (now, current)
+        row = [int(now), self.user_count, "", "Aggregated",
+               f"{requests / elapsed:2f}", f"{failures / elapsed:2f}",
+               *(window_percentile(requests, response_times, percent) for percent in PERCENTILES_TO_REPORT),
+               total.num_requests, total.num_failures, total.median_response_time, total.avg_response_time,
+               total.min_response_time or 0, total.max_response_time, total.avg_content_length]
+        self.history.write_rows(int(now), [row])
+
+    def write_window(self, resolution, now):
+        start, previous = self.window_starts[resolution]
+        current = self.snapshot_entries()
+        elapsed = max(now - start, 1e-9)
+        writer = self.aggregate_writers[resolution]
+        for name, entry in current.items():
+            requests, failures, total_time, response_times = window_stats(entry, previous.get(name))
+            if not requests and not failures:
+                continue
+            writer.writerow([int(start), round(elapsed), self.user_count, name, requests, failures,
+                             round(requests / elapsed, 3), round(failures / requests * 100, 3) if requests else 0.0,
+                             round(total_time / requests, 1) if requests else "N/A",
+                             window_percentile(requests, response_times, 0.5),
+                             window_percentile(requests, response_times, 0.95),
+                             window_percentile(requests, response_times, 0.99),
+                             max(response_times, default="N/A")])
+        self.aggregate_files[resolution].flush()
+        self.window_starts[resolution] = (now, current)
+
+    def write_reports(self):
+        for suffix, write in (("stats", self.csv.requests_csv), ("failures", self.csv.failures_csv),
+                              ("exceptions", self.csv.exceptions_csv)):
+            with open(f"{self.report_prefix}_{suffix}.csv", "w", newline="") as f:
+                write(csv.writer(f))
+
+    def close(self):
+        now = time.time()
+        self.write_second(now)
+        for resolution in AGGREGATE_RESOLUTIONS:
+            # The last, partial window still counts; its "Window (s)" column says how long it was
+            if now - self.window_starts[resolution][0] >= 1:
+                self.write_window(resolution, now)
+            self.aggregate_files[resolution].close()
+        self.history.close()
+        self.write_reports()
+
+
+def record_every_second(recorder):
+    while True:
+        gevent.sleep(1)
+        recorder.tick()
+
+
+def register_soak_recorder(events):
+    """
+    Adds --soak-dir / --soak-chunk-minutes. With --soak-dir set (and no --csv), the master
+    or local runner writes memory-bounded soak reports into that folder (see SoakRecorder).
+    """
+    state = {"recorder": None, "greenlet": None}
+
+    @events.init_command_line_parser.add_listener
+    def add_soak_arguments(parser):
+        parser.add_argument("--soak-dir", type=str, default="",
+                            help="Soak mode: write rotated, compressed history and 1m/10m aggregates to this folder.")
+        parser.add_argument("--soak-chunk-minutes", type=float, default=DEFAULT_CHUNK_MINUTES,
+                            help="Minutes of per-second history per compressed chunk in soak mode.")
+
+    @events.test_start.add_listener
+    def on_test_start(environment, **kwargs):
+        options = environment.parsed_options
+        if options is None or not options.soak_dir or isinstance(environment.runner, WorkerRunner):
+            return
+        os.makedirs(options.soak_dir, exist_ok=True)
+        recorder = SoakRecorder(environment, options.soak_dir, options.soak_chunk_minutes * 60)
+        state["recorder"] = recorder
+        state["greenlet"] = gevent.spawn(record_every_second, recorder)
+
+    @events.quitting.add_listener
+    def on_quitting(environment, **kwargs):
+        # After test_stop, so the final worker reports are already merged into the stats
+        recorder, state["recorder"] = state["recorder"], None
+        if recorder is None:
+            return
+        state["greenlet"].kill()
+        recorder.close()
@@ -0,0 +1,244 @@
+import csv
+import glob
+import os
+import sys
+
+import numpy as np
+
+from latency_histogram import LatencyHistogram, load_histograms, save_histograms
+
+# Every request lands in exactly one class. "timeout" and "connection" are requests
+# that got no response at all (status 0), told apart by the exception raised.
+STATUS_CLASSES = ["2xx", "429", "4xx", "5xx", "timeout", "connection", "other"]
+SUCCESS_CLASS = "2xx"
+THROTTLE_CLASS = "429"
+# Classes that are neither a success nor a throttle: the server or the network failed
+ERROR_CLASSES = ["5xx", "timeout", "connection"]
+STATUS_HISTOGRAM_PATTERN = "status_hdr*.npz"
+STATUS_COUNTS_PATTERN = "status_counts*.csv"
+# Soak runs rotate their counts into compressed chunks here, and their timeline is per minute
+STATUS_COUNTS_CHUNK_DIR = "status_counts"
+STATUS_COUNTS_CHUNK_PATTERN = "status_counts*.csv.gz"
+SOAK_TIMELINE_SECONDS = 60
+STATUS_COUNTS_HEADER = ["Timestamp", "Name", "Status", "Count"]
+STATUS_PERCENTILES_FILENAME = "report_status_percentiles.csv"
+STATUS_TIMELINE_FILENAME = "report_status_timeline.csv"
+STATUS_PERCENTILES = [50, 95, 99, 100]
+
+
+def status_class(status, exception=None):
+    """
+    Index into STATUS_CLASSES for one request's HTTP status (0 when no response came
+    back) and the exception it failed with, if any.
+    """
+    if 200 <= status < 300:
+        return 0
+    if status == 429:
+        return 1
+    if 400 <= status < 500:
+        return 2
+    if status >= 500:
+        return 3
+    if status == 0 and exception is not None:
+        # requests' ReadTimeout, gevent's Timeout, asyncio/aiohttp's TimeoutError
+        if isinstance(exception, TimeoutError) or "Timeout" in type(exception).__name__:
+            return 4
+        return 5
+    return 6
+
+
+def histogram_key(name, status):
+    return f"{name}|{status}"
+
+
+def split_histogram_key(key):
+    name, status = key.rsplit("|", 1)
+    return name, status
+
+
+class StatusBreakdown:
+    """
+    Per-process companion to the raw request recorders: keeps an HDR histogram per
+    (name, status class), saved as status_hdr<suffix>.npz, and turns each recorded
+    batch into per-second (name, status class) counts for status_counts<suffix>.csv.
+    With `chunk_seconds` (soak runs) the counts go to compressed chunks under
+    status_counts/ instead, a new one every `chunk_seconds`.
+
+    Locust folds failures into the same percentiles as successes, so a burst of fast
+    429s makes p95 look better; these keep the two apart.
+    """
+
+    def __init__(self, output_dir, suffix="", chunk_seconds=None):
+        self.histogram_path = os.path.join(output_dir, f"status_hdr{suffix}.npz")
+        if chunk_seconds:
+            from soak_history import HistoryChunkWriter
+
+            self.counts_file = HistoryChunkWriter(output_dir, STATUS_COUNTS_HEADER, chunk_seconds,
+                                                  chunk_dir=STATUS_COUNTS_CHUNK_DIR, prefix=f"status_counts{suffix}")
+            self.counts_writer = None
+        else:
+            self.counts_file = open(os.path.join(output_dir, f"status_counts{suffix}.csv"), "w", newline="",
+                                    encoding="utf-8")
+            self.counts_writer = csv.writer(self.counts_file)
+            self.counts_writer.writerow(STATUS_COUNTS_HEADER)
+        self.histograms = {}
+
+    def add_batch(self, names, batch, classes):
+        """
+        Records one batch of REQUEST_DTYPE records whose status classes are `classes`,
+        and returns its per-second counts as rows for `write_counts` (callers pass them
+        to their writer thread, like the raw records).
+        """
+        for class_index in np.unique(classes):
+            in_class = classes == class_index
+            status = STATUS_CLASSES[class_index]
+            latencies = batch["latency_ms"][in_class]
+            self.histograms.setdefault(histogram_key("Aggregated", status), LatencyHistogram()).record_ms(latencies)
+            name_indexes = batch["name"][in_class]
+            for name_index in np.unique(name_indexes):
+                key = histogram_key(names[name_index], status)
+                self.histograms.setdefault(key, LatencyHistogram()).record_ms(latencies[name_indexes == name_index])
+        keys = np.stack([batch["timestamp"].astype(np.int64), batch["name"].astype(np.int64),
+                         classes.astype(np.int64)], axis=1)
+        unique_keys, counts = np.unique(keys, axis=0, return_counts=True)
+        return [[int(second), names[name_index], STATUS_CLASSES[class_index], int(count)]
+                for (second, name_index, class_index), count in zip(unique_keys, counts)]
+
+    def write_counts(self, rows):
+        if self.counts_writer is None:
+            # Rows come sorted by second, so the batch goes to the chunk its first second falls in
+            self.counts_file.write_rows(rows[0][0], rows)
+        else:
+            self.counts_writer.writerows(rows)
+
+    def close(self):
+        self.counts_file.close()
+        save_histograms(self.histogram_path, self.histograms)
+
+
+def write_status_percentiles(output_dir):
+    """
+    Merges the per-process status histograms into report_status_percentiles.csv: one
+    row per name and status class, with its share of that name's requests.
+    """
+    histograms = load_histograms(output_dir, STATUS_HISTOGRAM_PATTERN)
+    if not histograms:
+        return None
+    by_name = {}
+    for key, histogram in histograms.items():
+        name, status = split_histogram_key(key)
+        by_name.setdefault(name, {})[status] = histogram
+    names = sorted(name for name in by_name if name != "Aggregated")
+    path = os.path.join(output_dir, STATUS_PERCENTILES_FILENAME)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "Status", "Request Count", "Share (%)"] + [f"{p:g}%" for p in STATUS_PERCENTILES])
+        for name in names + (["Aggregated"] if "Aggregated" in by_name else []):
+            total = sum(histogram.total_count for histogram in by_name[name].values())
+            for status in STATUS_CLASSES:
+                histogram = by_name[name].get(status)
+                if histogram is None:
+                    continue
+                values = histogram.percentiles_ms(STATUS_PERCENTILES)
+                writer.writerow([name, status, histogram.total_count, round(histogram.total_count / total * 100, 3)]
+                                + [round(value, 3) for value in values])
+    return path
+
+
+def iter_status_counts(output_dir):
+    """
+    Streams every process's status counts, plain status_counts*.csv files or soak
+    chunks, as DataFrames of a bounded number of rows.
+    """
+    import pandas as pd
+    from soak_history import STREAM_ROWS, iter_chunks
+
+    for path in sorted(glob.glob(os.path.join(output_dir, STATUS_COUNTS_PATTERN))):
+        yield from pd.read_csv(path, chunksize=STREAM_ROWS)
+    chunk_paths = sorted(glob.glob(os.path.join(output_dir, STATUS_COUNTS_CHUNK_DIR, STATUS_COUNTS_CHUNK_PATTERN)))
+    yield from iter_chunks(chunk_paths)
+
+
+def write_status_timeline(output_dir):
+    """
+    Sums every process's status counts into report_status_timeline.csv: requests per
+    window and status class for each name, plus an Aggregated row per window. Windows
+    are one second, or SOAK_TIMELINE_SECONDS for soak runs. The counts are streamed and
+    summed block by block, so only the timeline itself is held in memory.
+    """
+    import pandas as pd
+
+    soak = os.path.isdir(os.path.join(output_dir, STATUS_COUNTS_CHUNK_DIR))
+    window_seconds = SOAK_TIMELINE_SECONDS if soak else 1
+    sums = []
+    for block in iter_status_counts(output_dir):
+        block = block.assign(Timestamp=block["Timestamp"] // window_seconds * window_seconds)
+        sums.append(block.groupby(["Timestamp", "Name", "Status"])["Count"].sum())
+    if not sums:
+        return None
+    counts = pd.concat(sums).groupby(level=["Timestamp", "Name", "Status"]).sum().reset_index()
+    if counts.empty:
+        return None
+    timeline = counts.pivot_table(index=["Timestamp", "Name"], columns="Status", values="Count", aggfunc="sum",
+                                  fill_value=0)
+    timeline = timeline.reindex(columns=STATUS_CLASSES, fill_value=0)
+    aggregated = timeline.groupby(level="Timestamp").sum()
+    aggregated.index = pd.MultiIndex.from_arrays([aggregated.index, ["Aggregated"] * len(aggregated)],
+                                                 names=["Timestamp", "Name"])
+    timeline = pd.concat([timeline, aggregated]).sort_index(level="Timestamp", sort_remaining=False)
+    timeline.insert(0, "Requests", timeline.sum(axis=1))
+    timeline.insert(0, "Window (s)", window_seconds)
+    path = os.path.join(output_dir, STATUS_TIMELINE_FILENAME)
+    timeline.reset_index().to_csv(path, index=False)
+    return path
+
+
+def write_status_reports(output_dir):
+    write_status_percentiles(output_dir)
+    write_status_timeline(output_dir)
+
+
+def load_status_percentiles(config_path):
+    """
+    report_status_percentiles.csv as a DataFrame, or None for runs recorded without it.
+    """
+    import pandas as pd
+
+    path = os.path.join(config_path, STATUS_PERCENTILES_FILENAME)
+    return pd.read_csv(path) if os.path.exists(path) else None
+
+
+def load_status_timeline(config_path):
+    import pandas as pd
+
+    path = os.path.join(config_path, STATUS_TIMELINE_FILENAME)
+    return pd.read_csv(path) if os.path.exists(path) else None
+
+
+def success_and_throttling(percentiles):
+    """
+    Per name: p50/p95 of successful (2xx) requests only, and the share of requests that
+    were throttled (429) or failed outright (ERROR_CLASSES).
+    """
+    import pandas as pd
+
+    rows = []
+    for name, group in percentiles.groupby("Name", sort=False):
+        by_status = group.set_index("Status")
+        rows.append({
+            "Name": name,
+            "Success p50": by_status["50%"].get(SUCCESS_CLASS, np.nan),
+            "Success p95": by_status["95%"].get(SUCCESS_CLASS, np.nan),
+            "Throttled (%)": by_status["Share (%)"].get(THROTTLE_CLASS, 0.0),
+            "Errors (%)": by_status["Share (%)"].reindex(ERROR_CLASSES).fillna(0).sum(),
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python status_breakdown.py <results/config_dir>")
+        sys.exit(1)
+    write_status_reports(sys.argv[1])
+    path = os.path.join(sys.argv[1], STATUS_PERCENTILES_FILENAME)
+    print(f"Generated: {path}" if os.path.exists(path) else f"No {STATUS_HISTOGRAM_PATTERN} files found in {sys.argv[1]}.")
@@ -0,0 +1,115 @@
+from locust import FastHttpUser, task, constant, events
+from locust.exception import StopUser
+from locust.runners import MasterRunner, WorkerRunner
+from locust.stats import CSV_STATS_INTERVAL_SEC
+import time
+
+import gevent
+
+from fast_benchmarking import HEADERS
+# Also registers the schedule-lag and throttling report (report_schedule_lag.csv)
+from open_loop_benchmarking import lag_stats, parse_retry_after, record_throttle
+from sarvamai_benchmarking import SARVAM_API_KEY
+from trace_replay import TraceSchedule
+
+# Seconds between the master picking the replay start time and the first request,
+# enough for every worker to receive it
+START_DELAY_SECONDS = 2.0
+
+schedule = None
+state = {"start_time": None, "in_flight": 0, "finished": False}
+
+
+@events.init_command_line_parser.add_listener
+def add_trace_arguments(parser):
+    parser.add_argument("--trace", type=str, default="",
+                        help="Trace file (timestamp,language_code,input rows) to replay.")
+    parser.add_argument("--speedup", type=float, default=1.0,
+                        help="Replay the trace this many times faster than recorded, e.g. 10 or 100.")
+
+
+@events.init.add_listener
+def on_init(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        environment.runner.register_message("trace_start", on_trace_start)
+
+
+def on_trace_start(environment, msg, **kwargs):
+    state["start_time"] = msg.data
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    global schedule
+    options = environment.parsed_options
+    if options is None:
+        return
+    runner = environment.runner
+    if isinstance(runner, MasterRunner):
+        # One start time for every shard keeps their requests interleaved in trace order
+        runner.send_message("trace_start", time.time() + START_DELAY_SECONDS)
+        return
+    shard_index, shard_count = 0, 1
+    if isinstance(runner, WorkerRunner):
+        shard_count = max(options.expect_workers or 1, 1)
+        shard_index = runner.worker_index % shard_count
+    start_time = state["start_time"] or time.time() + START_DELAY_SECONDS
+    schedule = TraceSchedule(options.trace, options.speedup, start_time, shard_index, shard_count)
+    state.update(in_flight=0, finished=False)
+
+
+class ReplaySTUser(FastHttpUser):
+    """
+    Replays a recorded traffic trace: users pull the next request (send time, language,
+    input) from the shared TraceSchedule and send it on time, whether or not earlier
+    requests have completed. As with OpenLoopSTUser, response times are measured from
+    the scheduled send time and the delay shows up in report_schedule_lag.csv, so run
+    enough users to cover the trace's peak rate x worst-case latency.
+
+    A 429 is counted but not backed off from; the trace decides when requests arrive.
+    A local run stops once the trace is used up and the last response is in; workers
+    stop their users and the master ends at --run-time.
+    """
+    wait_time = constant(0)
+    host = "https://api.sarvam.ai"
+
+    def on_start(self):
+        if not SARVAM_API_KEY:
+            self.environment.process_exit_code = 1
+            raise Exception("SARVAM_API_KEY is not set. Cannot proceed with tests!")
+
+    @task
+    def replay_next_request(self):
+        slot = schedule.next_send()
+        if slot is None:
+            self.finish_replay()
+        send_time, name, body = slot
+        # Counted from the moment the slot is taken, so stopping never drops a scheduled request
+        state["in_flight"] += 1
+        try:
+            delay = send_time - time.time()
+            if delay > 0:
+                gevent.sleep(delay)
+            lag_ms = max(0.0, (time.time() - send_time) * 1000)
+            lag_stats.log_request("LAG", name, lag_ms, 0)
+            with self.client.post('/transliterate', data=body, headers=HEADERS, name=name,
+                                  catch_response=True) as response:
+                response.request_meta["response_time"] += lag_ms
+        finally:
+            state["in_flight"] -= 1
+        if response.status_code == 429:
+            record_throttle(name, parse_retry_after(response))
+
+    def finish_replay(self):
+        if isinstance(self.environment.runner, WorkerRunner) or state["finished"]:
+            raise StopUser()
+        state["finished"] = True
+        while state["in_flight"]:
+            gevent.sleep(0.1)
+        # Locust rewrites report_stats.csv on a timer and not again at shutdown, so quitting
+        # straight away would leave the final burst out of it
+        gevent.sleep(CSV_STATS_INTERVAL_SEC + 0.5)
+        print("Trace replay finished.")
+        # quit() stops every user, this one included, so it runs in its own greenlet
+        gevent.spawn(self.environment.runner.quit)
+        raise StopUser()
@@ -0,0 +1,162 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+from collections import Counter
+from datetime import datetime
+
+from languages import LANGUAGES_BY_CODE, LANGUAGES_BY_NAME, TARGET_LANGUAGE_CODE
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRACE_DIR = os.path.join(BASE_DIR, 'traces')
+# One request per row, in send order. Timestamps are epoch seconds or ISO 8601; only the
+# gaps between them matter. Traces ending in .gz are read compressed.
+TRACE_HEADER = ["timestamp", "language_code", "input"]
+
+
+def parse_timestamp(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def open_trace(path, mode="r"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", newline="", encoding="utf-8")
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def read_trace(path):
+    """
+    Streams (seconds since the first request, language code, input) rows from a trace
+    file without loading it. Raises ValueError on a missing column or a timestamp that
+    goes backwards, since replaying those would silently reorder the traffic.
+    """
+    with open_trace(path) as f:
+        reader = csv.DictReader(f)
+        missing = set(TRACE_HEADER) - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"{path}: trace is missing column(s) {', '.join(sorted(missing))}")
+        first = previous = None
+        for row in reader:
+            timestamp = parse_timestamp(row["timestamp"])
+            if first is None:
+                first = previous = timestamp
+            if timestamp < previous:
+                raise ValueError(f"{path}:{reader.line_num}: timestamp goes backwards; sort the trace first")
+            previous = timestamp
+            yield timestamp - first, row["language_code"], row["input"]
+
+
+def request_name(language_code):
+    language = LANGUAGES_BY_CODE.get(language_code)
+    return language["name"] if language else language_code
+
+
+def request_body(language_code, text):
+    payload = {"input": text, "source_language_code": language_code, "target_language_code": TARGET_LANGUAGE_CODE}
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+class TraceSchedule:
+    """
+    Replays a trace's requests at their recorded offsets divided by `speedup`, counted
+    from `start_time`. Shard k of n takes every n-th request starting at the k-th, so
+    each worker's share stays in trace order and, with a common start time, the shards
+    interleave back into the original sequence.
+
+    Like ArrivalSchedule, slots are handed out regardless of whether earlier requests
+    have completed; `next_send` returns None once the shard is used up.
+    """
+
+    def __init__(self, path, speedup, start_time, shard_index=0, shard_count=1):
+        if speedup <= 0:
+            raise ValueError("--speedup must be positive")
+        self.rows = read_trace(path)
+        self.speedup = speedup
+        self.start_time = start_time
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.position = -1
+
+    def next_send(self):
+        for offset, language_code, text in self.rows:
+            self.position += 1
+            if self.position % self.shard_count == self.shard_index:
+                return (self.start_time + offset / self.speedup, request_name(language_code),
+                        request_body(language_code, text))
+        return None
+
+
+def describe_trace(path, speedup=1.0):
+    """
+    Request count, replay duration, mean and peak 1-second rate at `speedup`, and the
+    language mix of a trace, in one streaming pass.
+    """
+    per_second = Counter()
+    languages = Counter()
+    duration = 0.0
+    for offset, language_code, _ in read_trace(path):
+        per_second[int(offset / speedup)] += 1
+        languages[request_name(language_code)] += 1
+        duration = offset / speedup
+    requests = sum(languages.values())
+    return {
+        "requests": requests,
+        "duration_seconds": duration,
+        "mean_rate": requests / duration if duration else float(requests),
+        "peak_rate": max(per_second.values(), default=0),
+        "languages": {name: count / requests * 100 for name, count in languages.most_common()},
+    }
+
+
+def record_trace(config_path, output_path):
+    """
+    Writes a trace of a finished run's raw capture: every request's start time and
+    language, in start order. Inputs are each language's STUser greeting, since the raw
+    capture keeps names but not payloads; corpus runs keep their language only.
+    Returns the number of rows written.
+    """
+    from history_analysis import raw_requests_frame
+    from workload_corpus import split_request_name
+
+    raw = raw_requests_frame(config_path)
+    if raw is None:
+        raise ValueError(f"{config_path} has no raw capture (raw_requests*.bin) to record a trace from")
+    raw = raw.sort_values('Timestamp', kind='stable')
+    with open_trace(output_path, "w") as f:
+        writer = csv.writer(f)
+        writer.writerow(TRACE_HEADER)
+        for timestamp, name in zip(raw['Timestamp'], raw['Name'].astype(str)):
+            language = LANGUAGES_BY_NAME.get(split_request_name(name)[0])
+            if language is not None:
+                writer.writerow([f"{timestamp:.6f}", language["code"], language["input"]])
+    return len(raw)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Records traffic traces from finished runs and describes them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Write a trace of a run's raw capture.")
+    record.add_argument("config_path", help="Run folder with raw_requests*.bin.")
+    record.add_argument("output", help="Trace file to write (.csv or .csv.gz).")
+    describe = commands.add_parser("describe", help="Summarise a trace as it would be replayed.")
+    describe.add_argument("trace")
+    describe.add_argument("--speedup", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        rows = record_trace(args.config_path, args.output)
+        print(f"Recorded {rows} requests from {args.config_path} to {args.output}")
+        return
+    summary = describe_trace(args.trace, args.speedup)
+    print(f"{summary['requests']} requests over {summary['duration_seconds']:.1f}s at {args.speedup:g}x: "
+          f"mean {summary['mean_rate']:.2f} req/s, peak {summary['peak_rate']} req/s")
+    for name, share in summary["languages"].items():
+        print(f"  {name}: {share:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
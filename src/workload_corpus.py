@@ -0,0 +1,214 @@
+import argparse
+import csv
+import mmap
+import os
+import random
+import re
+
+import numpy as np
+
+from languages import LANGUAGES, LANGUAGES_BY_NAME, TARGET_LANGUAGE_CODE
+from latency_histogram import LatencyHistogram, load_histograms
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_BASE_DIR = os.path.join(BASE_DIR, 'results')
+# One UTF-8 file per language, named after its code (e.g. corpus/hi-IN.txt), one input per line
+CORPUS_DIR = os.path.join(BASE_DIR, 'corpus')
+LENGTH_BUCKETS_FILENAME = 'report_length_buckets.csv'
+
+# (bucket, min words, max words) by whitespace-separated word count; None means no upper limit
+LENGTH_BUCKETS = [
+    ("word", 1, 1),
+    ("phrase", 2, 4),
+    ("sentence", 5, 15),
+    ("paragraph", 16, None),
+]
+BUCKET_NAMES = [bucket for bucket, _, _ in LENGTH_BUCKETS]
+BUCKET_PERCENTILES = [50, 95, 99]
+REQUEST_NAME_PATTERN = re.compile(r"^(?P<language>.+) \[(?P<bucket>[a-z]+)\]$")
+
+
+def length_bucket(word_count):
+    for bucket, low, high in LENGTH_BUCKETS:
+        if word_count >= low and (high is None or word_count <= high):
+            return bucket
+    return None
+
+
+def request_name(language, bucket):
+    """
+    Locust request name for a corpus request, e.g. "Hindi [sentence]".
+    """
+    return f"{language} [{bucket}]"
+
+
+def split_request_name(name):
+    """
+    (language, bucket) for a corpus request name; (name, None) for any other name.
+    """
+    match = REQUEST_NAME_PATTERN.match(name)
+    if match is None or match.group('bucket') not in BUCKET_NAMES:
+        return name, None
+    return match.group('language'), match.group('bucket')
+
+
+def parse_weights(spec, names, label):
+    """
+    Parses 'Hindi=3,Tamil=1' into {name: weight}. An empty spec weights every name
+    equally; otherwise only the listed names are used.
+    """
+    if not spec:
+        return {name: 1.0 for name in names}
+    weights = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in names:
+            raise ValueError(f"Unknown {label} in weights: {name!r} (expected one of {', '.join(names)})")
+        weights[name] = float(weight)
+    if not any(weight > 0 for weight in weights.values()):
+        raise ValueError(f"At least one {label} needs a positive weight: {spec!r}")
+    return weights
+
+
+class CorpusFile:
+    """
+    One language's corpus, memory-mapped. Only the offset and length of each line are
+    kept in memory, grouped by length bucket; sampled lines are decoded straight from
+    the mapping, so the OS page cache is shared by every worker on the machine.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"Corpus file is empty: {path}")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        lines = {bucket: ([], []) for bucket in BUCKET_NAMES}
+        position = 0
+        for line in iter(self.map.readline, b''):
+            text = line.strip()
+            if text and not text.startswith(b'#'):
+                offsets, lengths = lines[length_bucket(len(text.split()))]
+                offsets.append(position)
+                lengths.append(len(line))
+            position += len(line)
+        self.lines = {bucket: (np.array(offsets, dtype=np.int64), np.array(lengths, dtype=np.int32))
+                      for bucket, (offsets, lengths) in lines.items() if offsets}
+        if not self.lines:
+            raise ValueError(f"Corpus file has no inputs: {path}")
+
+    @property
+    def buckets(self):
+        return [bucket for bucket in BUCKET_NAMES if bucket in self.lines]
+
+    def line_counts(self):
+        return {bucket: len(offsets) for bucket, (offsets, _) in self.lines.items()}
+
+    def sample(self, bucket, rng=random):
+        offsets, lengths = self.lines[bucket]
+        i = rng.randrange(len(offsets))
+        return self.map[offsets[i]:offsets[i] + lengths[i]].decode('utf-8').strip()
+
+    def close(self):
+        self.map.close()
+
+
+class CorpusWorkload:
+    """
+    Picks the next request of a corpus-driven run: a language by its traffic weight,
+    then a length bucket by its weight (among the buckets that language's corpus
+    has), then a random line from that bucket.
+    """
+
+    def __init__(self, corpus_dir=CORPUS_DIR, language_weights="", length_weights=""):
+        names = [language["name"] for language in LANGUAGES]
+        weights = parse_weights(language_weights, names, "language")
+        bucket_weights = parse_weights(length_weights, BUCKET_NAMES, "length bucket")
+        self.corpora = {}
+        self.buckets = {}
+        for name, weight in weights.items():
+            if weight <= 0:
+                continue
+            path = os.path.join(corpus_dir, f"{LANGUAGES_BY_NAME[name]['code']}.txt")
+            if not os.path.exists(path):
+                raise ValueError(f"No corpus for {name}: {path} not found")
+            corpus = CorpusFile(path)
+            buckets = [bucket for bucket in corpus.buckets if bucket_weights.get(bucket, 0) > 0]
+            if not buckets:
+                raise ValueError(f"{path} has no inputs in the weighted length buckets")
+            self.corpora[name] = corpus
+            self.buckets[name] = (buckets, [bucket_weights[bucket] for bucket in buckets])
+        self.languages = list(self.corpora)
+        self.language_weights = [weights[name] for name in self.languages]
+
+    def next_request(self, rng=random):
+        """
+        Returns (request name, /transliterate payload).
+        """
+        name = rng.choices(self.languages, self.language_weights)[0]
+        buckets, bucket_weights = self.buckets[name]
+        bucket = rng.choices(buckets, bucket_weights)[0]
+        payload = {
+            "input": self.corpora[name].sample(bucket, rng),
+            "source_language_code": LANGUAGES_BY_NAME[name]["code"],
+            "target_language_code": TARGET_LANGUAGE_CODE,
+        }
+        return request_name(name, bucket), payload
+
+    def describe(self):
+        total = sum(self.language_weights)
+        for name, weight in zip(self.languages, self.language_weights):
+            counts = self.corpora[name].line_counts()
+            buckets = ", ".join(f"{bucket} ({counts[bucket]})" for bucket in self.buckets[name][0])
+            print(f"Corpus: {name} {weight / total:.0%} of traffic, buckets {buckets}")
+
+    def close(self):
+        for corpus in self.corpora.values():
+            corpus.close()
+
+
+def write_length_bucket_summary(output_dir):
+    """
+    Merges the run's per-request-name HDR histograms into latency per length bucket,
+    across all languages ("All") and per language, in report_length_buckets.csv.
+    Returns None when the run has no corpus request names.
+    """
+    rows = {}
+    for name, histogram in load_histograms(output_dir).items():
+        language, bucket = split_request_name(name)
+        if bucket is None:
+            continue
+        for key in [("All", bucket), (language, bucket)]:
+            rows.setdefault(key, LatencyHistogram()).merge(histogram)
+    if not rows:
+        return None
+    order = {bucket: i for i, bucket in enumerate(BUCKET_NAMES)}
+    summary_path = os.path.join(output_dir, LENGTH_BUCKETS_FILENAME)
+    with open(summary_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Language", "Bucket", "Request Count"] + [f"{p}%" for p in BUCKET_PERCENTILES])
+        for (language, bucket), histogram in sorted(rows.items(), key=lambda item: (item[0][0] != "All", item[0][0],
+                                                                                    order[item[0][1]])):
+            values = histogram.percentiles_ms(BUCKET_PERCENTILES)
+            writer.writerow([language, bucket, histogram.total_count] + [round(value, 3) for value in values])
+    return summary_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency by input-length bucket for corpus-driven runs.")
+    parser.add_argument("config_paths", nargs="*", help="Run folders (defaults to every run under results/).")
+    args = parser.parse_args()
+    config_paths = args.config_paths or sorted(entry.path for entry in os.scandir(RESULTS_BASE_DIR) if entry.is_dir())
+    for config_path in config_paths:
+        summary_path = write_length_bucket_summary(config_path)
+        if summary_path is None:
+            continue
+        print(f"\n--- {os.path.basename(os.path.normpath(config_path))} ---")
+        with open(summary_path, newline='') as f:
+            for row in csv.reader(f):
+                print("".join(value.ljust(14) for value in row))
+
+
+if __name__ == "__main__":
+    main()